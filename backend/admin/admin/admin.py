@@ -2,19 +2,71 @@
 Admin API endpoints for the Task Management System.
 """
 import os
+import io
 import json
+import time
+import base64
+import threading
 import boto3
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import TypeDeserializer
 import sys
 
 # Add parent directory to path to import common modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from common import response, auth
+from common import response, auth, task_counters, completion_sketch, user_directory
+from . import user_import, metrics, daily_rollup, export, response_cache
 
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
 tasks_table = dynamodb.Table(os.environ.get('TASKS_TABLE'))
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+rollups_table = dynamodb.Table(os.environ.get('ROLLUPS_TABLE'))
+lambda_client = boto3.client('lambda')
+export_function = os.environ.get('EXPORT_FUNCTION')
+
+# The low-level client is thread-safe, unlike resource objects
+client = dynamodb.meta.client
+deserializer = TypeDeserializer()
+
+DEADLINE_QUERY_WORKERS = 8
+
+# Longest look-ahead served by the deadlines endpoint and dashboard, one index
+# query per day; longer requests are rejected
+MAX_DEADLINE_DAYS = 90
+
+# Sections of the admin dashboard
+DASHBOARD_SECTIONS = ['users', 'overview', 'deadlines', 'performance']
+
+# Longest date range served by the trends endpoint
+MAX_TREND_DAYS = 366
+
+# User directory paging and projection
+DIRECTORY_PAGE_SIZE = 100
+MAX_DIRECTORY_PAGE_SIZE = 500
+USER_FIELDS = ['UserID', 'Username', 'Email', 'Name', 'Role', 'Department', 'CreatedAt', 'LastLogin']
+
+# Users evaluated per filtered page before a partial page is returned
+DIRECTORY_READ_BUDGET = 1000
+
+# Empty while a deployment has not yet added DepartmentIndex
+department_index = os.environ.get('DEPARTMENT_INDEX', 'DepartmentIndex')
+
+# Directory pages cached by this container, keyed by query
+DIRECTORY_CACHE_TTL = 300
+DIRECTORY_CACHE_SIZE = 256
+directory_cache = {'version': None, 'pages': {}}
+
+# Analytics payloads cached by this container: fresh for a per-endpoint TTL,
+# then served stale for a further window while they refresh in the background
+ANALYTICS_STALE_WINDOW = int(os.environ.get('ANALYTICS_STALE_SECONDS', 300))
+analytics_caches = {
+    'overview': response_cache.StaleWhileRevalidateCache(ttl=5, stale_window=ANALYTICS_STALE_WINDOW),
+    'deadlines': response_cache.StaleWhileRevalidateCache(ttl=30, stale_window=ANALYTICS_STALE_WINDOW),
+    'performance': response_cache.StaleWhileRevalidateCache(ttl=60, stale_window=ANALYTICS_STALE_WINDOW)
+}
 
 def lambda_handler(event, context):
     """
@@ -28,17 +80,219 @@ def lambda_handler(event, context):
     # Route to the appropriate handler
     if http_method == 'GET' and path == '/admin/users':
         return get_users(event)
+    elif http_method == 'POST' and path == '/admin/users/import':
+        return import_users(event, context)
     elif http_method == 'GET' and path == '/admin/tasks/overview':
         return get_tasks_overview(event)
     elif http_method == 'GET' and path == '/admin/tasks/deadlines':
         return get_upcoming_deadlines(event)
     elif http_method == 'GET' and path == '/admin/performance':
         return get_performance_metrics(event)
+    elif http_method == 'GET' and path == '/admin/trends':
+        return get_trends(event)
+    elif http_method == 'GET' and path == '/admin/dashboard':
+        return get_dashboard(event)
+    elif http_method == 'POST' and path == '/admin/exports':
+        return create_export(event)
+    elif http_method == 'GET' and path.startswith('/admin/exports/'):
+        return get_export(event)
     else:
         return response.not_found('Endpoint not found')
 
+def scan_all(table, **kwargs):
+    """Yield every item of a table scan, following pagination."""
+    while True:
+        result = table.scan(**kwargs)
+        yield from result.get('Items', [])
+        
+        if 'LastEvaluatedKey' not in result:
+            break
+        kwargs['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def scan_table(table):
+    """Get every item of a table, using the thread-safe low-level client."""
+    scan_params = {'TableName': table.name}
+    items = []
+    
+    while True:
+        result = client.scan(**scan_params)
+        
+        for item in result.get('Items', []):
+            items.append({key: deserializer.deserialize(value) for key, value in item.items()})
+        
+        if 'LastEvaluatedKey' not in result:
+            break
+        scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+    
+    return items
+
+def get_stats_items(keys):
+    """Get Stats table items by key, in batches of 100."""
+    items = []
+    
+    for start in range(0, len(keys), 100):
+        request_items = {stats_table.name: {'Keys': keys[start:start + 100]}}
+        
+        while request_items:
+            result = dynamodb.batch_get_item(RequestItems=request_items)
+            items.extend(result.get('Responses', {}).get(stats_table.name, []))
+            request_items = result.get('UnprocessedKeys')
+    
+    return items
+
+def query_open_deadlines(day, start, end):
+    """
+    Get the open tasks of one OpenDeadlineIndex partition, in deadline order.
+    
+    Args:
+        day (str): Deadline date (YYYY-MM-DD)
+        start (str): Earliest deadline
+        end (str): Latest deadline
+        
+    Returns:
+        list: Tasks due on the day between start and end
+    """
+    query_params = {
+        'TableName': tasks_table.name,
+        'IndexName': 'OpenDeadlineIndex',
+        'KeyConditionExpression': 'DeadlineBucket = :day AND Deadline BETWEEN :start AND :end',
+        # Guards against a deadline update racing with a completion
+        'FilterExpression': '#status <> :completed',
+        'ExpressionAttributeNames': {'#status': 'Status'},
+        'ExpressionAttributeValues': {
+            ':day': {'S': day},
+            ':start': {'S': start},
+            ':end': {'S': end},
+            ':completed': {'S': 'Completed'}
+        }
+    }
+    tasks = []
+    
+    while True:
+        result = client.query(**query_params)
+        
+        for item in result.get('Items', []):
+            tasks.append({key: deserializer.deserialize(value) for key, value in item.items()})
+        
+        if 'LastEvaluatedKey' not in result:
+            break
+        query_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+    
+    return tasks
+
+def encode_cursor(key):
+    """Encode a LastEvaluatedKey as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor into an ExclusiveStartKey."""
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+def read_users_page(limit, fields=None, role=None, department=None, cursor=None):
+    """
+    Read one page of the user directory.
+    
+    Role and department filters are served from RoleIndex and DepartmentIndex;
+    without either the Users table is scanned. A role and a department
+    together, or a department before DepartmentIndex exists, are filtered
+    after DynamoDB's Limit, so reads repeat until the page is full, the users
+    run out or DIRECTORY_READ_BUDGET items have been evaluated.
+    
+    Args:
+        limit (int): Maximum number of users to read
+        fields (list): Attributes to return, None for all
+        role (str): Only return users with this role
+        department (str): Only return users in this department
+        cursor (str): Cursor returned with the previous page
+        
+    Returns:
+        dict: Users and the cursor of the next page, None on the last page
+    """
+    params = {}
+    names = {}
+    values = {}
+    key_attributes = ['UserID']
+    
+    if role:
+        params['IndexName'] = 'RoleIndex'
+        params['KeyConditionExpression'] = '#role = :role'
+        names['#role'] = 'Role'
+        values[':role'] = role
+        key_attributes.append('Role')
+        if department:
+            params['FilterExpression'] = 'Department = :department'
+            values[':department'] = department
+    elif department and department_index:
+        params['IndexName'] = department_index
+        params['KeyConditionExpression'] = 'Department = :department'
+        values[':department'] = department
+    elif department:
+        params['FilterExpression'] = 'Department = :department'
+        values[':department'] = department
+    
+    if fields:
+        projected = list(fields)
+        if 'FilterExpression' in params:
+            # A cursor is built from the key attributes of the last user kept
+            projected += [key for key in key_attributes if key not in fields]
+        params['ProjectionExpression'] = ', '.join(f"#f{index}" for index in range(len(projected)))
+        names.update({f"#f{index}": field for index, field in enumerate(projected)})
+    
+    if names:
+        params['ExpressionAttributeNames'] = names
+    if values:
+        params['ExpressionAttributeValues'] = values
+    if cursor:
+        params['ExclusiveStartKey'] = decode_cursor(cursor)
+    
+    users = []
+    evaluated = 0
+    
+    while True:
+        # Without a filter every evaluated item is returned
+        if 'FilterExpression' in params:
+            params['Limit'] = min(MAX_DIRECTORY_PAGE_SIZE, DIRECTORY_READ_BUDGET - evaluated)
+        else:
+            params['Limit'] = limit - len(users)
+        
+        if 'KeyConditionExpression' in params:
+            result = users_table.query(**params)
+        else:
+            result = users_table.scan(**params)
+        
+        items = result.get('Items', [])
+        evaluated += result.get('ScannedCount', len(items))
+        last_key = result.get('LastEvaluatedKey')
+        
+        needed = limit - len(users)
+        if len(items) > needed:
+            # Continue after the last user kept, not the last one read
+            users.extend(items[:needed])
+            last_key = {key: users[-1][key] for key in key_attributes}
+            break
+        
+        users.extend(items)
+        
+        if len(users) >= limit or not last_key or evaluated >= DIRECTORY_READ_BUDGET:
+            break
+        params['ExclusiveStartKey'] = last_key
+    
+    if fields:
+        users = [{key: value for key, value in user.items() if key in fields} for user in users]
+    
+    return {
+        'users': users,
+        'next_cursor': encode_cursor(last_key) if last_key else None
+    }
+
 def get_users(event):
-    """Get all users."""
+    """
+    Get a page of the user directory.
+    
+    Query parameters: limit, cursor, fields (comma-separated attribute names),
+    role and department. Pages are cached per container until a profile
+    write bumps the directory version or the cache entry expires.
+    """
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -49,21 +303,67 @@ def get_users(event):
         return response.forbidden("Only admins can access this endpoint")
     
     try:
-        # Get all users from DynamoDB
-        result = users_table.scan()
+        # Get query parameters
+        query_params = event.get('queryStringParameters', {}) or {}
+        
+        try:
+            limit = int(query_params.get('limit', DIRECTORY_PAGE_SIZE))
+        except ValueError:
+            return response.bad_request("Invalid limit")
+        if limit < 1:
+            return response.bad_request("Invalid limit")
+        limit = min(limit, MAX_DIRECTORY_PAGE_SIZE)
+        
+        fields = None
+        if query_params.get('fields'):
+            fields = [field.strip() for field in query_params['fields'].split(',') if field.strip()]
+            invalid_fields = [field for field in fields if field not in USER_FIELDS]
+            if invalid_fields:
+                return response.bad_request(f"Invalid fields: {', '.join(invalid_fields)}")
+        
+        role = query_params.get('role')
+        department = query_params.get('department')
+        cursor = query_params.get('cursor')
+        
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                return response.bad_request("Invalid cursor")
+        
+        # Drop cached pages once a profile write has bumped the version
+        version = user_directory.get_version(stats_table)
+        if directory_cache['version'] != version or len(directory_cache['pages']) >= DIRECTORY_CACHE_SIZE:
+            directory_cache['version'] = version
+            directory_cache['pages'] = {}
+        
+        cache_key = (limit, tuple(fields or ()), role, department, cursor)
+        cached = directory_cache['pages'].get(cache_key)
+        
+        if cached and time.monotonic() - cached['read_at'] < DIRECTORY_CACHE_TTL:
+            page = cached['page']
+        else:
+            page = read_users_page(limit, fields, role, department, cursor)
+            directory_cache['pages'][cache_key] = {'page': page, 'read_at': time.monotonic()}
         
         # Return users
         return response.success({
-            'users': result.get('Items', []),
-            'count': len(result.get('Items', []))
+            'users': page['users'],
+            'count': len(page['users']),
+            'next_cursor': page['next_cursor']
         })
         
     except Exception as e:
         print(f"Get users error: {str(e)}")
         return response.server_error(str(e))
 
-def get_tasks_overview(event):
-    """Get task statistics."""
+def import_users(event, context):
+    """
+    Bulk import users from CSV or NDJSON content.
+    
+    Stops starting new chunks shortly before the Lambda times out and returns
+    the row to resume from, so large files are imported over several calls.
+    """
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -74,47 +374,78 @@ def get_tasks_overview(event):
         return response.forbidden("Only admins can access this endpoint")
     
     try:
-        # Get all tasks from DynamoDB
-        result = tasks_table.scan()
-        tasks = result.get('Items', [])
-        
-        # Calculate statistics
-        total_tasks = len(tasks)
-        status_counts = {
-            'New': 0,
-            'In Progress': 0,
-            'Completed': 0,
-            'Overdue': 0
-        }
-        priority_counts = {
-            'Low': 0,
-            'Medium': 0,
-            'High': 0
-        }
+        # Parse request body
+        body = json.loads(event['body'])
         
-        for task in tasks:
-            status = task.get('Status', 'New')
-            priority = task.get('Priority', 'Medium')
-            
-            if status in status_counts:
-                status_counts[status] += 1
-            
-            if priority in priority_counts:
-                priority_counts[priority] += 1
+        if 'data' not in body:
+            return response.bad_request("Missing required field: data")
         
-        # Return statistics
+        file_format = body.get('format', 'csv')
+        if file_format not in ['csv', 'ndjson']:
+            return response.bad_request("Invalid format. Must be 'csv' or 'ndjson'")
+        
+        start = int(body.get('start', 0))
+        
+        # Leave time to flush the last chunk before the function times out
+        deadline = None
+        if context and hasattr(context, 'get_remaining_time_in_millis'):
+            deadline = time.monotonic() + (context.get_remaining_time_in_millis() - 15000) / 1000
+        
+        summary = user_import.import_users(
+            user_import.read_users(io.StringIO(body['data']), file_format),
+            start=start,
+            deadline=deadline
+        )
+        
+        if summary['created']:
+            user_directory.bump_version(stats_table)
+        
+        # Return import progress
         return response.success({
-            'total_tasks': total_tasks,
-            'status_counts': status_counts,
-            'priority_counts': priority_counts
+            'created': summary['created'],
+            'skipped': summary['skipped'],
+            'failed': summary['failed'],
+            'next_row': summary['next_row'],
+            'complete': summary['next_row'] is None
         })
         
+    except Exception as e:
+        print(f"Import users error: {str(e)}")
+        return response.server_error(str(e))
+
+def get_tasks_overview(event):
+    """Get task statistics, served from the analytics cache."""
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    # Check if user is admin
+    if user['role'] != 'admin':
+        return response.forbidden("Only admins can access this endpoint")
+    
+    try:
+        # Return statistics
+        return response.success(analytics_caches['overview'].get('overview', compute_tasks_overview))
+        
     except Exception as e:
         print(f"Get tasks overview error: {str(e)}")
         return response.server_error(str(e))
 
+def compute_tasks_overview():
+    """Compute the task statistics from the maintained task counters."""
+    result = stats_table.get_item(Key=task_counters.COUNTERS_KEY)
+    
+    if 'Item' in result:
+        counters = result['Item']
+    else:
+        # No counters yet, e.g. right after deployment
+        counters = task_counters.count_tasks(scan_all(tasks_table))
+    
+    return task_counters.to_overview(counters)
+
 def get_upcoming_deadlines(event):
-    """Get upcoming task deadlines."""
+    """Get upcoming task deadlines, served from the analytics cache."""
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -127,44 +458,205 @@ def get_upcoming_deadlines(event):
     try:
         # Get query parameters
         query_params = event.get('queryStringParameters', {}) or {}
-        days = int(query_params.get('days', 7))
+        try:
+            days = int(query_params.get('days', 7))
+        except ValueError:
+            return response.bad_request("Invalid days")
+        if days < 1:
+            return response.bad_request("Invalid days")
+        if days > MAX_DEADLINE_DAYS:
+            return response.bad_request(f"days cannot exceed {MAX_DEADLINE_DAYS}")
         
-        # Calculate date range
         today = datetime.now().date()
-        end_date = today + timedelta(days=days)
         
-        today_str = today.isoformat()
-        end_date_str = end_date.isoformat()
+        # Return upcoming deadlines
+        return response.success(analytics_caches['deadlines'].get(
+            (today, days),
+            lambda: compute_upcoming_deadlines(today, days)
+        ))
         
-        # Get tasks with deadlines in the specified range
-        result = tasks_table.scan(
-            FilterExpression=(
-                boto3.dynamodb.conditions.Attr('Status').ne('Completed') & 
-                boto3.dynamodb.conditions.Attr('Deadline').between(today_str, end_date_str)
-            )
+    except Exception as e:
+        print(f"Get upcoming deadlines error: {str(e)}")
+        return response.server_error(str(e))
+
+def compute_upcoming_deadlines(today, days):
+    """Get the open tasks due from today through the given number of days."""
+    # Calculate date range
+    end_date = today + timedelta(days=days)
+    
+    today_str = today.isoformat()
+    end_date_str = end_date.isoformat()
+    
+    # Query each day's partition of the open task index in parallel
+    days_in_range = [(today + timedelta(days=offset)).isoformat() for offset in range(days + 1)]
+    
+    with ThreadPoolExecutor(max_workers=DEADLINE_QUERY_WORKERS) as executor:
+        day_tasks = executor.map(
+            lambda day: query_open_deadlines(day, today_str, end_date_str),
+            days_in_range
         )
         
-        tasks = result.get('Items', [])
+        # Days are in order and each day's tasks are sorted by deadline
+        tasks = [task for tasks_for_day in day_tasks for task in tasks_for_day]
+    
+    return {
+        'tasks': tasks,
+        'count': len(tasks),
+        'date_range': {
+            'start': today_str,
+            'end': end_date_str
+        }
+    }
+
+def get_performance_metrics(event):
+    """Get team performance metrics, served from the analytics cache."""
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    # Check if user is admin
+    if user['role'] != 'admin':
+        return response.forbidden("Only admins can access this endpoint")
+    
+    try:
+        # Return performance metrics
+        return response.success(analytics_caches['performance'].get('performance', compute_performance_metrics))
         
-        # Sort tasks by deadline
-        tasks.sort(key=lambda x: x.get('Deadline', ''))
+    except Exception as e:
+        print(f"Get performance metrics error: {str(e)}")
+        return response.server_error(str(e))
+
+def compute_performance_metrics():
+    """Compute the team performance metrics from all tasks and users."""
+    # Stream all tasks from DynamoDB, reading only the attributes the metrics use
+    tasks = scan_all(
+        tasks_table,
+        ProjectionExpression='AssignedTo, #status, CreatedAt, CompletedAt',
+        ExpressionAttributeNames={'#status': 'Status'}
+    )
+    
+    # Get all users from DynamoDB
+    users = list(scan_all(users_table))
+    
+    return build_performance(tasks, users)
+
+def build_performance(tasks, users):
+    """Compute the performance metrics payload from tasks and users."""
+    # Calculate metrics
+    metrics_list = metrics.compute_user_metrics(tasks, users)
+    
+    # Get completion time percentiles from the maintained sketches
+    keys = [completion_sketch.TEAM_KEY]
+    keys += [completion_sketch.user_key(item['user_id']) for item in metrics_list]
+    sketches = {item['StatID']: item for item in get_stats_items(keys)}
+    
+    for item in metrics_list:
+        sketch = sketches.get(completion_sketch.user_key(item['user_id'])['StatID'], {})
+        item['completion_time_percentiles'] = completion_sketch.percentiles(
+            completion_sketch.get_buckets(sketch)
+        )
+    
+    team_sketch = sketches.get(completion_sketch.TEAM_KEY['StatID'], {})
+    
+    return {
+        'team_metrics': metrics_list,
+        'team_completion_time_percentiles': completion_sketch.percentiles(
+            completion_sketch.get_buckets(team_sketch)
+        ),
+        'count': len(metrics_list)
+    }
+
+def get_trends(event):
+    """
+    Get daily task trends from the rollup table.
+    
+    Query parameters: from and to (YYYY-MM-DD, defaulting to the 30 days up
+    to yesterday), and optionally user_id or department to narrow the scope.
+    """
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    # Check if user is admin
+    if user['role'] != 'admin':
+        return response.forbidden("Only admins can access this endpoint")
+    
+    try:
+        # Get query parameters
+        query_params = event.get('queryStringParameters', {}) or {}
         
-        # Return upcoming deadlines
+        try:
+            end_date = datetime.now().date() - timedelta(days=1)
+            if query_params.get('to'):
+                end_date = datetime.strptime(query_params['to'], '%Y-%m-%d').date()
+            
+            start_date = end_date - timedelta(days=29)
+            if query_params.get('from'):
+                start_date = datetime.strptime(query_params['from'], '%Y-%m-%d').date()
+        except ValueError:
+            return response.bad_request("Invalid date. Use YYYY-MM-DD")
+        
+        if start_date > end_date:
+            return response.bad_request("'from' must not be after 'to'")
+        if (end_date - start_date).days >= MAX_TREND_DAYS:
+            return response.bad_request(f"Date range cannot exceed {MAX_TREND_DAYS} days")
+        
+        if query_params.get('user_id'):
+            scope = daily_rollup.user_scope(query_params['user_id'])
+        elif query_params.get('department'):
+            scope = daily_rollup.department_scope(query_params['department'])
+        else:
+            scope = daily_rollup.TEAM_SCOPE
+        
+        # Read only the rollup rows of the range
+        rows = {
+            row['Day']: row
+            for row in daily_rollup.paginate(
+                rollups_table.query,
+                KeyConditionExpression=(
+                    boto3.dynamodb.conditions.Key('Scope').eq(scope) &
+                    boto3.dynamodb.conditions.Key('Day').between(start_date.isoformat(), end_date.isoformat())
+                )
+            )
+        }
+        
+        # Days without a row had no activity in this scope
+        days = []
+        totals = {field.lower(): 0 for field in daily_rollup.COUNT_FIELDS}
+        day = start_date
+        
+        while day <= end_date:
+            row = rows.get(day.isoformat(), {})
+            counts = {field.lower(): int(row.get(field, 0)) for field in daily_rollup.COUNT_FIELDS}
+            for name, count in counts.items():
+                totals[name] += count
+            days.append({'date': day.isoformat(), **counts})
+            day += timedelta(days=1)
+        
+        # Return trends
         return response.success({
-            'tasks': tasks,
-            'count': len(tasks),
-            'date_range': {
-                'start': today_str,
-                'end': end_date_str
-            }
+            'scope': scope,
+            'from': start_date.isoformat(),
+            'to': end_date.isoformat(),
+            'days': days,
+            'totals': totals
         })
         
     except Exception as e:
-        print(f"Get upcoming deadlines error: {str(e)}")
+        print(f"Get trends error: {str(e)}")
         return response.server_error(str(e))
 
-def get_performance_metrics(event):
-    """Get team performance metrics."""
+def get_dashboard(event):
+    """
+    Get several admin dashboard sections from one snapshot.
+    
+    The Tasks and Users tables are each scanned once, concurrently, and every
+    requested section is computed from that snapshot. Query parameters:
+    sections (comma-separated, defaulting to users, overview, deadlines and
+    performance) and days for the deadlines section.
+    """
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -175,78 +667,167 @@ def get_performance_metrics(event):
         return response.forbidden("Only admins can access this endpoint")
     
     try:
-        # Get all tasks from DynamoDB
-        tasks_result = tasks_table.scan()
-        tasks = tasks_result.get('Items', [])
-        
-        # Get all users from DynamoDB
-        users_result = users_table.scan()
-        users = users_result.get('Items', [])
-        
-        # Calculate metrics
-        user_metrics = {}
-        
-        for user_item in users:
-            if user_item.get('Role') == 'team_member':
-                user_id = user_item.get('UserID')
-                user_metrics[user_id] = {
-                    'user_id': user_id,
-                    'name': user_item.get('Name', ''),
-                    'email': user_item.get('Email', ''),
-                    'total_tasks': 0,
-                    'completed_tasks': 0,
-                    'overdue_tasks': 0,
-                    'completion_rate': 0,
-                    'average_completion_time': 0
-                }
+        # Get query parameters
+        query_params = event.get('queryStringParameters', {}) or {}
+        
+        sections = DASHBOARD_SECTIONS
+        if query_params.get('sections'):
+            sections = [section.strip() for section in query_params['sections'].split(',') if section.strip()]
+            invalid_sections = [section for section in sections if section not in DASHBOARD_SECTIONS]
+            if invalid_sections:
+                return response.bad_request(f"Invalid sections: {', '.join(invalid_sections)}")
+        
+        try:
+            days = int(query_params.get('days', 7))
+        except ValueError:
+            return response.bad_request("Invalid days")
+        if days < 1:
+            return response.bad_request("Invalid days")
+        if days > MAX_DEADLINE_DAYS:
+            return response.bad_request(f"days cannot exceed {MAX_DEADLINE_DAYS}")
         
-        total_completion_time = {}
+        # Only scan the tables the requested sections need
+        needs_users = 'users' in sections or 'performance' in sections
+        needs_tasks = any(section in sections for section in ['overview', 'deadlines', 'performance'])
         
-        for task in tasks:
-            assigned_to = task.get('AssignedTo')
-            status = task.get('Status')
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            users_future = executor.submit(scan_table, users_table) if needs_users else None
+            tasks_future = executor.submit(scan_table, tasks_table) if needs_tasks else None
             
-            if assigned_to in user_metrics:
-                user_metrics[assigned_to]['total_tasks'] += 1
-                
-                if status == 'Completed':
-                    user_metrics[assigned_to]['completed_tasks'] += 1
-                    
-                    # Calculate completion time if available
-                    if 'CompletedAt' in task and 'CreatedAt' in task:
-                        try:
-                            completed_at = datetime.fromisoformat(task['CompletedAt'])
-                            created_at = datetime.fromisoformat(task['CreatedAt'])
-                            completion_time = (completed_at - created_at).total_seconds() / 3600  # Hours
-                            
-                            if assigned_to not in total_completion_time:
-                                total_completion_time[assigned_to] = []
-                            
-                            total_completion_time[assigned_to].append(completion_time)
-                        except:
-                            pass
-                
-                if status == 'Overdue':
-                    user_metrics[assigned_to]['overdue_tasks'] += 1
-        
-        # Calculate completion rates and average completion times
-        for user_id, metrics in user_metrics.items():
-            if metrics['total_tasks'] > 0:
-                metrics['completion_rate'] = round((metrics['completed_tasks'] / metrics['total_tasks']) * 100, 2)
+            users = users_future.result() if users_future else []
+            tasks = tasks_future.result() if tasks_future else []
+        
+        dashboard = {}
+        
+        if 'users' in sections:
+            dashboard['users'] = {
+                'users': users,
+                'count': len(users)
+            }
+        
+        if 'overview' in sections:
+            dashboard['overview'] = task_counters.to_overview(task_counters.count_tasks(tasks))
+        
+        if 'deadlines' in sections:
+            today = datetime.now().date()
+            today_str = today.isoformat()
+            end_date_str = (today + timedelta(days=days)).isoformat()
             
-            if user_id in total_completion_time and total_completion_time[user_id]:
-                avg_time = sum(total_completion_time[user_id]) / len(total_completion_time[user_id])
-                metrics['average_completion_time'] = round(avg_time, 2)
+            upcoming = sorted(
+                (task for task in tasks
+                 if task.get('Status') != 'Completed' and today_str <= task.get('Deadline', '') <= end_date_str),
+                key=lambda task: task['Deadline']
+            )
+            dashboard['deadlines'] = {
+                'tasks': upcoming,
+                'count': len(upcoming),
+                'date_range': {
+                    'start': today_str,
+                    'end': end_date_str
+                }
+            }
         
-        # Convert to list
-        metrics_list = list(user_metrics.values())
+        if 'performance' in sections:
+            dashboard['performance'] = build_performance(tasks, users)
         
-        # Return performance metrics
-        return response.success({
-            'team_metrics': metrics_list,
-            'count': len(metrics_list)
+        # Return dashboard
+        return response.success(dashboard)
+        
+    except Exception as e:
+        print(f"Get dashboard error: {str(e)}")
+        return response.server_error(str(e))
+
+def create_export(event):
+    """
+    Start an asynchronous report export.
+    
+    The export runs in the export function, or in a background thread when
+    no export function is configured (local development).
+    """
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    # Check if user is admin
+    if user['role'] != 'admin':
+        return response.forbidden("Only admins can access this endpoint")
+    
+    try:
+        # Parse request body
+        body = json.loads(event['body'] or '{}')
+        
+        report = body.get('report', 'tasks')
+        if report not in export.REPORTS:
+            return response.bad_request("Invalid report. Must be 'tasks' or 'performance'")
+        
+        file_format = body.get('format', 'csv')
+        if file_format not in export.FORMATS:
+            return response.bad_request("Invalid format. Must be 'csv' or 'parquet'")
+        
+        job = export.create_job(report, file_format, user['user_id'])
+        
+        if export_function:
+            lambda_client.invoke(
+                FunctionName=export_function,
+                InvocationType='Event',
+                Payload=json.dumps({'job_id': job['JobID']})
+            )
+        else:
+            threading.Thread(target=export.run_job, args=(job['JobID'],), daemon=True).start()
+        
+        # Return the job to poll
+        return response.created({
+            'job_id': job['JobID'],
+            'report': report,
+            'format': file_format,
+            'status': job['Status']
         })
         
     except Exception as e:
-        print(f"Get performance metrics error: {str(e)}")
-        return response.server_error(str(e))
\ No newline at end of file
+        print(f"Create export error: {str(e)}")
+        return response.server_error(str(e))
+
+def get_export(event):
+    """Get the status of an export job, with a download URL once it completes."""
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    # Check if user is admin
+    if user['role'] != 'admin':
+        return response.forbidden("Only admins can access this endpoint")
+    
+    try:
+        # Extract job ID from path
+        job_id = event['pathParameters']['jobId']
+        
+        result = stats_table.get_item(Key=export.job_key(job_id))
+        
+        if 'Item' not in result:
+            return response.not_found("Export job not found")
+        
+        job = result['Item']
+        
+        status = {
+            'job_id': job['JobID'],
+            'report': job['Report'],
+            'format': job['Format'],
+            'status': job['Status'],
+            'created_at': job['CreatedAt'],
+            'completed_at': job.get('CompletedAt')
+        }
+        
+        if job['Status'] == 'Completed':
+            status['row_count'] = int(job['RowCount'])
+            status['download_url'] = export.get_storage().url(job['Location'])
+        elif job['Status'] == 'Failed':
+            status['error'] = job.get('Error', '')
+        
+        # Return job status
+        return response.success(status)
+        
+    except Exception as e:
+        print(f"Get export error: {str(e)}")
+        return response.server_error(str(e))
@@ -0,0 +1,195 @@
+"""
+Daily task rollups for the Task Management System.
+
+This function is triggered by EventBridge shortly after midnight and adds
+each finished day to the Rollups table: the number of tasks created,
+completed and overdue that day for the team, each user and each department.
+Days already rolled up are never recomputed, so trend queries only read
+rollup rows.
+
+Each day's tasks are read from the CreatedDayIndex, CompletedDayIndex and
+OpenDeadlineIndex partitions for that day, so a run reads only the tasks
+it counts instead of scanning the Tasks table.
+"""
+import os
+import json
+import boto3
+from datetime import datetime, date, timedelta
+from boto3.dynamodb.conditions import Key
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
+tasks_table = dynamodb.Table(os.environ.get('TASKS_TABLE'))
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+rollups_table = dynamodb.Table(os.environ.get('ROLLUPS_TABLE'))
+
+CHECKPOINT_KEY = {'StatID': 'rollup_checkpoint'}
+
+# Days rolled up by the first run, and at most by any run
+BACKFILL_DAYS = int(os.environ.get('ROLLUP_BACKFILL_DAYS', 30))
+MAX_DAYS_PER_RUN = 31
+
+COUNT_FIELDS = ['Created', 'Completed', 'Overdue']
+TEAM_SCOPE = 'team'
+
+def user_scope(user_id):
+    """Get the rollup scope of a user."""
+    return f"user#{user_id}"
+
+def department_scope(department):
+    """Get the rollup scope of a department."""
+    return f"department#{department}"
+
+def pending_days(today):
+    """
+    Get the finished days that have not been rolled up yet.
+
+    Args:
+        today (date): Current date
+
+    Returns:
+        list: Dates (YYYY-MM-DD) in order, oldest first
+    """
+    result = stats_table.get_item(Key=CHECKPOINT_KEY)
+
+    if 'Item' in result:
+        day = date.fromisoformat(result['Item']['LastDay']) + timedelta(days=1)
+    else:
+        day = today - timedelta(days=BACKFILL_DAYS)
+
+    days = []
+    while day < today and len(days) < MAX_DAYS_PER_RUN:
+        days.append(day.isoformat())
+        day += timedelta(days=1)
+
+    return days
+
+def paginate(operation, **kwargs):
+    """Yield every item of a scan or query, following pagination."""
+    while True:
+        result = operation(**kwargs)
+        yield from result.get('Items', [])
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        kwargs['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def get_departments():
+    """Get the department of every user that has one."""
+    return {
+        user['UserID']: user['Department']
+        for user in paginate(users_table.scan, ProjectionExpression='UserID, Department')
+        if user.get('Department')
+    }
+
+def query_day(index_name, key, day):
+    """Get the tasks in one day's partition of a day-keyed index."""
+    return list(paginate(
+        tasks_table.query,
+        IndexName=index_name,
+        KeyConditionExpression=Key(key).eq(day),
+        ProjectionExpression='AssignedTo'
+    ))
+
+def query_created(day):
+    """Get the tasks created on a day."""
+    return query_day('CreatedDayIndex', 'CreatedDay', day)
+
+def query_completed(day):
+    """Get the tasks completed on a day."""
+    return query_day('CompletedDayIndex', 'CompletedDay', day)
+
+def query_overdue(day):
+    """Get the tasks still open whose deadline fell on a day."""
+    return query_day('OpenDeadlineIndex', 'DeadlineBucket', day)
+
+def build_rollups(days, tasks_by_day, departments):
+    """
+    Aggregate tasks into rollup rows.
+
+    Args:
+        days (list): Dates being rolled up
+        tasks_by_day (dict): Count field mapped to a dict of date mapped to
+            the tasks counted in that field on that day
+        departments (dict): UserID mapped to department
+
+    Returns:
+        list: Rollup rows, one per scope and day with any activity, plus a
+            team row for every day
+    """
+    rollups = {}
+
+    def add(day, assigned_to, field):
+        scopes = [TEAM_SCOPE]
+        if assigned_to:
+            scopes.append(user_scope(assigned_to))
+            if assigned_to in departments:
+                scopes.append(department_scope(departments[assigned_to]))
+
+        for scope in scopes:
+            counts = rollups.setdefault((scope, day), dict.fromkeys(COUNT_FIELDS, 0))
+            counts[field] += 1
+
+    for field, day_tasks in tasks_by_day.items():
+        for day, tasks in day_tasks.items():
+            for task in tasks:
+                add(day, task.get('AssignedTo'), field)
+
+    # Team rows are written for every day so trends have no gaps
+    for day in days:
+        rollups.setdefault((TEAM_SCOPE, day), dict.fromkeys(COUNT_FIELDS, 0))
+
+    return [
+        {'Scope': scope, 'Day': day, **counts}
+        for (scope, day), counts in sorted(rollups.items())
+    ]
+
+def lambda_handler(event, context):
+    """
+    Roll up the finished days since the last run.
+
+    This function is triggered by EventBridge on a schedule.
+    """
+    try:
+        days = pending_days(datetime.now().date())
+
+        if not days:
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': "Rollups are up to date"
+                })
+            }
+
+        departments = get_departments()
+        tasks_by_day = {
+            'Created': {day: query_created(day) for day in days},
+            'Completed': {day: query_completed(day) for day in days},
+            'Overdue': {day: query_overdue(day) for day in days}
+        }
+        rows = build_rollups(days, tasks_by_day, departments)
+
+        with rollups_table.batch_writer() as batch:
+            for row in rows:
+                batch.put_item(Item=row)
+
+        # Only advance the checkpoint once every row is written
+        stats_table.put_item(Item={**CHECKPOINT_KEY, 'LastDay': days[-1]})
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': f"Rolled up {len(days)} days into {len(rows)} rows",
+                'days': days
+            })
+        }
+
+    except Exception as e:
+        print(f"Daily rollup error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': f"Error rolling up tasks: {str(e)}"
+            })
+        }
@@ -0,0 +1,358 @@
+"""
+Asynchronous report exports for the Task Management System.
+
+Admins start an export through POST /admin/exports. The job record is kept
+in the Stats table and this module runs the job: the table is read with a
+parallel scan whose pages flow through a bounded queue and a generator
+pipeline into a CSV or Parquet file written in row groups, so memory stays
+bounded however large the table is. Files are written to S3 when
+EXPORT_BUCKET is set and to the local filesystem otherwise.
+"""
+import os
+import io
+import csv
+import json
+import uuid
+import queue
+import tempfile
+import threading
+import itertools
+import boto3
+from contextlib import contextmanager
+from datetime import datetime
+from boto3.dynamodb.types import TypeDeserializer
+from . import metrics
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
+tasks_table = dynamodb.Table(os.environ.get('TASKS_TABLE'))
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+
+# The low-level client is thread-safe, unlike resource objects
+client = dynamodb.meta.client
+deserializer = TypeDeserializer()
+
+SCAN_SEGMENTS = int(os.environ.get('EXPORT_SEGMENTS', 4))
+ROW_GROUP_SIZE = 10000
+
+# Pages buffered between the scan threads and the writer
+QUEUE_PAGES = 8
+
+FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+TASK_COLUMNS = [
+    ('TaskID', 'string'),
+    ('Title', 'string'),
+    ('Description', 'string'),
+    ('Priority', 'string'),
+    ('Status', 'string'),
+    ('AssignedTo', 'string'),
+    ('CreatedBy', 'string'),
+    ('CreatedAt', 'string'),
+    ('Deadline', 'string'),
+    ('CompletedAt', 'string'),
+    ('Notes', 'string')
+]
+
+PERFORMANCE_COLUMNS = [
+    ('user_id', 'string'),
+    ('name', 'string'),
+    ('email', 'string'),
+    ('total_tasks', 'int'),
+    ('completed_tasks', 'int'),
+    ('overdue_tasks', 'int'),
+    ('completion_rate', 'float'),
+    ('average_completion_time', 'float')
+]
+
+def job_key(job_id):
+    """Get the Stats table key of an export job."""
+    return {'StatID': f"export_job#{job_id}"}
+
+class LocalStorage:
+    """Stores export files in a local directory, for development and tests."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @contextmanager
+    def open(self, key):
+        """Open a file for writing the export."""
+        path = os.path.join(self.directory, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as output:
+            yield output
+
+    def url(self, key):
+        """Get the location of an export file."""
+        return os.path.abspath(os.path.join(self.directory, key))
+
+class S3Storage:
+    """Stores export files in an S3 bucket."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.s3 = boto3.client('s3')
+
+    @contextmanager
+    def open(self, key):
+        """Open a file for writing the export, uploaded once it is closed."""
+        with tempfile.TemporaryFile() as output:
+            yield output
+            output.seek(0)
+            self.s3.upload_fileobj(output, self.bucket, key)
+
+    def url(self, key, expires_in=3600):
+        """Get a presigned download URL for an export file."""
+        return self.s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': key},
+            ExpiresIn=expires_in
+        )
+
+def get_storage():
+    """Get the configured storage backend."""
+    if os.environ.get('EXPORT_BUCKET'):
+        return S3Storage(os.environ['EXPORT_BUCKET'])
+    return LocalStorage(os.environ.get('EXPORT_DIR', 'exports'))
+
+def parallel_scan(table_name, total_segments=SCAN_SEGMENTS, **kwargs):
+    """
+    Yield every item of a table, scanning segments in parallel.
+
+    Scan threads hand pages over through a bounded queue, so at most
+    QUEUE_PAGES pages are held in memory while the consumer catches up.
+
+    Args:
+        table_name (str): Table to scan
+        total_segments (int): Number of parallel scan segments
+        **kwargs: Further scan parameters, such as ProjectionExpression
+
+    Yields:
+        dict: Deserialized items
+    """
+    pages = queue.Queue(maxsize=QUEUE_PAGES)
+    stop = threading.Event()
+    finished = object()
+
+    def put(page):
+        # Give up once the consumer has stopped reading
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan_segment(segment):
+        scan_params = dict(kwargs, TableName=table_name, Segment=segment, TotalSegments=total_segments)
+        try:
+            while True:
+                result = client.scan(**scan_params)
+                if not put(result.get('Items', [])):
+                    return
+                if 'LastEvaluatedKey' not in result:
+                    break
+                scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+        except Exception as e:
+            put(e)
+        finally:
+            put(finished)
+
+    threads = [
+        threading.Thread(target=scan_segment, args=(segment,), daemon=True)
+        for segment in range(total_segments)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        remaining = total_segments
+        while remaining:
+            page = pages.get()
+            if page is finished:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                for item in page:
+                    yield {key: deserializer.deserialize(value) for key, value in item.items()}
+    finally:
+        stop.set()
+
+def batched(rows, size):
+    """Yield lists of up to size rows."""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def normalize(row, columns):
+    """Convert a row's values to its columns' types."""
+    converters = {'string': str, 'int': int, 'float': float}
+    return {
+        name: None if row.get(name) is None else converters[column_type](row[name])
+        for name, column_type in columns
+    }
+
+def task_rows():
+    """Yield every task as an export row."""
+    projection = ', '.join(f"#c{index}" for index in range(len(TASK_COLUMNS)))
+    names = {f"#c{index}": name for index, (name, _) in enumerate(TASK_COLUMNS)}
+
+    for task in parallel_scan(tasks_table.name, ProjectionExpression=projection, ExpressionAttributeNames=names):
+        yield normalize(task, TASK_COLUMNS)
+
+def performance_rows():
+    """Yield the performance metrics of every team member as export rows."""
+    users = list(parallel_scan(users_table.name, ProjectionExpression='UserID, #name, Email, #role',
+                               ExpressionAttributeNames={'#name': 'Name', '#role': 'Role'}))
+    metrics_list = metrics.init_user_metrics(users)
+    user_index = {item['user_id']: index for index, item in enumerate(metrics_list)}
+
+    # Aggregate the tasks as they are scanned
+    tasks = parallel_scan(
+        tasks_table.name,
+        ProjectionExpression='AssignedTo, #status, CreatedAt, CompletedAt',
+        ExpressionAttributeNames={'#status': 'Status'}
+    )
+    metrics.finalize_user_metrics(metrics_list, metrics.aggregate_tasks(tasks, user_index))
+
+    for item in metrics_list:
+        yield normalize(item, PERFORMANCE_COLUMNS)
+
+REPORTS = {
+    'tasks': (task_rows, TASK_COLUMNS),
+    'performance': (performance_rows, PERFORMANCE_COLUMNS)
+}
+
+def write_csv(rows, columns, output):
+    """
+    Write rows to a CSV file.
+
+    Returns:
+        int: Number of rows written
+    """
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.DictWriter(text, fieldnames=[name for name, _ in columns])
+    writer.writeheader()
+
+    count = 0
+    for batch in batched(rows, ROW_GROUP_SIZE):
+        writer.writerows(batch)
+        count += len(batch)
+
+    text.flush()
+    text.detach()
+    return count
+
+def write_parquet(rows, columns, output):
+    """
+    Write rows to a Parquet file, one row group per batch.
+
+    Returns:
+        int: Number of rows written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet exports require pyarrow")
+
+    types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+    schema = pa.schema([(name, types[column_type]) for name, column_type in columns])
+
+    count = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        for batch in batched(rows, ROW_GROUP_SIZE):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+
+    return count
+
+WRITERS = {'csv': write_csv, 'parquet': write_parquet}
+
+def create_job(report, file_format, requested_by):
+    """
+    Record a new export job.
+
+    Args:
+        report (str): Report to export (tasks or performance)
+        file_format (str): csv or parquet
+        requested_by (str): UserID of the admin
+
+    Returns:
+        dict: Job record
+    """
+    job_id = str(uuid.uuid4())
+    job = {
+        **job_key(job_id),
+        'JobID': job_id,
+        'Report': report,
+        'Format': file_format,
+        'Status': 'Pending',
+        'RequestedBy': requested_by,
+        'CreatedAt': datetime.now().isoformat()
+    }
+    stats_table.put_item(Item=job)
+    return job
+
+def update_job(job_id, **attributes):
+    """Set attributes of an export job."""
+    names = {f"#a{index}": name for index, name in enumerate(attributes)}
+    values = {f":a{index}": value for index, value in enumerate(attributes.values())}
+
+    stats_table.update_item(
+        Key=job_key(job_id),
+        UpdateExpression="set " + ", ".join(f"#a{index} = :a{index}" for index in range(len(attributes))),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values
+    )
+
+def run_job(job_id):
+    """
+    Run an export job and record its outcome.
+
+    Args:
+        job_id (str): Export job ID
+    """
+    try:
+        job = stats_table.get_item(Key=job_key(job_id))['Item']
+        update_job(job_id, Status='Running')
+
+        rows, columns = REPORTS[job['Report']]
+        location = f"exports/{job['Report']}-{job_id}.{job['Format']}"
+
+        with get_storage().open(location) as output:
+            count = WRITERS[job['Format']](rows(), columns, output)
+
+        update_job(
+            job_id,
+            Status='Completed',
+            Location=location,
+            RowCount=count,
+            CompletedAt=datetime.now().isoformat()
+        )
+
+    except Exception as e:
+        print(f"Export job error: {str(e)}")
+        update_job(job_id, Status='Failed', Error=str(e), CompletedAt=datetime.now().isoformat())
+
+def lambda_handler(event, context):
+    """
+    Run an export job.
+
+    This function is invoked asynchronously by the admin API with the job ID.
+    """
+    run_job(event['job_id'])
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': f"Export job {event['job_id']} finished"
+        })
+    }
@@ -0,0 +1,135 @@
+"""
+Performance metrics engine for the admin API.
+
+Per-user totals are accumulated in a single pass over the tasks, so tasks
+can be streamed straight from a scan without being held in memory.
+"""
+from datetime import datetime
+
+def completion_hours(task):
+    """
+    Get the hours a completed task took from creation to completion.
+
+    Args:
+        task (dict): Task item
+
+    Returns:
+        float: Completion time in hours, None if a timestamp is missing or invalid
+    """
+    try:
+        completed_at = datetime.fromisoformat(task['CompletedAt'])
+        created_at = datetime.fromisoformat(task['CreatedAt'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return (completed_at - created_at).total_seconds() / 3600
+
+def init_user_metrics(users):
+    """
+    Create zeroed metrics for every team member.
+
+    Args:
+        users (iterable): User items
+
+    Returns:
+        list: Metrics for each team member, in the order of the users
+    """
+    return [
+        {
+            'user_id': user_item.get('UserID'),
+            'name': user_item.get('Name', ''),
+            'email': user_item.get('Email', ''),
+            'total_tasks': 0,
+            'completed_tasks': 0,
+            'overdue_tasks': 0,
+            'completion_rate': 0,
+            'average_completion_time': 0
+        }
+        for user_item in users
+        if user_item.get('Role') == 'team_member'
+    ]
+
+def aggregate_tasks(tasks, user_index):
+    """
+    Compute per-user totals in one pass over the tasks.
+
+    Args:
+        tasks (iterable): Task items
+        user_index (dict): UserID mapped to its position in the metrics list
+
+    Returns:
+        dict: Lists of total, completed and overdue task counts, timed
+            completion counts and summed completion hours per user
+    """
+    size = len(user_index)
+    totals = {
+        'total': [0] * size,
+        'completed': [0] * size,
+        'overdue': [0] * size,
+        'timed': [0] * size,
+        'hours': [0.0] * size
+    }
+    total, completed, overdue = totals['total'], totals['completed'], totals['overdue']
+    timed, hours = totals['timed'], totals['hours']
+
+    for task in tasks:
+        # Only tasks assigned to a team member count
+        index = user_index.get(task.get('AssignedTo'))
+        if index is None:
+            continue
+
+        total[index] += 1
+        status = task.get('Status')
+
+        if status == 'Completed':
+            completed[index] += 1
+
+            task_hours = completion_hours(task)
+            if task_hours is not None:
+                timed[index] += 1
+                hours[index] += task_hours
+        elif status == 'Overdue':
+            overdue[index] += 1
+
+    return totals
+
+def finalize_user_metrics(metrics_list, totals):
+    """
+    Fill in the metrics list from aggregated totals.
+
+    Args:
+        metrics_list (list): Metrics from init_user_metrics
+        totals (dict): Totals from aggregate_tasks
+
+    Returns:
+        list: The completed metrics list
+    """
+    for index, metrics in enumerate(metrics_list):
+        metrics['total_tasks'] = totals['total'][index]
+        metrics['completed_tasks'] = totals['completed'][index]
+        metrics['overdue_tasks'] = totals['overdue'][index]
+        if totals['total'][index]:
+            metrics['completion_rate'] = round(totals['completed'][index] / totals['total'][index] * 100, 2)
+        if totals['timed'][index]:
+            metrics['average_completion_time'] = round(totals['hours'][index] / totals['timed'][index], 2)
+
+    return metrics_list
+
+def compute_user_metrics(tasks, users):
+    """
+    Compute per-user performance metrics for team members.
+
+    Args:
+        tasks (iterable): Task items
+        users (list): User items
+
+    Returns:
+        list: Metrics for each team member, in the order of the users list
+    """
+    metrics_list = init_user_metrics(users)
+
+    if not metrics_list:
+        return metrics_list
+
+    user_index = {metrics['user_id']: index for index, metrics in enumerate(metrics_list)}
+    return finalize_user_metrics(metrics_list, aggregate_tasks(tasks, user_index))
@@ -0,0 +1,157 @@
+"""
+Task counter reconciliation for the Task Management System.
+
+This function is triggered by EventBridge to repair drift in the task
+counters, recounting the Tasks table with a parallel scan.
+"""
+import os
+import json
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+import sys
+
+# Add parent directory to path to import common modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import task_counters
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+
+# The low-level client is thread-safe, unlike resource objects
+client = dynamodb.meta.client
+tasks_table_name = os.environ.get('TASKS_TABLE')
+
+TOTAL_SEGMENTS = int(os.environ.get('RECONCILE_SEGMENTS', 4))
+
+# Recounts to attempt when task writes change the counters during the scan
+RECONCILE_ATTEMPTS = 3
+
+# Counters item attributes that are not task counts
+METADATA_ATTRIBUTES = set(task_counters.COUNTERS_KEY) | {'Version'}
+
+deserializer = TypeDeserializer()
+
+def scan_segment(segment):
+    """Yield the status and priority of every task in a scan segment."""
+    scan_params = {
+        'TableName': tasks_table_name,
+        'Segment': segment,
+        'TotalSegments': TOTAL_SEGMENTS,
+        'ProjectionExpression': '#status, Priority',
+        'ExpressionAttributeNames': {'#status': 'Status'}
+    }
+
+    while True:
+        result = client.scan(**scan_params)
+
+        for item in result.get('Items', []):
+            yield {key: deserializer.deserialize(value) for key, value in item.items()}
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def count_segment(segment):
+    """Count the tasks of a scan segment."""
+    return task_counters.count_tasks(scan_segment(segment))
+
+def recount():
+    """Count all scan segments in parallel into a counters item."""
+    with ThreadPoolExecutor(max_workers=TOTAL_SEGMENTS) as executor:
+        segment_counts = list(executor.map(count_segment, range(TOTAL_SEGMENTS)))
+
+    counters = dict(task_counters.COUNTERS_KEY)
+    for counts in segment_counts:
+        for name, value in counts.items():
+            if name not in task_counters.COUNTERS_KEY:
+                counters[name] = counters.get(name, 0) + value
+
+    return counters
+
+def replace_counters(counters, version):
+    """
+    Overwrite the counters unless a task write has bumped their version.
+
+    Args:
+        counters (dict): Recounted counters item
+        version (int): Counters version read before the scan, None if absent
+
+    Returns:
+        bool: False if the counters changed since they were read
+    """
+    if version is None:
+        condition = {'ConditionExpression': 'attribute_not_exists(Version)'}
+    else:
+        condition = {
+            'ConditionExpression': 'Version = :version',
+            'ExpressionAttributeValues': {':version': version}
+        }
+
+    try:
+        stats_table.put_item(Item={**counters, 'Version': (version or 0) + 1}, **condition)
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+    return True
+
+def lambda_handler(event, context):
+    """
+    Recount the tasks and overwrite the counters if they have drifted.
+
+    Task writes bump the counters' version, so the overwrite is conditional
+    on the version read before the scan. If tasks were written meanwhile,
+    the scan may have missed them and the tasks are recounted.
+
+    This function is triggered by EventBridge on a schedule.
+    """
+    try:
+        for attempt in range(RECONCILE_ATTEMPTS):
+            result = stats_table.get_item(Key=task_counters.COUNTERS_KEY, ConsistentRead=True)
+            current = result.get('Item', {})
+            version = current.get('Version')
+
+            counters = recount()
+
+            drift = {
+                name: value - int(current.get(name, 0))
+                for name, value in counters.items()
+                if name not in METADATA_ATTRIBUTES and value != int(current.get(name, 0))
+            }
+
+            if not drift:
+                break
+
+            if replace_counters(counters, version):
+                print(f"Repaired task counter drift: {drift}")
+                break
+
+            print(f"Task counters changed during recount {attempt + 1}")
+        else:
+            return {
+                'statusCode': 409,
+                'body': json.dumps({
+                    'message': f"Task counters changed during {RECONCILE_ATTEMPTS} recounts, left for the next run"
+                })
+            }
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': f"Reconciled {counters['TotalTasks']} tasks",
+                'drift': drift
+            })
+        }
+
+    except Exception as e:
+        print(f"Reconcile counters error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': f"Error reconciling task counters: {str(e)}"
+            })
+        }
@@ -0,0 +1,94 @@
+"""
+In-process stale-while-revalidate cache for the admin analytics endpoints.
+
+A cached value is fresh for its TTL. For a further stale window it is still
+served, while a background thread recomputes it; only one refresh per key
+runs at a time. Older values are recomputed before responding, and
+concurrent callers wait for that one computation instead of repeating it.
+
+Lambda freezes a container between invocations, so a background refresh
+started late in one invocation finishes during the next.
+"""
+import time
+import threading
+
+class StaleWhileRevalidateCache:
+    """Caches computed values by key, refreshing stale ones in the background."""
+
+    def __init__(self, ttl, stale_window, max_entries=64):
+        """
+        Args:
+            ttl (float): Seconds a value is fresh
+            stale_window (float): Further seconds a value is served while it refreshes
+            max_entries (int): Values kept before the oldest is evicted
+        """
+        self.ttl = ttl
+        self.stale_window = stale_window
+        self.max_entries = max_entries
+        self.entries = {}
+        self.refreshing = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Get a cached value, computing it if needed.
+
+        Args:
+            key: Cache key
+            compute (callable): Computes the value, called without arguments
+
+        Returns:
+            The fresh or stale cached value, or the newly computed one
+        """
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                age = time.monotonic() - entry['computed_at'] if entry else None
+
+                if entry and age < self.ttl:
+                    return entry['value']
+
+                if entry and age < self.ttl + self.stale_window:
+                    if key not in self.refreshing:
+                        self.refreshing[key] = threading.Event()
+                        threading.Thread(target=self.refresh, args=(key, compute), daemon=True).start()
+                    return entry['value']
+
+                # Missing or too stale: compute now, or wait for the refresh in flight
+                refresh = self.refreshing.get(key)
+                if refresh is None:
+                    self.refreshing[key] = threading.Event()
+
+            if refresh is None:
+                return self.refresh(key, compute, raise_errors=True)
+
+            # Check again once the refresh has finished, computing if it failed
+            refresh.wait()
+
+    def refresh(self, key, compute, raise_errors=False):
+        """Compute a value and store it, then release the key's refresh."""
+        try:
+            value = compute()
+
+            with self.lock:
+                if key not in self.entries and len(self.entries) >= self.max_entries:
+                    oldest = min(self.entries, key=lambda cached: self.entries[cached]['computed_at'])
+                    del self.entries[oldest]
+                self.entries[key] = {'value': value, 'computed_at': time.monotonic()}
+
+            return value
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            # Keep serving the stale value; the next request retries
+            print(f"Cache refresh error: {str(e)}")
+
+        finally:
+            with self.lock:
+                self.refreshing.pop(key).set()
+
+    def clear(self):
+        """Drop every cached value."""
+        with self.lock:
+            self.entries.clear()
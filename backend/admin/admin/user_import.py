@@ -0,0 +1,278 @@
+"""
+Bulk user import for the Task Management System.
+
+Streams users from a CSV or NDJSON file, creates them in Cognito through a
+rate-limited thread pool and writes their profiles with a batch writer.
+
+Usage (from the backend/admin directory):
+    python -m admin.user_import users.csv --checkpoint users.checkpoint
+"""
+import os
+import io
+import csv
+import json
+import time
+import argparse
+import threading
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import sys
+
+# Add parent directory to path to import common modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import auth
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
+
+# The low-level client is thread-safe, unlike resource objects
+client = dynamodb.meta.client
+
+# Each user costs one AdminCreateUser and one AdminSetUserPassword call, so
+# the rate is kept below the default Cognito quota of both operations
+USERS_PER_SECOND = float(os.environ.get('IMPORT_USERS_PER_SECOND', 20))
+MAX_WORKERS = int(os.environ.get('IMPORT_MAX_WORKERS', 8))
+
+# Rows are processed in chunks; the checkpoint only advances once every
+# row of a chunk has been created and its profile written
+CHUNK_SIZE = 100
+
+REQUIRED_FIELDS = ['username', 'email', 'password', 'name']
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of upstream calls."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+def read_users(stream, file_format):
+    """
+    Lazily parse users from a CSV or NDJSON stream.
+
+    Args:
+        stream: Text stream
+        file_format (str): 'csv' or 'ndjson'
+
+    Yields:
+        dict: User fields with lower-case keys, or an 'error' for a line
+            that is not a JSON object
+    """
+    if file_format == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+    elif file_format == 'ndjson':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                user = json.loads(line)
+            except ValueError as e:
+                yield {'error': f"Invalid JSON: {str(e)}"}
+                continue
+            if not isinstance(user, dict):
+                yield {'error': "Invalid JSON: expected an object"}
+                continue
+            yield {key.lower(): value for key, value in user.items()}
+    else:
+        raise ValueError("Invalid format. Must be 'csv' or 'ndjson'")
+
+def profile_exists(user_id):
+    """Check whether a user's profile is in the Users table."""
+    result = client.get_item(
+        TableName=users_table.name,
+        Key={'UserID': {'S': user_id}},
+        ProjectionExpression='UserID'
+    )
+    return 'Item' in result
+
+def create_user(row, bucket):
+    """
+    Validate a row and create the user in Cognito.
+
+    A user already in Cognito is skipped, unless an earlier run created it
+    but stopped before writing its profile; the profile is written then.
+
+    Returns:
+        dict: Users table item if created, error message otherwise
+    """
+    if 'error' in row:
+        return {'error': row['error']}
+
+    for field in REQUIRED_FIELDS:
+        if not row.get(field):
+            return {'error': f"Missing required field: {field}"}
+
+    role = row.get('role') or 'team_member'
+    if role not in ['admin', 'team_member']:
+        return {'error': "Invalid role. Must be 'admin' or 'team_member'"}
+
+    bucket.acquire()
+    user_result = auth.admin_create_user(row['username'], row['email'], row['password'], role, row['name'])
+
+    if user_result.get('error') == 'User already exists':
+        # Profiles are keyed by the Cognito user's generated ID, which tokens
+        # carry as user_id, not by the username from the file
+        bucket.acquire()
+        existing = auth.admin_get_user(row['username'])
+        if 'error' in existing:
+            return existing
+        if profile_exists(existing['user_id']):
+            return user_result
+        user_result = existing
+    elif 'error' in user_result:
+        return user_result
+
+    current_time = datetime.now().isoformat()
+
+    user_item = {
+        'UserID': user_result['user_id'],
+        'Username': row['username'],
+        'Email': row['email'],
+        'Role': role,
+        'Name': row['name'],
+        'CreatedAt': current_time,
+        'LastLogin': current_time
+    }
+
+    # Department is an index key, and index keys can't be empty strings
+    if row.get('department'):
+        user_item['Department'] = row['department']
+
+    return user_item
+
+def import_users(rows, start=0, deadline=None, on_progress=None,
+                 users_per_second=USERS_PER_SECOND, max_workers=MAX_WORKERS):
+    """
+    Import users in rate-limited parallel chunks.
+
+    Args:
+        rows: Iterable of user dicts, e.g. from read_users
+        start (int): Index of the first row to import, used to resume a job
+        deadline (float): time.monotonic() value after which no new chunk is started
+        on_progress (callable): Called with the result summary after each chunk
+        users_per_second (float): Maximum Cognito user creations per second
+        max_workers (int): Number of concurrent Cognito requests
+
+    Returns:
+        dict: Counts, per-row failures and the row to resume from (None when complete)
+    """
+    bucket = TokenBucket(users_per_second)
+    summary = {
+        'created': 0,
+        'skipped': 0,
+        'failed': [],
+        'next_row': start
+    }
+
+    rows = iter(rows)
+
+    # Skip rows that were already imported
+    for _ in range(start):
+        if next(rows, None) is None:
+            break
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                return summary
+
+            chunk = [row for _, row in zip(range(CHUNK_SIZE), rows)]
+            if not chunk:
+                break
+
+            futures = [executor.submit(create_user, row, bucket) for row in chunk]
+
+            with users_table.batch_writer() as batch:
+                for index, (row, future) in enumerate(zip(chunk, futures)):
+                    row_number = summary['next_row'] + index
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'error': str(e)}
+
+                    if 'error' not in result:
+                        batch.put_item(Item=result)
+                        summary['created'] += 1
+                    elif result['error'] == 'User already exists':
+                        summary['skipped'] += 1
+                    else:
+                        summary['failed'].append({
+                            'row': row_number,
+                            'username': row.get('username', ''),
+                            'error': result['error']
+                        })
+
+            summary['next_row'] += len(chunk)
+
+            if on_progress:
+                on_progress(summary)
+
+    summary['next_row'] = None
+    return summary
+
+def main():
+    """Run a bulk import from the command line."""
+    parser = argparse.ArgumentParser(description='Bulk import users from a CSV or NDJSON file.')
+    parser.add_argument('file', help='Path to the CSV or NDJSON file')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='File format (defaults to the file extension)')
+    parser.add_argument('--checkpoint', help='File recording the row to resume from')
+    parser.add_argument('--rate', type=float, default=USERS_PER_SECOND, help='Maximum users created per second')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Number of concurrent Cognito requests')
+    args = parser.parse_args()
+
+    file_format = args.format or ('ndjson' if args.file.endswith(('.ndjson', '.jsonl')) else 'csv')
+
+    start = 0
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        with open(args.checkpoint) as f:
+            start = int(f.read().strip() or 0)
+        print(f"Resuming from row {start}")
+
+    def on_progress(summary):
+        if args.checkpoint:
+            with open(args.checkpoint, 'w') as f:
+                f.write(str(summary['next_row']))
+        print(f"Processed {summary['next_row']} rows: {summary['created']} created, "
+              f"{summary['skipped']} skipped, {len(summary['failed'])} failed")
+
+    with io.open(args.file, newline='', encoding='utf-8') as stream:
+        summary = import_users(
+            read_users(stream, file_format),
+            start=start,
+            on_progress=on_progress,
+            users_per_second=args.rate,
+            max_workers=args.workers
+        )
+
+    for failure in summary['failed']:
+        print(f"Row {failure['row']} ({failure['username']}): {failure['error']}")
+
+    print(f"Import complete: {summary['created']} created, {summary['skipped']} skipped, "
+          f"{len(summary['failed'])} failed")
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,7 @@ In production, the API is deployed as separate Lambda functions.
 """
 import os
 import json
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 import boto3
 from werkzeug.exceptions import HTTPException
 
@@ -15,6 +15,11 @@ from auth.auth.auth import lambda_handler as auth_handler
 from tasks.tasks.tasks import lambda_handler as tasks_handler
 from notifications.notifications.notifications import lambda_handler as notifications_handler
 from admin.admin.admin import lambda_handler as admin_handler
+from notifications.notifications import stream as notification_stream
+from notifications.notifications.local_topic import LocalTopic
+from tasks.tasks import tasks as tasks_module
+from notifications.notifications import notifications as notifications_module
+from common import auth, response as api_response
 
 app = Flask(__name__)
 
@@ -25,6 +30,10 @@ if not os.environ.get('TASKS_TABLE'):
     os.environ['TASKS_TABLE'] = 'Tasks-dev'
 if not os.environ.get('NOTIFICATIONS_TABLE'):
     os.environ['NOTIFICATIONS_TABLE'] = 'Notifications-dev'
+if not os.environ.get('STATS_TABLE'):
+    os.environ['STATS_TABLE'] = 'Stats-dev'
+if not os.environ.get('ROLLUPS_TABLE'):
+    os.environ['ROLLUPS_TABLE'] = 'Rollups-dev'
 if not os.environ.get('USER_POOL_ID'):
     os.environ['USER_POOL_ID'] = 'mock-user-pool-id'
 if not os.environ.get('USER_POOL_CLIENT_ID'):
@@ -32,6 +41,15 @@ if not os.environ.get('USER_POOL_CLIENT_ID'):
 if not os.environ.get('NOTIFICATION_TOPIC'):
     os.environ['NOTIFICATION_TOPIC'] = 'mock-notification-topic'
 
+# Store task notifications in this process instead of publishing them to SNS,
+# so the notification streams served here receive them
+tasks_module.sns = LocalTopic(
+    notifications_module.dynamodb,
+    notifications_module.notifications_table.name,
+    notifications_module.stats_table,
+    notifications_module.users_table.name
+)
+
 def create_event(request, path_params=None):
     """
     Create an API Gateway event from a Flask request.
@@ -76,6 +94,11 @@ def login():
     event = create_event(request)
     return process_response(auth_handler(event, None))
 
+@app.route('/auth/refresh', methods=['POST'])
+def refresh():
+    event = create_event(request)
+    return process_response(auth_handler(event, None))
+
 @app.route('/auth/profile', methods=['GET', 'PUT'])
 def profile():
     event = create_event(request)
@@ -87,6 +110,11 @@ def tasks():
     event = create_event(request)
     return process_response(tasks_handler(event, None))
 
+@app.route('/tasks/bulk', methods=['POST'])
+def tasks_bulk():
+    event = create_event(request)
+    return process_response(tasks_handler(event, None))
+
 @app.route('/tasks/<task_id>', methods=['GET', 'PUT', 'DELETE'])
 def task(task_id):
     event = create_event(request, {'taskId': task_id})
@@ -108,12 +136,44 @@ def notifications():
     event = create_event(request)
     return process_response(notifications_handler(event, None))
 
+@app.route('/notifications/unread-count', methods=['GET'])
+def notifications_unread_count():
+    event = create_event(request)
+    return process_response(notifications_handler(event, None))
+
+@app.route('/notifications/stream', methods=['GET'])
+def notifications_stream():
+    """
+    Stream the current user's new notifications and unread count changes
+    as Server-Sent Events.
+    """
+    event = create_event(request)
+    
+    # EventSource cannot set headers, so the token may be passed as ?token=
+    if request.args.get('token') and not request.headers.get('Authorization'):
+        event['headers']['Authorization'] = f"Bearer {request.args['token']}"
+    
+    user = auth.validate_token(event)
+    if not user:
+        return process_response(api_response.unauthorized())
+    
+    return app.response_class(
+        stream_with_context(notification_stream.events(user['user_id'])),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/notifications/read-all', methods=['PUT'])
+def notifications_read_all():
+    event = create_event(request)
+    return process_response(notifications_handler(event, None))
+
 @app.route('/notifications/<notification_id>/read', methods=['PUT'])
 def notification_read(notification_id):
     event = create_event(request, {'notificationId': notification_id})
     return process_response(notifications_handler(event, None))
 
-@app.route('/notifications/settings', methods=['PUT'])
+@app.route('/notifications/settings', methods=['GET', 'PUT'])
 def notification_settings():
     event = create_event(request)
     return process_response(notifications_handler(event, None))
@@ -124,6 +184,11 @@ def admin_users():
     event = create_event(request)
     return process_response(admin_handler(event, None))
 
+@app.route('/admin/users/import', methods=['POST'])
+def admin_users_import():
+    event = create_event(request)
+    return process_response(admin_handler(event, None))
+
 @app.route('/admin/tasks/overview', methods=['GET'])
 def admin_tasks_overview():
     event = create_event(request)
@@ -139,6 +204,26 @@ def admin_performance():
     event = create_event(request)
     return process_response(admin_handler(event, None))
 
+@app.route('/admin/trends', methods=['GET'])
+def admin_trends():
+    event = create_event(request)
+    return process_response(admin_handler(event, None))
+
+@app.route('/admin/dashboard', methods=['GET'])
+def admin_dashboard():
+    event = create_event(request)
+    return process_response(admin_handler(event, None))
+
+@app.route('/admin/exports', methods=['POST'])
+def admin_exports():
+    event = create_event(request)
+    return process_response(admin_handler(event, None))
+
+@app.route('/admin/exports/<job_id>', methods=['GET'])
+def admin_export(job_id):
+    event = create_event(request, {'jobId': job_id})
+    return process_response(admin_handler(event, None))
+
 # Error handling
 @app.errorhandler(HTTPException)
 def handle_exception(e):
@@ -3,16 +3,29 @@ Authentication API endpoints for the Task Management System.
 """
 import os
 import json
+import time
 import boto3
 import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+import sys
 
-# Import from local common module
-from common import response, auth
+# Add parent directory to path to import common modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import response, auth, user_directory
 
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+
+# Shared across warm invocations to overlap independent upstream calls
+executor = ThreadPoolExecutor(max_workers=2)
+
+# Attempts to sync token claims after a profile update, doubling the delay
+CLAIM_SYNC_ATTEMPTS = 3
+CLAIM_SYNC_DELAY = 0.1
 
 def lambda_handler(event, context):
     """
@@ -28,6 +41,8 @@ def lambda_handler(event, context):
         return register(event)
     elif http_method == 'POST' and path.endswith('/auth/login'):
         return login(event)
+    elif http_method == 'POST' and path.endswith('/auth/refresh'):
+        return refresh(event)
     elif http_method == 'GET' and path.endswith('/auth/profile'):
         return get_profile(event)
     elif http_method == 'PUT' and path.endswith('/auth/profile'):
@@ -60,8 +75,9 @@ def register(event):
         if role not in ['admin', 'team_member']:
             return response.bad_request("Invalid role. Must be 'admin' or 'team_member'")
         
-        # Create user in Cognito
-        user_result = auth.admin_create_user(username, email, password, role)
+        # Create user in Cognito; the password is set below, concurrently
+        # with the profile write, since both only need the created user
+        user_result = auth.admin_create_user(username, email, password, role, name, set_password=False)
         
         if 'error' in user_result:
             return response.bad_request(user_result['error'])
@@ -76,12 +92,29 @@ def register(event):
             'Email': email,
             'Role': role,
             'Name': name,
-            'Department': body.get('department', ''),
             'CreatedAt': current_time,
             'LastLogin': current_time
         }
         
-        users_table.put_item(Item=user_item)
+        # Department is an index key, and index keys can't be empty strings
+        if body.get('department'):
+            user_item['Department'] = body['department']
+        
+        password_future = executor.submit(auth.admin_set_user_password, username, password)
+        profile_future = executor.submit(users_table.put_item, Item=user_item)
+        
+        password_result = password_future.result()
+        profile_error = profile_future.exception()
+        
+        # Don't leave a half-registered user behind
+        if 'error' in password_result or profile_error:
+            rollback_registration(username, user_id, profile_error is None)
+            
+            if profile_error:
+                raise profile_error
+            return response.bad_request(password_result['error'])
+        
+        user_directory.bump_version(stats_table)
         
         # Return success response
         return response.created({
@@ -95,6 +128,18 @@ def register(event):
         print(f"Registration error: {str(e)}")
         return response.server_error(str(e))
 
+def rollback_registration(username, user_id, profile_written):
+    """Remove the Cognito user and profile of a partially failed registration."""
+    if profile_written:
+        try:
+            users_table.delete_item(Key={'UserID': user_id})
+        except Exception as e:
+            print(f"Failed to roll back profile for {user_id}: {str(e)}")
+    
+    delete_result = auth.admin_delete_user(username)
+    if 'error' in delete_result:
+        print(f"Failed to roll back Cognito user {username}: {delete_result['error']}")
+
 def login(event):
     """Handle user login."""
     try:
@@ -115,51 +160,106 @@ def login(event):
         if 'error' in auth_result:
             return response.unauthorized(auth_result['error'])
         
-        # Get user from DynamoDB
-        response_user = users_table.query(
-            IndexName='EmailIndex',
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('Email').eq(username)
-        )
+        # Build the profile from the ID token claims
+        user = auth.get_token_claims(auth_result['token'])
         
-        user = None
-        if response_user['Items']:
-            user = response_user['Items'][0]
-        else:
-            # Try by username
-            response_user = users_table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('Username').eq(username)
-            )
-            if response_user['Items']:
-                user = response_user['Items'][0]
+        if not user or not user.get('name'):
+            # Users created before the profile claims were issued
+            user = find_user(username)
         
         if not user:
             return response.not_found("User not found in database")
         
-        # Update last login time
-        users_table.update_item(
-            Key={'UserID': user['UserID']},
-            UpdateExpression="set LastLogin = :login_time",
-            ExpressionAttributeValues={':login_time': datetime.now().isoformat()}
-        )
+        # Update last login time, reading back the stored profile
+        try:
+            result = users_table.update_item(
+                Key={'UserID': user['user_id']},
+                UpdateExpression="set LastLogin = :login_time",
+                ConditionExpression="attribute_exists(UserID)",
+                ExpressionAttributeValues={':login_time': datetime.now().isoformat()},
+                ReturnValues='ALL_NEW'
+            )
+            
+            # Claims left stale by a failed sync must not override the profile
+            stored = result.get('Attributes', {})
+            if stored and (stored.get('Name'), stored.get('Role')) != (user['name'], user['role']):
+                print(f"Token claims of {user['user_id']} differ from the profile")
+                user = {**user, 'name': stored['Name'], 'role': stored['Role']}
+        except Exception as e:
+            print(f"Failed to update last login: {str(e)}")
         
         # Return success response with token
         return response.success({
             'token': auth_result['token'],
             'refresh_token': auth_result['refresh_token'],
             'expires_in': auth_result['expires_in'],
-            'user': {
-                'user_id': user['UserID'],
-                'username': user['Username'],
-                'email': user['Email'],
-                'role': user['Role'],
-                'name': user['Name']
-            }
+            'user': user
         })
         
     except Exception as e:
         print(f"Login error: {str(e)}")
         return response.server_error(str(e))
 
+def refresh(event):
+    """Exchange a refresh token for a new ID token."""
+    try:
+        # Parse request body
+        body = json.loads(event.get('body') or '{}')
+        
+        # Validate required fields
+        if 'refresh_token' not in body:
+            return response.bad_request("Missing refresh_token")
+        
+        # Refresh with Cognito
+        auth_result = auth.admin_refresh_auth(body['refresh_token'])
+        
+        if 'error' in auth_result:
+            return response.unauthorized(auth_result['error'])
+        
+        # Return success response with the new token
+        return response.success({
+            'token': auth_result['token'],
+            'expires_in': auth_result['expires_in']
+        })
+        
+    except Exception as e:
+        print(f"Refresh error: {str(e)}")
+        return response.server_error(str(e))
+
+def find_user(username):
+    """
+    Look up a user profile in DynamoDB by email or username.
+    
+    Returns:
+        dict: User profile in the login response format, None if not found
+    """
+    response_user = users_table.query(
+        IndexName='EmailIndex',
+        KeyConditionExpression=boto3.dynamodb.conditions.Key('Email').eq(username)
+    )
+    
+    user = None
+    if response_user['Items']:
+        user = response_user['Items'][0]
+    else:
+        # Try by username
+        response_user = users_table.scan(
+            FilterExpression=boto3.dynamodb.conditions.Attr('Username').eq(username)
+        )
+        if response_user['Items']:
+            user = response_user['Items'][0]
+    
+    if not user:
+        return None
+    
+    return {
+        'user_id': user['UserID'],
+        'username': user['Username'],
+        'email': user['Email'],
+        'role': user['Role'],
+        'name': user['Name']
+    }
+
 def get_profile(event):
     """Get user profile."""
     # Validate token
@@ -203,47 +303,94 @@ def update_profile(event):
         # Parse request body
         body = json.loads(event['body'])
         
-        # Get user from DynamoDB
-        result = users_table.get_item(Key={'UserID': user['user_id']})
-        
-        if 'Item' not in result:
-            return response.not_found("User not found")
-        
         # Update allowed fields
         update_expressions = []
         expression_values = {}
+        expression_names = {}
+        remove_expressions = []
+        condition_expression = "attribute_exists(UserID)"
         
         if 'name' in body:
-            update_expressions.append("Name = :name")
+            update_expressions.append("#name = :name")
+            expression_names['#name'] = 'Name'
             expression_values[':name'] = body['name']
             
-        if 'department' in body:
+        if body.get('department'):
             update_expressions.append("Department = :department")
             expression_values[':department'] = body['department']
+        elif 'department' in body:
+            # Clearing the department removes the user from DepartmentIndex
+            remove_expressions.append("Department")
         
         # Only admins can update roles
         if 'role' in body and user['role'] == 'admin':
             if body['role'] not in ['admin', 'team_member']:
                 return response.bad_request("Invalid role. Must be 'admin' or 'team_member'")
-            update_expressions.append("Role = :role")
+            update_expressions.append("#role = :role")
+            expression_names['#role'] = 'Role'
             expression_values[':role'] = body['role']
+            
+            # The stored profile must still be an admin, not just the token
+            condition_expression += " AND #role = :admin_role"
+            expression_values[':admin_role'] = 'admin'
         
-        if not update_expressions:
+        if not update_expressions and not remove_expressions:
             return response.bad_request("No valid fields to update")
         
         # Build update expression
-        update_expression = "set " + ", ".join(update_expressions)
+        clauses = []
+        if update_expressions:
+            clauses.append("set " + ", ".join(update_expressions))
+        if remove_expressions:
+            clauses.append("remove " + ", ".join(remove_expressions))
+        update_expression = " ".join(clauses)
+        
+        update_params = {
+            'Key': {'UserID': user['user_id']},
+            'UpdateExpression': update_expression,
+            'ConditionExpression': condition_expression,
+            'ReturnValues': 'ALL_NEW',
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+        }
+        if expression_values:
+            update_params['ExpressionAttributeValues'] = expression_values
+        if expression_names:
+            update_params['ExpressionAttributeNames'] = expression_names
         
         # Update user in DynamoDB
-        users_table.update_item(
-            Key={'UserID': user['user_id']},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values
-        )
+        try:
+            updated_result = users_table.update_item(**update_params)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # The old item is only returned when the user exists
+            if 'Item' in e.response:
+                return response.forbidden("Only admins can update roles")
+            return response.not_found("User not found")
         
-        # Get updated user
-        updated_result = users_table.get_item(Key={'UserID': user['user_id']})
-        updated_user = updated_result['Item']
+        updated_user = updated_result['Attributes']
+        user_directory.bump_version(stats_table)
+        
+        # Keep the ID token claims in sync with the profile
+        claim_updates = {}
+        if ':name' in expression_values:
+            claim_updates['name'] = expression_values[':name']
+        if ':role' in expression_values:
+            claim_updates['custom:role'] = expression_values[':role']
+        
+        if claim_updates:
+            for attempt in range(CLAIM_SYNC_ATTEMPTS):
+                if attempt:
+                    time.sleep(CLAIM_SYNC_DELAY * 2 ** (attempt - 1))
+                claims_result = auth.admin_update_user_attributes(user['username'], claim_updates)
+                if 'error' not in claims_result:
+                    break
+            else:
+                # The profile is saved, so repeating the request retries the sync
+                print(f"Failed to update token claims: {claims_result['error']}")
+                return response.server_error(
+                    f"Profile updated but token claims could not be synced: {claims_result['error']}"
+                )
         
         # Return updated profile
         return response.success({
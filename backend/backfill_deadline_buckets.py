@@ -0,0 +1,57 @@
+"""
+Backfill script for the open task deadline index.
+
+Sets DeadlineBucket on open tasks created before OpenDeadlineIndex existed,
+so they show up in GET /admin/tasks/deadlines. Run once after deploying.
+
+Usage:
+    TASKS_TABLE=Tasks-dev python backfill_deadline_buckets.py
+"""
+import os
+import boto3
+from botocore.exceptions import ClientError
+
+def main():
+    """Backfill DeadlineBucket on open tasks."""
+    dynamodb = boto3.resource('dynamodb')
+    tasks_table = dynamodb.Table(os.environ.get('TASKS_TABLE'))
+
+    scan_params = {
+        'ProjectionExpression': 'TaskID, Deadline',
+        'FilterExpression': (
+            boto3.dynamodb.conditions.Attr('Status').ne('Completed') &
+            boto3.dynamodb.conditions.Attr('Deadline').exists() &
+            boto3.dynamodb.conditions.Attr('DeadlineBucket').not_exists()
+        )
+    }
+    updated = 0
+
+    while True:
+        result = tasks_table.scan(**scan_params)
+
+        for task in result.get('Items', []):
+            try:
+                # Skip tasks completed since the scan read them
+                tasks_table.update_item(
+                    Key={'TaskID': task['TaskID']},
+                    UpdateExpression="set DeadlineBucket = :deadline_bucket",
+                    ConditionExpression="#status <> :completed",
+                    ExpressionAttributeNames={'#status': 'Status'},
+                    ExpressionAttributeValues={
+                        ':deadline_bucket': task['Deadline'][:10],
+                        ':completed': 'Completed'
+                    }
+                )
+                updated += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+    print(f"Backfilled DeadlineBucket on {updated} tasks")
+
+if __name__ == '__main__':
+    main()
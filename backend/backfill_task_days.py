@@ -0,0 +1,58 @@
+"""
+Backfill script for the task day indexes.
+
+Sets CreatedDay, and CompletedDay on completed tasks, for tasks written
+before CreatedDayIndex and CompletedDayIndex existed, so the daily rollup
+counts them. Run once after deploying.
+
+Usage:
+    TASKS_TABLE=Tasks-dev python backfill_task_days.py
+"""
+import os
+import boto3
+
+def main():
+    """Backfill CreatedDay and CompletedDay on tasks."""
+    dynamodb = boto3.resource('dynamodb')
+    tasks_table = dynamodb.Table(os.environ.get('TASKS_TABLE'))
+
+    scan_params = {
+        'ProjectionExpression': 'TaskID, CreatedAt, CompletedAt',
+        'FilterExpression': (
+            (boto3.dynamodb.conditions.Attr('CreatedAt').exists() &
+             boto3.dynamodb.conditions.Attr('CreatedDay').not_exists()) |
+            (boto3.dynamodb.conditions.Attr('CompletedAt').exists() &
+             boto3.dynamodb.conditions.Attr('CompletedDay').not_exists())
+        )
+    }
+    updated = 0
+
+    while True:
+        result = tasks_table.scan(**scan_params)
+
+        for task in result.get('Items', []):
+            update_expressions = []
+            expression_values = {}
+
+            if task.get('CreatedAt'):
+                update_expressions.append("CreatedDay = :created_day")
+                expression_values[':created_day'] = task['CreatedAt'][:10]
+            if task.get('CompletedAt'):
+                update_expressions.append("CompletedDay = :completed_day")
+                expression_values[':completed_day'] = task['CompletedAt'][:10]
+
+            tasks_table.update_item(
+                Key={'TaskID': task['TaskID']},
+                UpdateExpression="set " + ", ".join(update_expressions),
+                ExpressionAttributeValues=expression_values
+            )
+            updated += 1
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+    print(f"Backfilled CreatedDay and CompletedDay on {updated} tasks")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Backfill script for the unread notifications index.
+
+Sets UnreadUserID on unread notifications created before
+UnreadNotificationsIndex existed, so they are listed by
+GET /notifications?read=false and cleared by PUT /notifications/read-all.
+Run once after deploying.
+
+Usage:
+    NOTIFICATIONS_TABLE=Notifications-dev python backfill_unread_notifications.py
+"""
+import os
+import boto3
+from botocore.exceptions import ClientError
+
+def main():
+    """Backfill UnreadUserID on unread notifications."""
+    dynamodb = boto3.resource('dynamodb')
+    notifications_table = dynamodb.Table(os.environ.get('NOTIFICATIONS_TABLE'))
+
+    scan_params = {
+        'ProjectionExpression': 'NotificationID',
+        'FilterExpression': (
+            boto3.dynamodb.conditions.Attr('ReadStatus').eq(False) &
+            boto3.dynamodb.conditions.Attr('UnreadUserID').not_exists()
+        )
+    }
+    updated = 0
+
+    while True:
+        result = notifications_table.scan(**scan_params)
+
+        for notification in result.get('Items', []):
+            try:
+                # Skip notifications read since the scan read them
+                notifications_table.update_item(
+                    Key={'NotificationID': notification['NotificationID']},
+                    UpdateExpression="set UnreadUserID = UserID",
+                    ConditionExpression="ReadStatus = :unread",
+                    ExpressionAttributeValues={':unread': False}
+                )
+                updated += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+    print(f"Backfilled UnreadUserID on {updated} notifications")
+
+if __name__ == '__main__':
+    main()
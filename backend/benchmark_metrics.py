@@ -0,0 +1,134 @@
+"""
+Benchmark for the admin performance metrics engine.
+
+Compares the single-pass engine used by GET /admin/performance with the
+previous per-task Python loop on synthetic data.
+
+Usage:
+    python benchmark_metrics.py [--tasks 1000000] [--users 200]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'admin'))
+from admin.metrics import compute_user_metrics
+
+def legacy_metrics(tasks, users):
+    """Per-task loop previously used by get_performance_metrics."""
+    user_metrics = {}
+
+    for user_item in users:
+        if user_item.get('Role') == 'team_member':
+            user_id = user_item.get('UserID')
+            user_metrics[user_id] = {
+                'user_id': user_id,
+                'name': user_item.get('Name', ''),
+                'email': user_item.get('Email', ''),
+                'total_tasks': 0,
+                'completed_tasks': 0,
+                'overdue_tasks': 0,
+                'completion_rate': 0,
+                'average_completion_time': 0
+            }
+
+    total_completion_time = {}
+
+    for task in tasks:
+        assigned_to = task.get('AssignedTo')
+        status = task.get('Status')
+
+        if assigned_to in user_metrics:
+            user_metrics[assigned_to]['total_tasks'] += 1
+
+            if status == 'Completed':
+                user_metrics[assigned_to]['completed_tasks'] += 1
+
+                if 'CompletedAt' in task and 'CreatedAt' in task:
+                    try:
+                        completed_at = datetime.fromisoformat(task['CompletedAt'])
+                        created_at = datetime.fromisoformat(task['CreatedAt'])
+                        completion_time = (completed_at - created_at).total_seconds() / 3600
+
+                        if assigned_to not in total_completion_time:
+                            total_completion_time[assigned_to] = []
+
+                        total_completion_time[assigned_to].append(completion_time)
+                    except:
+                        pass
+
+            if status == 'Overdue':
+                user_metrics[assigned_to]['overdue_tasks'] += 1
+
+    for user_id, metrics in user_metrics.items():
+        if metrics['total_tasks'] > 0:
+            metrics['completion_rate'] = round((metrics['completed_tasks'] / metrics['total_tasks']) * 100, 2)
+
+        if user_id in total_completion_time and total_completion_time[user_id]:
+            avg_time = sum(total_completion_time[user_id]) / len(total_completion_time[user_id])
+            metrics['average_completion_time'] = round(avg_time, 2)
+
+    return list(user_metrics.values())
+
+def generate_data(task_count, user_count):
+    """Generate synthetic users and tasks."""
+    rng = random.Random(42)
+
+    users = [
+        {
+            'UserID': f"user-{index}",
+            'Name': f"User {index}",
+            'Email': f"user{index}@example.com",
+            'Role': 'admin' if index == 0 else 'team_member'
+        }
+        for index in range(user_count)
+    ]
+
+    start = datetime(2024, 1, 1)
+    statuses = ['New', 'In Progress', 'Completed', 'Overdue']
+    tasks = []
+
+    for index in range(task_count):
+        created_at = start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        task = {
+            'TaskID': f"task-{index}",
+            'AssignedTo': f"user-{rng.randrange(user_count)}",
+            'Status': rng.choice(statuses),
+            'CreatedAt': created_at.isoformat()
+        }
+        if task['Status'] == 'Completed':
+            task['CompletedAt'] = (created_at + timedelta(seconds=rng.randrange(30 * 24 * 3600))).isoformat()
+        tasks.append(task)
+
+    return tasks, users
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the performance metrics engine.')
+    parser.add_argument('--tasks', type=int, default=1000000, help='Number of synthetic tasks')
+    parser.add_argument('--users', type=int, default=200, help='Number of synthetic users')
+    args = parser.parse_args()
+
+    print(f"Generating {args.tasks} tasks for {args.users} users...")
+    tasks, users = generate_data(args.tasks, args.users)
+
+    start = time.perf_counter()
+    expected = legacy_metrics(tasks, users)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = compute_user_metrics(tasks, users)
+    engine_time = time.perf_counter() - start
+
+    mismatches = sum(1 for old, new in zip(expected, result) if old != new)
+
+    print(f"Legacy loop:        {legacy_time:.2f}s")
+    print(f"Single-pass engine: {engine_time:.2f}s")
+    print(f"Speedup:            {legacy_time / engine_time:.1f}x")
+    print(f"Mismatched users:   {mismatches}")
+
+if __name__ == '__main__':
+    main()
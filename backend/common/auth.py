@@ -161,7 +161,7 @@ def get_secret_hash(username):
     ).digest()
     return base64.b64encode(dig).decode()
 
-def admin_create_user(username, email, password, role='team_member'):
+def admin_create_user(username, email, password, role='team_member', name='', set_password=True):
     """
     Create a new user in Cognito.
     
@@ -170,30 +170,39 @@ def admin_create_user(username, email, password, role='team_member'):
         email (str): Email address
         password (str): Password
         role (str): User role (admin or team_member)
+        name (str): Display name, issued as the 'name' claim of the ID token
+        set_password (bool): Make the password permanent; callers passing False
+            must call admin_set_user_password themselves
         
     Returns:
         dict: User data if successful, error message otherwise
     """
     try:
+        user_attributes = [
+            {'Name': 'email', 'Value': email},
+            {'Name': 'email_verified', 'Value': 'true'},
+            {'Name': 'preferred_username', 'Value': username},
+            {'Name': 'custom:role', 'Value': role}
+        ]
+        if name:
+            user_attributes.append({'Name': 'name', 'Value': name})
+        
         response = cognito.admin_create_user(
             UserPoolId=USER_POOL_ID,
             Username=username,
-            UserAttributes=[
-                {'Name': 'email', 'Value': email},
-                {'Name': 'email_verified', 'Value': 'true'},
-                {'Name': 'custom:role', 'Value': role}
-            ],
+            UserAttributes=user_attributes,
             TemporaryPassword=password,
             MessageAction='SUPPRESS'  # Don't send welcome email
         )
         
         # Set permanent password
-        cognito.admin_set_user_password(
-            UserPoolId=USER_POOL_ID,
-            Username=username,
-            Password=password,
-            Permanent=True
-        )
+        if set_password:
+            cognito.admin_set_user_password(
+                UserPoolId=USER_POOL_ID,
+                Username=username,
+                Password=password,
+                Permanent=True
+            )
         
         return {
             'user_id': response['User']['Username'],
@@ -206,6 +215,78 @@ def admin_create_user(username, email, password, role='team_member'):
     except Exception as e:
         return {'error': str(e)}
 
+def admin_get_user(username):
+    """
+    Look up an existing Cognito user.
+    
+    Args:
+        username (str): Username or alias the user was created with
+        
+    Returns:
+        dict: The user's ID (the 'sub' that tokens carry as user_id) if
+            found, error message otherwise
+    """
+    try:
+        response = cognito.admin_get_user(
+            UserPoolId=USER_POOL_ID,
+            Username=username
+        )
+        
+        attributes = {attribute['Name']: attribute['Value'] for attribute in response.get('UserAttributes', [])}
+        return {'user_id': attributes.get('sub', response['Username'])}
+        
+    except cognito.exceptions.UserNotFoundException:
+        return {'error': 'User does not exist'}
+    except Exception as e:
+        return {'error': str(e)}
+
+def admin_set_user_password(username, password):
+    """
+    Set a permanent password for a Cognito user.
+    
+    Args:
+        username (str): Username
+        password (str): Password
+        
+    Returns:
+        dict: Empty dict if successful, error message otherwise
+    """
+    try:
+        cognito.admin_set_user_password(
+            UserPoolId=USER_POOL_ID,
+            Username=username,
+            Password=password,
+            Permanent=True
+        )
+        
+        return {}
+        
+    except Exception as e:
+        return {'error': str(e)}
+
+def admin_delete_user(username):
+    """
+    Delete a user from Cognito.
+    
+    Args:
+        username (str): Username
+        
+    Returns:
+        dict: Empty dict if successful, error message otherwise
+    """
+    try:
+        cognito.admin_delete_user(
+            UserPoolId=USER_POOL_ID,
+            Username=username
+        )
+        
+        return {}
+        
+    except cognito.exceptions.UserNotFoundException:
+        return {}
+    except Exception as e:
+        return {'error': str(e)}
+
 def admin_initiate_auth(username, password):
     """
     Authenticate a user with Cognito.
@@ -239,4 +320,92 @@ def admin_initiate_auth(username, password):
     except cognito.exceptions.UserNotFoundException:
         return {'error': 'User does not exist'}
     except Exception as e:
-        return {'error': str(e)}
\ No newline at end of file
+        return {'error': str(e)}
+
+def admin_refresh_auth(refresh_token):
+    """
+    Issue new tokens from a Cognito refresh token.
+    
+    Args:
+        refresh_token (str): Refresh token returned at login
+        
+    Returns:
+        dict: Authentication result if successful, error message otherwise
+    """
+    try:
+        response = cognito.admin_initiate_auth(
+            UserPoolId=USER_POOL_ID,
+            ClientId=USER_POOL_CLIENT_ID,
+            AuthFlow='REFRESH_TOKEN_AUTH',
+            AuthParameters={
+                'REFRESH_TOKEN': refresh_token
+            }
+        )
+        
+        return {
+            'token': response['AuthenticationResult']['IdToken'],
+            'expires_in': response['AuthenticationResult']['ExpiresIn']
+        }
+        
+    except cognito.exceptions.NotAuthorizedException:
+        return {'error': 'Invalid or expired refresh token'}
+    except Exception as e:
+        return {'error': str(e)}
+
+def admin_update_user_attributes(username, attributes):
+    """
+    Update user attributes in Cognito.
+    
+    The new values are reflected in the claims of the next ID token issued
+    to the user.
+    
+    Args:
+        username (str): Cognito username
+        attributes (dict): Attribute names mapped to their new values
+        
+    Returns:
+        dict: Empty dict if successful, error message otherwise
+    """
+    try:
+        cognito.admin_update_user_attributes(
+            UserPoolId=USER_POOL_ID,
+            Username=username,
+            UserAttributes=[
+                {'Name': name, 'Value': value}
+                for name, value in attributes.items()
+            ]
+        )
+        
+        return {}
+        
+    except cognito.exceptions.UserNotFoundException:
+        return {'error': 'User does not exist'}
+    except Exception as e:
+        return {'error': str(e)}
+
+def get_token_claims(token):
+    """
+    Build a user profile from the claims of a Cognito ID token.
+    
+    The signature is not verified, so this must only be used on tokens
+    received directly from Cognito (e.g. the result of admin_initiate_auth).
+    
+    Args:
+        token (str): Cognito ID token
+        
+    Returns:
+        dict: User profile from the token claims, None if it cannot be decoded
+    """
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except Exception as e:
+        print(f"Token decode error: {str(e)}")
+        return None
+    
+    return {
+        'user_id': claims.get('sub', ''),
+        'username': claims.get('preferred_username', claims.get('cognito:username', '')),
+        'email': claims.get('email', ''),
+        'role': claims.get('custom:role', 'team_member'),
+        'name': claims.get('name')
+    }
\ No newline at end of file
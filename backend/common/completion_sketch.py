@@ -0,0 +1,137 @@
+"""
+Completion time sketches shared by the task and admin API endpoints.
+
+Each sketch is an item in the Stats table holding a log-bucketed histogram
+of task completion times in hours (a DDSketch): bucket i counts the values
+in (MIN_HOURS * GAMMA^(i-1), MIN_HOURS * GAMMA^i], so any quantile read from
+it is within RELATIVE_ACCURACY of the true value. Buckets are stored as
+sparse number attributes and updated with atomic ADD, so percentiles never
+need the raw samples.
+"""
+import math
+from .task_counters import STATS_TABLE, serialize
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+
+# Completion times at or below one minute share the first bucket
+MIN_HOURS = 1 / 60
+
+# User sketches are keyed completion_sketch#<user ID>; the team key has no
+# '#', so no user ID can produce it
+TEAM_KEY = {'StatID': 'team_completion_sketch'}
+BUCKET_PREFIX = 'B'
+PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+
+def user_key(user_id):
+    """
+    Get the Stats table key of a user's sketch.
+
+    Args:
+        user_id (str): User ID
+
+    Returns:
+        dict: Sketch item key
+    """
+    return {'StatID': f"completion_sketch#{user_id}"}
+
+def bucket_index(hours):
+    """
+    Get the bucket holding a completion time.
+
+    Args:
+        hours (float): Completion time in hours
+
+    Returns:
+        int: Bucket index
+    """
+    if hours <= MIN_HOURS:
+        return 0
+    return math.ceil(math.log(hours / MIN_HOURS) / math.log(GAMMA))
+
+def bucket_value(index):
+    """
+    Get the value reported for a bucket.
+
+    Args:
+        index (int): Bucket index
+
+    Returns:
+        float: Completion time in hours within the accuracy of every value in the bucket
+    """
+    if index == 0:
+        return MIN_HOURS
+    return 2 * MIN_HOURS * GAMMA ** index / (GAMMA + 1)
+
+def update_operations(user_id, hours):
+    """
+    Build TransactWriteItems operations recording a completion time.
+
+    Args:
+        user_id (str): User the completed task is assigned to
+        hours (float): Completion time in hours
+
+    Returns:
+        list: Update operations for the user and team sketches
+    """
+    operations = []
+
+    for key in (user_key(user_id), TEAM_KEY):
+        operations.append({
+            'Update': {
+                'TableName': STATS_TABLE,
+                'Key': serialize(key),
+                'UpdateExpression': "ADD #count :one, #bucket :one",
+                'ExpressionAttributeNames': {
+                    '#count': 'SampleCount',
+                    '#bucket': f"{BUCKET_PREFIX}{bucket_index(hours)}"
+                },
+                'ExpressionAttributeValues': {':one': {'N': '1'}}
+            }
+        })
+
+    return operations
+
+def get_buckets(item):
+    """
+    Extract the bucket counts of a sketch item.
+
+    Args:
+        item (dict): Sketch item
+
+    Returns:
+        dict: Bucket indexes mapped to counts
+    """
+    return {
+        int(name[len(BUCKET_PREFIX):]): int(count)
+        for name, count in item.items()
+        if name.startswith(BUCKET_PREFIX) and name[len(BUCKET_PREFIX):].isdigit()
+    }
+
+def percentiles(buckets):
+    """
+    Compute the reported percentiles of a sketch.
+
+    Args:
+        buckets (dict): Bucket indexes mapped to counts
+
+    Returns:
+        dict: p50, p90 and p99 completion times in hours, None for an empty sketch
+    """
+    total = sum(buckets.values())
+    if not total:
+        return {name: None for name in PERCENTILES}
+
+    result = {}
+    ordered = sorted(buckets.items())
+
+    for name, quantile in PERCENTILES.items():
+        rank = quantile * (total - 1)
+        seen = 0
+        for index, count in ordered:
+            seen += count
+            if seen > rank:
+                result[name] = round(bucket_value(index), 2)
+                break
+
+    return result
@@ -22,7 +22,9 @@ def create_tables():
         ],
         AttributeDefinitions=[
             {'AttributeName': 'UserID', 'AttributeType': 'S'},
-            {'AttributeName': 'Email', 'AttributeType': 'S'}
+            {'AttributeName': 'Email', 'AttributeType': 'S'},
+            {'AttributeName': 'Role', 'AttributeType': 'S'},
+            {'AttributeName': 'Department', 'AttributeType': 'S'}
         ],
         GlobalSecondaryIndexes=[
             {
@@ -32,6 +34,22 @@ def create_tables():
                 ],
                 'Projection': {'ProjectionType': 'ALL'},
                 'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            },
+            {
+                'IndexName': 'RoleIndex',
+                'KeySchema': [
+                    {'AttributeName': 'Role', 'KeyType': 'HASH'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            },
+            {
+                'IndexName': 'DepartmentIndex',
+                'KeySchema': [
+                    {'AttributeName': 'Department', 'KeyType': 'HASH'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
             }
         ],
         ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
@@ -46,7 +64,11 @@ def create_tables():
         AttributeDefinitions=[
             {'AttributeName': 'TaskID', 'AttributeType': 'S'},
             {'AttributeName': 'AssignedTo', 'AttributeType': 'S'},
-            {'AttributeName': 'Status', 'AttributeType': 'S'}
+            {'AttributeName': 'Status', 'AttributeType': 'S'},
+            {'AttributeName': 'DeadlineBucket', 'AttributeType': 'S'},
+            {'AttributeName': 'Deadline', 'AttributeType': 'S'},
+            {'AttributeName': 'CreatedDay', 'AttributeType': 'S'},
+            {'AttributeName': 'CompletedDay', 'AttributeType': 'S'}
         ],
         GlobalSecondaryIndexes=[
             {
@@ -57,6 +79,31 @@ def create_tables():
                 ],
                 'Projection': {'ProjectionType': 'ALL'},
                 'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            },
+            {
+                'IndexName': 'OpenDeadlineIndex',
+                'KeySchema': [
+                    {'AttributeName': 'DeadlineBucket', 'KeyType': 'HASH'},
+                    {'AttributeName': 'Deadline', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            },
+            {
+                'IndexName': 'CreatedDayIndex',
+                'KeySchema': [
+                    {'AttributeName': 'CreatedDay', 'KeyType': 'HASH'}
+                ],
+                'Projection': {'ProjectionType': 'INCLUDE', 'NonKeyAttributes': ['AssignedTo']},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            },
+            {
+                'IndexName': 'CompletedDayIndex',
+                'KeySchema': [
+                    {'AttributeName': 'CompletedDay', 'KeyType': 'HASH'}
+                ],
+                'Projection': {'ProjectionType': 'INCLUDE', 'NonKeyAttributes': ['AssignedTo']},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
             }
         ],
         ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
@@ -71,6 +118,7 @@ def create_tables():
         AttributeDefinitions=[
             {'AttributeName': 'NotificationID', 'AttributeType': 'S'},
             {'AttributeName': 'UserID', 'AttributeType': 'S'},
+            {'AttributeName': 'UnreadUserID', 'AttributeType': 'S'},
             {'AttributeName': 'CreatedAt', 'AttributeType': 'S'}
         ],
         GlobalSecondaryIndexes=[
@@ -82,13 +130,48 @@ def create_tables():
                 ],
                 'Projection': {'ProjectionType': 'ALL'},
                 'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            },
+            {
+                'IndexName': 'UnreadNotificationsIndex',
+                'KeySchema': [
+                    {'AttributeName': 'UnreadUserID', 'KeyType': 'HASH'},
+                    {'AttributeName': 'CreatedAt', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
             }
         ],
         ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
     )
     
+    # Create Stats table
+    stats_table = dynamodb.create_table(
+        TableName='Stats-dev',
+        KeySchema=[
+            {'AttributeName': 'StatID', 'KeyType': 'HASH'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'StatID', 'AttributeType': 'S'}
+        ],
+        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    )
+    
+    # Create Rollups table
+    rollups_table = dynamodb.create_table(
+        TableName='Rollups-dev',
+        KeySchema=[
+            {'AttributeName': 'Scope', 'KeyType': 'HASH'},
+            {'AttributeName': 'Day', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'Scope', 'AttributeType': 'S'},
+            {'AttributeName': 'Day', 'AttributeType': 'S'}
+        ],
+        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    )
+    
     print("Tables created successfully!")
-    return users_table, tasks_table, notifications_table
+    return users_table, tasks_table, notifications_table, stats_table, rollups_table
 
 def seed_data():
     """Seed the tables with sample data."""
@@ -141,7 +224,9 @@ def seed_data():
         'CreatedBy': admin_id,
         'AssignedTo': team_member_id,
         'CreatedAt': current_time,
+        'CreatedDay': current_time[:10],
         'Deadline': '2023-12-31T17:00:00',
+        'DeadlineBucket': '2023-12-31',
         'Notes': 'Bring all necessary equipment'
     }
     
@@ -157,7 +242,9 @@ def seed_data():
         'CreatedBy': admin_id,
         'AssignedTo': team_member_id,
         'CreatedAt': current_time,
+        'CreatedDay': current_time[:10],
         'Deadline': '2023-12-15T17:00:00',
+        'DeadlineBucket': '2023-12-15',
         'Notes': 'Follow maintenance checklist'
     }
     
@@ -184,7 +271,7 @@ if __name__ == '__main__':
         # Check if tables already exist
         existing_tables = [table.name for table in dynamodb.tables.all()]
         
-        if 'Users-dev' in existing_tables and 'Tasks-dev' in existing_tables and 'Notifications-dev' in existing_tables:
+        if all(table in existing_tables for table in ['Users-dev', 'Tasks-dev', 'Notifications-dev', 'Stats-dev', 'Rollups-dev']):
             print("Tables already exist. Skipping table creation.")
         else:
             # Create tables
@@ -198,6 +285,10 @@ if __name__ == '__main__':
             tasks_table.meta.client.get_waiter('table_exists').wait(TableName='Tasks-dev')
             notifications_table = dynamodb.Table('Notifications-dev')
             notifications_table.meta.client.get_waiter('table_exists').wait(TableName='Notifications-dev')
+            stats_table = dynamodb.Table('Stats-dev')
+            stats_table.meta.client.get_waiter('table_exists').wait(TableName='Stats-dev')
+            rollups_table = dynamodb.Table('Rollups-dev')
+            rollups_table.meta.client.get_waiter('table_exists').wait(TableName='Rollups-dev')
         
         # Seed data
         seed_data()
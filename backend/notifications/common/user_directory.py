@@ -0,0 +1,43 @@
+"""
+User directory versioning shared by the auth and admin API endpoints.
+
+Admin containers cache pages of the user directory in memory. Profile
+writes happen in other containers, so each one bumps a version number in
+the Stats table, and cached pages are only served while the version they
+were read at is still current.
+"""
+
+VERSION_KEY = {'StatID': 'user_directory_version'}
+
+def bump_version(stats_table):
+    """
+    Invalidate cached user directory pages.
+
+    Failures are logged rather than raised, as the profile write has already
+    succeeded and cached pages also expire on their own.
+
+    Args:
+        stats_table: Stats table resource
+    """
+    try:
+        stats_table.update_item(
+            Key=VERSION_KEY,
+            UpdateExpression="ADD #version :one",
+            ExpressionAttributeNames={'#version': 'Version'},
+            ExpressionAttributeValues={':one': 1}
+        )
+    except Exception as e:
+        print(f"Failed to bump user directory version: {str(e)}")
+
+def get_version(stats_table):
+    """
+    Get the current user directory version.
+
+    Args:
+        stats_table: Stats table resource
+
+    Returns:
+        int: Version number, 0 before the first profile write
+    """
+    result = stats_table.get_item(Key=VERSION_KEY)
+    return int(result.get('Item', {}).get('Version', 0))
@@ -0,0 +1,152 @@
+"""
+Digest notifications for bursts of task events.
+
+For users in digest mode, task_assigned and task_status_updated
+notifications are not stored one by one. Each type gets one digest
+notification per user and DIGEST_WINDOW seconds, keyed by the window, and
+every event in the window updates it in place: its task ID is added to the
+TaskIDs set and the digest moves back to the top of the list as unread.
+
+The IDs of the merged notifications are kept in SourceIDs, and an update
+only applies if it brings at least one new one. A redelivered message
+therefore leaves the digest as it is, and does not make a digest the user
+has read unread again. The count and message are derived from TaskIDs when
+the digest is read.
+"""
+import os
+import uuid
+from datetime import datetime
+from botocore.exceptions import ClientError
+
+DIGEST_TYPES = ['task_assigned', 'task_status_updated']
+
+# Seconds per digest window, 0 to store every notification separately
+DIGEST_WINDOW = int(os.environ.get('NOTIFICATION_DIGEST_WINDOW', 300))
+
+def digest_id(user_id, notification_type, window_start):
+    """Get the NotificationID of a user's digest for a type and window."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"digest:{user_id}:{notification_type}:{window_start}"))
+
+def digest_message(notification_type, count):
+    """Get the message of a digest of count tasks."""
+    if notification_type == 'task_assigned':
+        return f"You have been assigned {count} new tasks" if count != 1 else "You have been assigned 1 new task"
+    return f"{count} of your tasks had status updates" if count != 1 else "1 of your tasks had a status update"
+
+def split(items, settings):
+    """
+    Separate the notifications to coalesce into digests.
+
+    Args:
+        items (list): Notification items
+        settings (dict): UserID mapped to notification settings
+
+    Returns:
+        tuple: Notifications to store individually, and digest groups as a
+            dict of (UserID, Type) mapped to their notifications
+    """
+    if not DIGEST_WINDOW:
+        return items, {}
+
+    individual = []
+    groups = {}
+
+    for item in items:
+        if (settings.get(item['UserID'], {}).get('digest')
+                and item['Type'] in DIGEST_TYPES and item['TaskID']):
+            groups.setdefault((item['UserID'], item['Type']), []).append(item)
+        else:
+            individual.append(item)
+
+    return individual, groups
+
+def merge(table, user_id, notification_type, items, now=None):
+    """
+    Add notifications to the user's digest for the current window.
+
+    One conditional update creates the digest or adds to it, returning its
+    previous state, so the caller learns whether it became unread. The
+    update is skipped when every notification was merged before.
+
+    Args:
+        table: Notifications table resource
+        user_id (str): UserID
+        notification_type (str): Type of the notifications
+        items (list): Notifications to add, oldest first
+        now (datetime): Current time, defaults to now
+
+    Returns:
+        tuple: The updated digest as returned to clients, None if nothing
+            was new, and whether it was not unread before
+    """
+    now = now or datetime.now()
+    window_start = int(now.timestamp()) // DIGEST_WINDOW * DIGEST_WINDOW
+    task_ids = {item['TaskID'] for item in items}
+    source_ids = sorted({item['NotificationID'] for item in items})
+    source_values = {f":source{index}": source_id for index, source_id in enumerate(source_ids)}
+
+    try:
+        result = table.update_item(
+            Key={'NotificationID': digest_id(user_id, notification_type, window_start)},
+            UpdateExpression=(
+                "set UserID = :user_id, UnreadUserID = :user_id, #type = :type, #message = :message, "
+                "TaskID = :task_id, CreatedAt = :now, ReadStatus = :unread, Digest = :digest "
+                "add TaskIDs :task_ids, SourceIDs :source_ids"
+            ),
+            ConditionExpression=' OR '.join(
+                ['attribute_not_exists(NotificationID)'] +
+                [f"NOT contains(SourceIDs, {name})" for name in source_values]
+            ),
+            ExpressionAttributeNames={'#type': 'Type', '#message': 'Message'},
+            ExpressionAttributeValues={
+                ':user_id': user_id,
+                ':type': notification_type,
+                ':message': items[-1]['Message'],
+                ':task_id': items[-1]['TaskID'],
+                ':now': now.isoformat(),
+                ':unread': False,
+                ':digest': True,
+                ':task_ids': task_ids,
+                ':source_ids': set(source_ids),
+                **source_values
+            },
+            ReturnValues='ALL_OLD'
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None, False
+        raise
+    old = result.get('Attributes')
+
+    digest = {
+        'NotificationID': digest_id(user_id, notification_type, window_start),
+        'UserID': user_id,
+        'UnreadUserID': user_id,
+        'TaskID': items[-1]['TaskID'],
+        'Type': notification_type,
+        'Message': items[-1]['Message'],
+        'CreatedAt': now.isoformat(),
+        'ReadStatus': False,
+        'Digest': True,
+        'TaskIDs': set(old.get('TaskIDs', set()) if old else set()) | task_ids
+    }
+
+    return serialize(digest), not old or bool(old.get('ReadStatus'))
+
+def serialize(notification):
+    """
+    Prepare a notification for a response.
+
+    Digests get their task IDs as a list, their count and a message
+    describing the whole digest. SourceIDs is internal and dropped.
+    """
+    if 'TaskIDs' not in notification:
+        return notification
+
+    task_ids = sorted(notification['TaskIDs'])
+    return {
+        **{key: value for key, value in notification.items() if key != 'SourceIDs'},
+        'TaskIDs': task_ids,
+        'Count': len(task_ids),
+        'Message': digest_message(notification['Type'], len(task_ids))
+    }
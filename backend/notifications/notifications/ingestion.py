@@ -0,0 +1,246 @@
+"""
+Notification ingestion shared by the SNS handlers.
+
+Every record of an SNS event is turned into a notification item first.
+Notifications the recipient's preferences suppress are dropped, those of
+users in digest mode are coalesced into digests, and the rest are inserted
+with parallel conditional puts. Failed puts are retried with exponential
+backoff, and records that cannot be parsed or written are reported
+individually rather than failing the event.
+
+Notification IDs are derived from the SNS message ID and only inserted if
+absent, so a redelivered message leaves its notification as it is, read or
+not. Each recipient's unread count is then raised once for all of the
+notifications actually inserted. A redelivery does not re-apply a failed
+increment, so such counts are repaired by reconcile_unread.
+
+New notifications carry UnreadUserID, which puts them in the sparse
+UnreadNotificationsIndex until they are marked as read. Stored
+notifications are published to their recipient's notification streams.
+"""
+import json
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+from . import unread_count, stream, preferences, digest
+
+# Conditional puts in flight at once
+MAX_WRITE_WORKERS = 10
+
+# Attempts per put, doubling the delay between them
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.05
+
+serializer = TypeSerializer()
+
+def build_message(sns_message):
+    """
+    Get the notification text for an SNS message.
+
+    Args:
+        sns_message (dict): Parsed SNS message
+
+    Returns:
+        str: Notification message
+    """
+    notification_type = sns_message.get('type', 'general')
+
+    if notification_type == 'task_assigned':
+        return f"You have been assigned a new task: {sns_message.get('title', '')}"
+    elif notification_type == 'task_reassigned':
+        return f"Task '{sns_message.get('title', '')}' has been reassigned to you"
+    elif notification_type == 'task_status_updated':
+        return f"Task '{sns_message.get('title', '')}' status has been updated to {sns_message.get('status', '')}"
+    elif notification_type == 'deadline_reminder':
+        return sns_message.get('message', 'Task deadline reminder')
+    else:
+        return sns_message.get('message', 'New notification')
+
+def build_notification(record):
+    """
+    Build the notification item for an SNS record.
+
+    Args:
+        record (dict): SNS event record
+
+    Returns:
+        dict: Notification item
+    """
+    sns_message = json.loads(record['Sns']['Message'])
+
+    # Extract user ID from message attributes
+    user_id = record['Sns']['MessageAttributes']['user_id']['Value']
+
+    message_id = record['Sns'].get('MessageId')
+    if message_id:
+        notification_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"sns:{message_id}"))
+    else:
+        notification_id = str(uuid.uuid4())
+
+    return {
+        'NotificationID': notification_id,
+        'UserID': user_id,
+        'UnreadUserID': user_id,
+        'TaskID': sns_message.get('task_id', ''),
+        'Type': sns_message.get('type', 'general'),
+        'Message': build_message(sns_message),
+        'CreatedAt': datetime.now().isoformat(),
+        'ReadStatus': False
+    }
+
+def record_id(record, index):
+    """Get the identifier a record's failure is reported under."""
+    return record.get('Sns', {}).get('MessageId') or str(index)
+
+def put_new(client, table_name, item):
+    """
+    Insert a notification unless an earlier delivery already stored it.
+
+    Args:
+        client: DynamoDB client, which unlike resources is thread-safe
+        table_name (str): Notifications table name
+        item (dict): Notification item
+
+    Returns:
+        tuple: Whether the notification was inserted, and the last error
+            seen if it could not be written
+    """
+    serialized = {key: serializer.serialize(value) for key, value in item.items()}
+    error = None
+
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(BASE_DELAY * 2 ** (attempt - 1))
+
+        try:
+            client.put_item(
+                TableName=table_name,
+                Item=serialized,
+                ConditionExpression='attribute_not_exists(NotificationID)'
+            )
+            return True, None
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False, None
+            # Throttling and transient errors are retried
+            error = str(e)
+
+    return False, error
+
+def get_settings(dynamodb, users_table_name, items):
+    """
+    Get the notification preferences of every recipient.
+
+    The preferences are read in one cached batch lookup. If that fails no
+    preferences are applied, as losing a notification is worse than
+    storing one the user muted.
+
+    Returns:
+        dict: UserID mapped to settings, empty if they could not be read
+    """
+    try:
+        return preferences.cache.get_many(dynamodb, users_table_name, {item['UserID'] for item in items})
+    except Exception as e:
+        print(f"Notification preferences lookup error: {str(e)}")
+        return {}
+
+def drop_suppressed(items, settings):
+    """
+    Remove notifications their recipient's preferences suppress.
+
+    Returns:
+        tuple: Notifications to store, and the number suppressed
+    """
+    kept = [
+        item for item in items
+        if item['UserID'] not in settings
+        or not preferences.is_suppressed(settings[item['UserID']], item['Type'])
+    ]
+    return kept, len(items) - len(kept)
+
+def ingest(dynamodb, table_name, records, stats_table, users_table_name=None):
+    """
+    Store the notifications of an SNS event.
+
+    Args:
+        dynamodb: DynamoDB service resource
+        table_name (str): Notifications table name
+        records (list): SNS event records
+        stats_table: Stats table resource holding the unread counts
+        users_table_name (str): Users table holding notification preferences,
+            None to store every notification
+
+    Returns:
+        dict: Notifications inserted and digests updated, the number of
+            notifications suppressed and coalesced into digests, and the
+            failed records with their errors
+    """
+    items = []
+    record_ids = {}
+    failed = []
+
+    for index, record in enumerate(records):
+        try:
+            item = build_notification(record)
+        except Exception as e:
+            failed.append({'record': record_id(record, index), 'error': f"Invalid record: {str(e)}"})
+            continue
+
+        # Two records of one batch cannot share a key, e.g. a message delivered twice
+        if item['NotificationID'] in record_ids:
+            continue
+
+        items.append(item)
+        record_ids[item['NotificationID']] = record_id(record, index)
+
+    settings = get_settings(dynamodb, users_table_name, items) if users_table_name and items else {}
+    items, suppressed = drop_suppressed(items, settings)
+    items, digest_groups = digest.split(items, settings)
+
+    written = []
+    new_unread = {}
+    if items:
+        client = dynamodb.meta.client
+        with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+            results = list(executor.map(lambda item: put_new(client, table_name, item), items))
+
+        for item, (inserted, error) in zip(items, results):
+            if error:
+                failed.append({'record': record_ids[item['NotificationID']], 'error': error})
+            elif inserted:
+                written.append(item)
+                new_unread[item['UserID']] = new_unread.get(item['UserID'], 0) + 1
+
+    digested = 0
+    if digest_groups:
+        notifications_table = dynamodb.Table(table_name)
+
+    for (user_id, notification_type), group in digest_groups.items():
+        try:
+            notification, became_unread = digest.merge(notifications_table, user_id, notification_type, group)
+        except Exception as e:
+            for item in group:
+                failed.append({'record': record_ids[item['NotificationID']], 'error': str(e)})
+            continue
+
+        # Every notification of the group was merged by an earlier delivery
+        if notification is None:
+            continue
+
+        written.append(notification)
+        digested += len(group)
+        if became_unread:
+            new_unread[user_id] = new_unread.get(user_id, 0) + 1
+
+    for item in written:
+        stream.publish(item['UserID'], 'notification', item)
+    for user_id, count in new_unread.items():
+        unread_count.adjust(stats_table, user_id, count)
+
+    for failure in failed:
+        print(f"Failed to store notification for record {failure['record']}: {failure['error']}")
+
+    return {'written': written, 'suppressed': suppressed, 'digested': digested, 'failed': failed}
@@ -0,0 +1,71 @@
+"""
+In-process stand-in for the notification SNS topic.
+
+Deployed, tasks publish to the SNS topic and the SNS handler stores the
+notifications in another Lambda, which the local server never sees. The
+local server swaps the tasks module's SNS client for a LocalTopic, which
+turns each published message into the SNS record the handler would have
+received and ingests it in the same process, so notification streams
+served by the local server receive the `notification` event.
+"""
+import uuid
+from . import ingestion
+
+class LocalTopic:
+    """Stores published notifications directly, mirroring the SNS client's publish calls."""
+
+    def __init__(self, dynamodb, notifications_table_name, stats_table, users_table_name=None):
+        self.dynamodb = dynamodb
+        self.notifications_table_name = notifications_table_name
+        self.stats_table = stats_table
+        self.users_table_name = users_table_name
+
+    def publish(self, TopicArn=None, Message=None, MessageAttributes=None, **kwargs):
+        """Ingest one message, like sns.publish."""
+        message_id = str(uuid.uuid4())
+        self.deliver([to_record(message_id, Message, MessageAttributes)])
+        return {'MessageId': message_id}
+
+    def publish_batch(self, TopicArn=None, PublishBatchRequestEntries=None, **kwargs):
+        """Ingest up to ten messages, like sns.publish_batch."""
+        entries = [(entry['Id'], str(uuid.uuid4()), entry) for entry in PublishBatchRequestEntries or []]
+        self.deliver([
+            to_record(message_id, entry['Message'], entry.get('MessageAttributes'))
+            for _, message_id, entry in entries
+        ])
+        return {
+            'Successful': [{'Id': entry_id, 'MessageId': message_id} for entry_id, message_id, _ in entries],
+            'Failed': []
+        }
+
+    def deliver(self, records):
+        """Ingest SNS records, raising if any could not be stored."""
+        result = ingestion.ingest(
+            self.dynamodb, self.notifications_table_name, records, self.stats_table, self.users_table_name
+        )
+
+        if result['failed']:
+            raise Exception(f"Failed to store {len(result['failed'])} of {len(records)} notifications")
+
+def to_record(message_id, message, message_attributes):
+    """
+    Build the SNS event record delivered for a published message.
+
+    Args:
+        message_id (str): SNS message ID
+        message (str): Message body
+        message_attributes (dict): Attributes in the publish call's format
+
+    Returns:
+        dict: SNS event record
+    """
+    return {
+        'Sns': {
+            'MessageId': message_id,
+            'Message': message,
+            'MessageAttributes': {
+                name: {'Type': attribute['DataType'], 'Value': attribute.get('StringValue')}
+                for name, attribute in (message_attributes or {}).items()
+            }
+        }
+    }
@@ -3,21 +3,38 @@ Notification API endpoints for the Task Management System.
 """
 import os
 import json
+import base64
 import boto3
-import uuid
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
 import sys
 
 # Add parent directory to path to import common modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common import response, auth
+from . import ingestion, unread_count, preferences, digest
 
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 notifications_table = dynamodb.Table(os.environ.get('NOTIFICATIONS_TABLE'))
+users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
 sns = boto3.client('sns')
 notification_topic = os.environ.get('NOTIFICATION_TOPIC')
 
+# The low-level client is thread-safe, unlike resource objects
+client = dynamodb.meta.client
+
+NOTIFICATIONS_PAGE_SIZE = 20
+MAX_NOTIFICATIONS_PAGE_SIZE = 100
+
+# Items evaluated per request at most, however many the read filter discards
+NOTIFICATIONS_READ_BUDGET = 1000
+
+# Unread notifications read per page, and updated concurrently, by read-all
+READ_ALL_PAGE_SIZE = 100
+READ_ALL_WORKERS = 8
+
 def lambda_handler(event, context):
     """
     Main handler for notification API endpoints.
@@ -30,15 +47,38 @@ def lambda_handler(event, context):
     # Route to the appropriate handler
     if http_method == 'GET' and path == '/notifications':
         return get_notifications(event)
+    elif http_method == 'GET' and path == '/notifications/unread-count':
+        return get_unread_count(event)
+    elif http_method == 'PUT' and path == '/notifications/read-all':
+        return mark_all_as_read(event)
     elif http_method == 'PUT' and '/notifications/' in path and path.endswith('/read'):
         return mark_as_read(event)
+    elif http_method == 'GET' and path == '/notifications/settings':
+        return get_settings(event)
     elif http_method == 'PUT' and path == '/notifications/settings':
         return update_settings(event)
     else:
         return response.not_found('Endpoint not found')
 
+def encode_cursor(key):
+    """Encode a LastEvaluatedKey as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor into an ExclusiveStartKey."""
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
 def get_notifications(event):
-    """Get notifications for the current user."""
+    """
+    Get notifications for the current user, newest first, a page at a time.
+    
+    Unread notifications are read from the sparse UnreadNotificationsIndex
+    by key alone. Listing read notifications applies a filter after
+    DynamoDB's Limit, so the index is queried repeatedly until the page is
+    full, the user's notifications run out or NOTIFICATIONS_READ_BUDGET
+    items have been evaluated. The returned next_cursor continues after the
+    last notification on the page.
+    """
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -48,40 +88,110 @@ def get_notifications(event):
         # Get query parameters
         query_params = event.get('queryStringParameters', {}) or {}
         read_status = query_params.get('read')
-        limit = int(query_params.get('limit', 20))
         
-        # Query notifications by user ID
-        if read_status is not None:
+        try:
+            limit = int(query_params.get('limit', NOTIFICATIONS_PAGE_SIZE))
+        except ValueError:
+            return response.bad_request("Invalid limit")
+        if limit < 1:
+            return response.bad_request("Invalid limit")
+        limit = min(limit, MAX_NOTIFICATIONS_PAGE_SIZE)
+        
+        if read_status is not None and read_status.lower() != 'true':
+            # Only unread notifications carry the index key
+            index_name, key_attribute = 'UnreadNotificationsIndex', 'UnreadUserID'
+        else:
+            index_name, key_attribute = 'UserNotificationsIndex', 'UserID'
+        
+        page_params = {
+            'IndexName': index_name,
+            'KeyConditionExpression': boto3.dynamodb.conditions.Key(key_attribute).eq(user['user_id']),
+            'ScanIndexForward': False  # Sort in descending order (newest first)
+        }
+        
+        if read_status is not None and read_status.lower() == 'true':
             # Filter by read status
-            is_read = read_status.lower() == 'true'
+            page_params['FilterExpression'] = boto3.dynamodb.conditions.Attr('ReadStatus').eq(True)
+        
+        if query_params.get('cursor'):
+            try:
+                start_key = decode_cursor(query_params['cursor'])
+            except ValueError:
+                return response.bad_request("Invalid cursor")
+            if not isinstance(start_key, dict) or start_key.get(key_attribute) != user['user_id']:
+                return response.bad_request("Invalid cursor")
+            page_params['ExclusiveStartKey'] = start_key
+        
+        notifications = []
+        evaluated = 0
+        last_key = None
+        
+        while True:
+            # Without a filter every evaluated item is returned
+            if 'FilterExpression' in page_params:
+                page_params['Limit'] = min(MAX_NOTIFICATIONS_PAGE_SIZE, NOTIFICATIONS_READ_BUDGET - evaluated)
+            else:
+                page_params['Limit'] = limit - len(notifications)
             
-            result = notifications_table.query(
-                IndexName='UserNotificationsIndex',
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('UserID').eq(user['user_id']),
-                FilterExpression=boto3.dynamodb.conditions.Attr('ReadStatus').eq(is_read),
-                ScanIndexForward=False,  # Sort in descending order (newest first)
-                Limit=limit
-            )
-        else:
-            # Get all notifications
-            result = notifications_table.query(
-                IndexName='UserNotificationsIndex',
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('UserID').eq(user['user_id']),
-                ScanIndexForward=False,  # Sort in descending order (newest first)
-                Limit=limit
-            )
+            result = notifications_table.query(**page_params)
+            evaluated += result.get('ScannedCount', len(result.get('Items', [])))
+            last_key = result.get('LastEvaluatedKey')
+            
+            items = result.get('Items', [])
+            needed = limit - len(notifications)
+            if len(items) >= needed:
+                # Continue after the last item kept, not the last one read
+                notifications.extend(items[:needed])
+                if len(items) > needed or last_key:
+                    last = notifications[-1]
+                    last_key = {
+                        'NotificationID': last['NotificationID'],
+                        key_attribute: last[key_attribute],
+                        'CreatedAt': last['CreatedAt']
+                    }
+                break
+            
+            notifications.extend(items)
+            
+            if not last_key or evaluated >= NOTIFICATIONS_READ_BUDGET:
+                break
+            page_params['ExclusiveStartKey'] = last_key
         
         return response.success({
-            'notifications': result.get('Items', []),
-            'count': len(result.get('Items', []))
+            'notifications': [digest.serialize(notification) for notification in notifications],
+            'count': len(notifications),
+            'next_cursor': encode_cursor(last_key) if last_key else None
         })
         
     except Exception as e:
         print(f"Get notifications error: {str(e)}")
         return response.server_error(str(e))
 
+def get_unread_count(event):
+    """Get the current user's number of unread notifications."""
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    try:
+        return response.success({
+            'unread_count': unread_count.get(stats_table, user['user_id'])
+        })
+        
+    except Exception as e:
+        print(f"Get unread count error: {str(e)}")
+        return response.server_error(str(e))
+
 def mark_as_read(event):
-    """Mark a notification as read."""
+    """
+    Mark a notification as read.
+    
+    Ownership is checked in the update's condition, so this is a single
+    write; the notification is returned when the condition fails to tell a
+    missing notification from another user's. The old item shows whether the
+    user's unread count has to drop.
+    """
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -91,37 +201,142 @@ def mark_as_read(event):
         # Extract notification ID from path
         notification_id = event['pathParameters']['notificationId']
         
-        # Get notification from DynamoDB
-        result = notifications_table.get_item(Key={'NotificationID': notification_id})
+        # Update read status if the notification belongs to the user
+        try:
+            result = notifications_table.update_item(
+                Key={'NotificationID': notification_id},
+                UpdateExpression="set ReadStatus = :read_status remove UnreadUserID",
+                ConditionExpression="UserID = :uid",
+                ExpressionAttributeValues={':read_status': True, ':uid': user['user_id']},
+                ReturnValues='ALL_OLD',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            if 'Item' not in e.response:
+                return response.not_found("Notification not found")
+            return response.forbidden("You don't have access to this notification")
         
-        if 'Item' not in result:
-            return response.not_found("Notification not found")
+        notification = result['Attributes']
+        if not notification.get('ReadStatus'):
+            unread_count.adjust(stats_table, user['user_id'], -1)
+        notification['ReadStatus'] = True
+        notification.pop('UnreadUserID', None)
         
-        notification = result['Item']
+        return response.success(digest.serialize(notification))
         
-        # Check if user has access to this notification
-        if notification['UserID'] != user['user_id']:
-            return response.forbidden("You don't have access to this notification")
+    except Exception as e:
+        print(f"Mark as read error: {str(e)}")
+        return response.server_error(str(e))
+
+def mark_all_as_read(event):
+    """
+    Mark all of the current user's unread notifications as read.
+    
+    Unread notifications are paged from UnreadNotificationsIndex, optionally
+    only those created up to a 'before' timestamp, and each page is updated
+    concurrently before the next is read. Updated notifications leave the
+    index, so the pages only ever hold unread notifications.
+    """
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    try:
+        # Get query parameters
+        query_params = event.get('queryStringParameters', {}) or {}
+        before = query_params.get('before')
         
-        # Update read status
-        notifications_table.update_item(
-            Key={'NotificationID': notification_id},
-            UpdateExpression="set ReadStatus = :read_status",
-            ExpressionAttributeValues={':read_status': True}
-        )
+        key_condition = 'UnreadUserID = :user_id'
+        expression_values = {':user_id': {'S': user['user_id']}}
+        if before:
+            key_condition += ' AND CreatedAt <= :before'
+            expression_values[':before'] = {'S': before}
+        
+        page_params = {
+            'TableName': notifications_table.name,
+            'IndexName': 'UnreadNotificationsIndex',
+            'KeyConditionExpression': key_condition,
+            'ProjectionExpression': 'NotificationID',
+            'ExpressionAttributeValues': expression_values,
+            'Limit': READ_ALL_PAGE_SIZE
+        }
+        
+        def mark_read(notification_id):
+            try:
+                client.update_item(
+                    TableName=notifications_table.name,
+                    Key={'NotificationID': notification_id},
+                    UpdateExpression="set ReadStatus = :read_status remove UnreadUserID",
+                    ConditionExpression="UserID = :user_id AND ReadStatus = :unread",
+                    ExpressionAttributeValues={
+                        ':read_status': {'BOOL': True},
+                        ':user_id': {'S': user['user_id']},
+                        ':unread': {'BOOL': False}
+                    }
+                )
+                return 1
+            except ClientError as e:
+                # Already read by another request
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    return 0
+                raise
         
-        # Get updated notification
-        updated_result = notifications_table.get_item(Key={'NotificationID': notification_id})
-        updated_notification = updated_result['Item']
+        updated = 0
         
-        return response.success(updated_notification)
+        with ThreadPoolExecutor(max_workers=READ_ALL_WORKERS) as executor:
+            while True:
+                result = client.query(**page_params)
+                notification_ids = [item['NotificationID'] for item in result.get('Items', [])]
+                
+                updated += sum(executor.map(mark_read, notification_ids))
+                
+                if 'LastEvaluatedKey' not in result:
+                    break
+                page_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+        
+        unread_count.adjust(stats_table, user['user_id'], -updated)
+        
+        return response.success({
+            'message': 'All notifications marked as read',
+            'updated': updated
+        })
         
     except Exception as e:
-        print(f"Mark as read error: {str(e)}")
+        print(f"Mark all as read error: {str(e)}")
+        return response.server_error(str(e))
+
+def get_settings(event):
+    """Get the current user's notification settings."""
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    try:
+        result = users_table.get_item(
+            Key={'UserID': user['user_id']},
+            ProjectionExpression='NotificationSettings'
+        )
+        
+        return response.success({
+            **preferences.DEFAULT_SETTINGS,
+            **result.get('Item', {}).get('NotificationSettings', {})
+        })
+        
+    except Exception as e:
+        print(f"Get settings error: {str(e)}")
         return response.server_error(str(e))
 
 def update_settings(event):
-    """Update notification settings."""
+    """
+    Update notification settings.
+    
+    The settings replace the stored ones on the user's item in the Users
+    table; keys left out are reset to their defaults.
+    """
     # Validate token
     user = auth.validate_token(event)
     if not user:
@@ -135,11 +350,25 @@ def update_settings(event):
         if 'settings' not in body:
             return response.bad_request("Missing settings field")
         
-        settings = body['settings']
+        settings, error = preferences.validate(body['settings'])
+        if error:
+            return response.bad_request(error)
         
-        # Update user's notification settings in DynamoDB
-        # Note: This would require adding a NotificationSettings field to the Users table
-        # For now, we'll just return success
+        # Store the settings on the user's profile
+        try:
+            users_table.update_item(
+                Key={'UserID': user['user_id']},
+                UpdateExpression="set NotificationSettings = :settings",
+                ConditionExpression="attribute_exists(UserID)",
+                ExpressionAttributeValues={':settings': settings}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return response.not_found("User not found")
+            raise
+        
+        # Ingestion in this container sees the change at once, others within the TTL
+        preferences.cache.invalidate(user['user_id'])
         
         return response.success({
             'message': 'Notification settings updated successfully',
@@ -155,48 +384,17 @@ def process_sns_notification(event, context):
     Process SNS notifications and store them in DynamoDB.
     
     This function is triggered by SNS messages, not API Gateway events.
+    Records that could not be stored fail the invocation so SNS redelivers
+    them; stored ones are overwritten rather than duplicated.
     """
     try:
-        for record in event['Records']:
-            # Parse SNS message
-            sns_message = json.loads(record['Sns']['Message'])
-            
-            # Extract user ID from message attributes
-            user_id = record['Sns']['MessageAttributes']['user_id']['Value']
-            
-            # Create notification
-            notification_id = str(uuid.uuid4())
-            current_time = datetime.now().isoformat()
-            
-            notification_type = sns_message.get('type', 'general')
-            task_id = sns_message.get('task_id', '')
-            
-            # Generate message based on notification type
-            if notification_type == 'task_assigned':
-                message = f"You have been assigned a new task: {sns_message.get('title', '')}"
-            elif notification_type == 'task_status_updated':
-                message = f"Task '{sns_message.get('title', '')}' status has been updated to {sns_message.get('status', '')}"
-            elif notification_type == 'deadline_reminder':
-                message = sns_message.get('message', 'Task deadline reminder')
-            else:
-                message = sns_message.get('message', 'New notification')
-            
-            # Create notification item
-            notification = {
-                'NotificationID': notification_id,
-                'UserID': user_id,
-                'TaskID': task_id,
-                'Type': notification_type,
-                'Message': message,
-                'CreatedAt': current_time,
-                'ReadStatus': False
-            }
-            
-            # Save to DynamoDB
-            notifications_table.put_item(Item=notification)
-            
-            print(f"Created notification: {notification_id}")
+        result = ingestion.ingest(dynamodb, notifications_table.name, event['Records'], stats_table, users_table.name)
+        
+        print(f"Created {len(result['written'])} notifications")
+        
+        if result['failed']:
+            raise Exception(f"Failed to store {len(result['failed'])} of {len(event['Records'])} notifications")
             
     except Exception as e:
         print(f"Process SNS notification error: {str(e)}")
-        raise
\ No newline at end of file
+        raise
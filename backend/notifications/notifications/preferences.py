@@ -0,0 +1,229 @@
+"""
+Per-user notification preferences.
+
+Preferences are stored as the NotificationSettings map on the user's item
+in the Users table:
+
+    muted_types: notification types the user never receives
+    quiet_hours: daily window, {'start': 'HH:MM', 'end': 'HH:MM',
+        'timezone': 'Area/City'}, in which notifications are not stored
+    digest: whether bursts of notifications are combined into digests
+
+Ingestion reads the preferences of every recipient of an SNS event with one
+BatchGetItem and keeps them in a per-container TTL cache, so a setting
+changed through another container applies within PREFERENCES_TTL seconds.
+"""
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+NOTIFICATION_TYPES = [
+    'task_assigned',
+    'task_reassigned',
+    'task_status_updated',
+    'deadline_reminder',
+    'tasks_overdue'
+]
+
+DEFAULT_SETTINGS = {
+    'muted_types': [],
+    'quiet_hours': None,
+    'digest': False
+}
+
+# Seconds cached preferences are used before being read again
+PREFERENCES_TTL = int(os.environ.get('NOTIFICATION_PREFERENCES_TTL', 60))
+
+# Keys per BatchGetItem call, and attempts for unprocessed keys
+MAX_BATCH_KEYS = 100
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.05
+
+def parse_time(value):
+    """Parse an 'HH:MM' time into minutes after midnight, None if invalid."""
+    try:
+        parsed = datetime.strptime(value, '%H:%M')
+    except (TypeError, ValueError):
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+def validate(settings):
+    """
+    Check notification settings from a request.
+
+    Args:
+        settings (dict): Settings to store; missing keys take their defaults
+
+    Returns:
+        tuple: Settings to store, and an error message (None if valid)
+    """
+    if not isinstance(settings, dict):
+        return None, "Settings must be an object"
+
+    unknown = set(settings) - set(DEFAULT_SETTINGS)
+    if unknown:
+        return None, f"Unknown setting: {sorted(unknown)[0]}"
+
+    settings = {**DEFAULT_SETTINGS, **settings}
+
+    muted_types = settings['muted_types']
+    if not isinstance(muted_types, list) or any(muted not in NOTIFICATION_TYPES for muted in muted_types):
+        return None, f"muted_types must be a list of: {', '.join(NOTIFICATION_TYPES)}"
+    settings['muted_types'] = sorted(set(muted_types))
+
+    quiet_hours = settings['quiet_hours']
+    if quiet_hours is not None:
+        if not isinstance(quiet_hours, dict):
+            return None, "quiet_hours must be an object with start and end"
+        start, end = parse_time(quiet_hours.get('start')), parse_time(quiet_hours.get('end'))
+        if start is None or end is None or start == end:
+            return None, "quiet_hours start and end must be different HH:MM times"
+        try:
+            ZoneInfo(quiet_hours.get('timezone', 'UTC'))
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            return None, "Invalid quiet_hours timezone"
+        settings['quiet_hours'] = {
+            'start': quiet_hours['start'],
+            'end': quiet_hours['end'],
+            'timezone': quiet_hours.get('timezone', 'UTC')
+        }
+
+    if not isinstance(settings['digest'], bool):
+        return None, "digest must be true or false"
+
+    return settings, None
+
+def in_quiet_hours(quiet_hours, now):
+    """
+    Check whether a time falls in a user's quiet hours.
+
+    Args:
+        quiet_hours (dict): Quiet hours setting, None for none
+        now (datetime): Timezone-aware current time
+
+    Returns:
+        bool: Whether notifications are currently suppressed
+    """
+    if not quiet_hours:
+        return False
+
+    local = now.astimezone(ZoneInfo(quiet_hours.get('timezone', 'UTC')))
+    minute = local.hour * 60 + local.minute
+    start, end = parse_time(quiet_hours['start']), parse_time(quiet_hours['end'])
+
+    if start < end:
+        return start <= minute < end
+    # The window wraps past midnight, e.g. 22:00 to 07:00
+    return minute >= start or minute < end
+
+def is_suppressed(settings, notification_type, now=None):
+    """
+    Check whether a notification should be dropped instead of stored.
+
+    Args:
+        settings (dict): Recipient's notification settings
+        notification_type (str): Notification type
+        now (datetime): Timezone-aware current time, defaults to now
+
+    Returns:
+        bool: Whether the notification is suppressed
+    """
+    if notification_type in settings.get('muted_types', []):
+        return True
+    return in_quiet_hours(settings.get('quiet_hours'), now or datetime.now(timezone.utc))
+
+class PreferenceCache:
+    """Caches users' notification settings for a fixed TTL."""
+
+    def __init__(self, ttl=PREFERENCES_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get_many(self, dynamodb, users_table_name, user_ids):
+        """
+        Get the notification settings of several users.
+
+        Cached settings are used while fresh and the rest are read with
+        BatchGetItem. Users without stored settings get the defaults.
+
+        Args:
+            dynamodb: DynamoDB service resource
+            users_table_name (str): Users table name
+            user_ids (iterable): UserIDs
+
+        Returns:
+            dict: UserID mapped to settings
+        """
+        now = time.monotonic()
+        settings = {}
+        missing = []
+
+        with self.lock:
+            for user_id in set(user_ids):
+                entry = self.entries.get(user_id)
+                if entry and now - entry[1] < self.ttl:
+                    settings[user_id] = entry[0]
+                else:
+                    missing.append(user_id)
+
+        if missing:
+            loaded = load(dynamodb, users_table_name, missing)
+            with self.lock:
+                for user_id, user_settings in loaded.items():
+                    self.entries[user_id] = (user_settings, now)
+            settings.update(loaded)
+
+        return settings
+
+    def invalidate(self, user_id):
+        """Drop a user's cached settings after they change."""
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        """Drop every cached setting."""
+        with self.lock:
+            self.entries.clear()
+
+def load(dynamodb, users_table_name, user_ids):
+    """
+    Read users' notification settings with BatchGetItem.
+
+    Args:
+        dynamodb: DynamoDB service resource
+        users_table_name (str): Users table name
+        user_ids (list): UserIDs
+
+    Returns:
+        dict: UserID mapped to settings
+    """
+    settings = {user_id: dict(DEFAULT_SETTINGS) for user_id in user_ids}
+
+    for start in range(0, len(user_ids), MAX_BATCH_KEYS):
+        request = {
+            users_table_name: {
+                'Keys': [{'UserID': user_id} for user_id in user_ids[start:start + MAX_BATCH_KEYS]],
+                'ProjectionExpression': 'UserID, NotificationSettings'
+            }
+        }
+
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(BASE_DELAY * 2 ** (attempt - 1))
+
+            result = dynamodb.batch_get_item(RequestItems=request)
+            for user in result.get('Responses', {}).get(users_table_name, []):
+                settings[user['UserID']] = {**DEFAULT_SETTINGS, **user.get('NotificationSettings', {})}
+
+            request = result.get('UnprocessedKeys')
+            if not request:
+                break
+        else:
+            raise Exception("Unprocessed preference lookups after retries")
+
+    return settings
+
+cache = PreferenceCache()
@@ -0,0 +1,71 @@
+"""
+Unread count reconciliation for the Task Management System.
+
+This function is triggered by EventBridge to repair per-user unread counts
+that missed an update, e.g. an increment that failed after its notification
+was stored, which a redelivery of the message no longer re-applies.
+"""
+import os
+import json
+import boto3
+from . import unread_count
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
+notifications_table = dynamodb.Table(os.environ.get('NOTIFICATIONS_TABLE'))
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+
+def user_ids():
+    """Yield the ID of every user."""
+    scan_params = {'ProjectionExpression': 'UserID'}
+
+    while True:
+        result = users_table.scan(**scan_params)
+
+        for item in result.get('Items', []):
+            yield item['UserID']
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        scan_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def lambda_handler(event, context):
+    """
+    Recount every user's unread notifications and repair drifted counts.
+
+    Counters updated during their recount are left for the next run.
+
+    This function is triggered by EventBridge on a schedule.
+    """
+    try:
+        drift = {}
+        skipped = []
+
+        for user_id in user_ids():
+            change = unread_count.reconcile(stats_table, notifications_table, user_id)
+            if change is None:
+                skipped.append(user_id)
+            elif change:
+                drift[user_id] = change
+
+        if drift:
+            print(f"Repaired unread count drift: {drift}")
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': f"Reconciled unread counts, {len(skipped)} changed during the recount",
+                'drift': drift,
+                'skipped': skipped
+            })
+        }
+
+    except Exception as e:
+        print(f"Reconcile unread counts error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': f"Error reconciling unread counts: {str(e)}"
+            })
+        }
@@ -0,0 +1,112 @@
+"""
+In-process publish/subscribe for notification Server-Sent Events.
+
+The local server streams GET /notifications/stream from here. Each open
+stream subscribes a bounded queue under its user, and the ingestion and
+read paths publish new notifications and unread-count changes to every
+queue of the user concerned. Idle streams receive a heartbeat comment so
+proxies keep the connection open.
+
+Only streams served by the same process see an event; where nothing is
+subscribed, as in Lambda, publishing does nothing.
+"""
+import json
+import queue
+import threading
+
+# Seconds between heartbeats on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# Events buffered per stream before further ones are dropped
+MAX_QUEUED_EVENTS = 100
+
+class NotificationBroker:
+    """Fans events out to the queues subscribed under each user."""
+
+    def __init__(self, max_queued=MAX_QUEUED_EVENTS):
+        self.max_queued = max_queued
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """
+        Subscribe a new queue to a user's events.
+
+        Returns:
+            queue.Queue: Queue receiving (event, data) pairs
+        """
+        events = queue.Queue(maxsize=self.max_queued)
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(events)
+        return events
+
+    def unsubscribe(self, user_id, events):
+        """Remove a queue from a user's subscribers."""
+        with self.lock:
+            user_queues = self.subscribers.get(user_id, set())
+            user_queues.discard(events)
+            if not user_queues:
+                self.subscribers.pop(user_id, None)
+
+    def publish(self, user_id, event, data):
+        """
+        Send an event to every stream of a user.
+
+        A stream that has fallen MAX_QUEUED_EVENTS behind misses the event
+        rather than blocking the publisher.
+
+        Args:
+            user_id (str): UserID
+            event (str): Event name
+            data (dict): JSON-serializable event data
+        """
+        with self.lock:
+            user_queues = list(self.subscribers.get(user_id, ()))
+
+        for events in user_queues:
+            try:
+                events.put_nowait((event, data))
+            except queue.Full:
+                print(f"Dropped {event} event for a slow stream of {user_id}")
+
+broker = NotificationBroker()
+
+def publish(user_id, event, data):
+    """Send an event to every stream of a user on the shared broker."""
+    broker.publish(user_id, event, data)
+
+def format_event(event, data):
+    """Format an event as a Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def events(user_id, heartbeat=HEARTBEAT_INTERVAL, source=None):
+    """
+    Yield a user's events as Server-Sent Events messages until closed.
+
+    Args:
+        user_id (str): UserID
+        heartbeat (float): Seconds between heartbeats while idle
+        source (NotificationBroker): Broker to subscribe to, the shared one by default
+
+    Yields:
+        str: Server-Sent Events messages and heartbeat comments
+    """
+    source = source or broker
+    subscription = source.subscribe(user_id)
+
+    try:
+        # Tell the client the stream is open before the first event
+        yield ": connected\n\n"
+
+        while True:
+            try:
+                event, data = subscription.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+
+            yield format_event(event, data)
+
+    finally:
+        # Runs when the client disconnects and the generator is closed
+        source.unsubscribe(user_id, subscription)
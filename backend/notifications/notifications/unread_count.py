@@ -0,0 +1,160 @@
+"""
+Per-user unread notification counters.
+
+Each user's count is an item in the Stats table, adjusted with atomic ADD
+updates as notifications are stored and read, so the navigation badge is a
+single-key read. Every change is published to the user's notification
+streams.
+
+Updates also bump the counter's Version, so reconcile can recount a user's
+unread notifications and repair the counter only if no update raced it.
+"""
+import boto3
+from botocore.exceptions import ClientError
+from . import stream
+
+def counter_key(user_id):
+    """Get the Stats table key of a user's unread counter."""
+    return {'StatID': f"unread_count#{user_id}"}
+
+def adjust(stats_table, user_id, delta):
+    """
+    Add to a user's unread count.
+
+    Decrements never take the count below zero, which notifications stored
+    before the counter existed would otherwise do when read. Failures are
+    logged rather than raised, as the notification write has already
+    succeeded; the scheduled reconciliation repairs the count.
+
+    Args:
+        stats_table: Stats table resource
+        user_id (str): UserID
+        delta (int): Change in unread notifications
+
+    Returns:
+        int: The new unread count, or None if it was not updated
+    """
+    if not delta:
+        return None
+
+    try:
+        if delta > 0:
+            result = stats_table.update_item(
+                Key=counter_key(user_id),
+                UpdateExpression="ADD UnreadCount :delta, Version :one",
+                ExpressionAttributeValues={':delta': delta, ':one': 1},
+                ReturnValues='UPDATED_NEW'
+            )
+            count = int(result['Attributes']['UnreadCount'])
+        else:
+            try:
+                result = stats_table.update_item(
+                    Key=counter_key(user_id),
+                    UpdateExpression="ADD UnreadCount :delta, Version :one",
+                    ConditionExpression="UnreadCount >= :amount",
+                    ExpressionAttributeValues={':delta': delta, ':amount': -delta, ':one': 1},
+                    ReturnValues='UPDATED_NEW'
+                )
+                count = int(result['Attributes']['UnreadCount'])
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                stats_table.update_item(
+                    Key=counter_key(user_id),
+                    UpdateExpression="set UnreadCount = :zero ADD Version :one",
+                    ExpressionAttributeValues={':zero': 0, ':one': 1}
+                )
+                count = 0
+
+    except Exception as e:
+        print(f"Failed to update unread count for {user_id}: {str(e)}")
+        return None
+
+    stream.publish(user_id, 'unread_count', {'unread_count': count})
+    return count
+
+def get(stats_table, user_id):
+    """
+    Get a user's unread count.
+
+    Args:
+        stats_table: Stats table resource
+        user_id (str): UserID
+
+    Returns:
+        int: Unread notifications, 0 before the first notification
+    """
+    result = stats_table.get_item(Key=counter_key(user_id))
+    return int(result.get('Item', {}).get('UnreadCount', 0))
+
+def count_unread(notifications_table, user_id):
+    """
+    Count a user's unread notifications in UnreadNotificationsIndex.
+
+    Args:
+        notifications_table: Notifications table resource
+        user_id (str): UserID
+
+    Returns:
+        int: Unread notifications
+    """
+    query_params = {
+        'IndexName': 'UnreadNotificationsIndex',
+        'KeyConditionExpression': boto3.dynamodb.conditions.Key('UnreadUserID').eq(user_id),
+        'Select': 'COUNT'
+    }
+    count = 0
+
+    while True:
+        result = notifications_table.query(**query_params)
+        count += result['Count']
+
+        if 'LastEvaluatedKey' not in result:
+            return count
+        query_params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def reconcile(stats_table, notifications_table, user_id):
+    """
+    Recount a user's unread notifications and repair a drifted counter.
+
+    The counter is only overwritten if its version is unchanged since it
+    was read before the recount, so updates made meanwhile are not lost.
+
+    Args:
+        stats_table: Stats table resource
+        notifications_table: Notifications table resource
+        user_id (str): UserID
+
+    Returns:
+        int: Change made to the count, or None if the counter was updated
+            during the recount and left as it is
+    """
+    result = stats_table.get_item(Key=counter_key(user_id), ConsistentRead=True)
+    current = result.get('Item', {})
+    version = current.get('Version')
+    stored = int(current.get('UnreadCount', 0))
+
+    count = count_unread(notifications_table, user_id)
+    if count == stored:
+        return 0
+
+    if version is None:
+        condition = {'ConditionExpression': 'attribute_not_exists(Version)'}
+    else:
+        condition = {
+            'ConditionExpression': 'Version = :version',
+            'ExpressionAttributeValues': {':version': version}
+        }
+
+    try:
+        stats_table.put_item(
+            Item={**counter_key(user_id), 'UnreadCount': count, 'Version': (version or 0) + 1},
+            **condition
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None
+        raise
+
+    stream.publish(user_id, 'unread_count', {'unread_count': count})
+    return count - stored
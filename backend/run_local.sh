@@ -16,6 +16,8 @@ python3 local_setup.py
 export USERS_TABLE=Users-dev
 export TASKS_TABLE=Tasks-dev
 export NOTIFICATIONS_TABLE=Notifications-dev
+export STATS_TABLE=Stats-dev
+export ROLLUPS_TABLE=Rollups-dev
 export USER_POOL_ID=mock-user-pool-id
 export USER_POOL_CLIENT_ID=mock-user-pool-client-id
 export NOTIFICATION_TOPIC=mock-notification-topic
@@ -55,6 +55,10 @@ def not_found(message='Resource not found'):
     """Return a 404 Not Found response."""
     return build_response(404, {'success': False, 'message': message})
 
+def conflict(message='Conflict'):
+    """Return a 409 Conflict response."""
+    return build_response(409, {'success': False, 'message': message})
+
 def server_error(message='Internal server error'):
     """Return a 500 Internal Server Error response."""
     return build_response(500, {'success': False, 'message': message})
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Task counters shared by the task and admin API endpoints.
+
+A single item in the Stats table holds the total number of tasks and the
+number of tasks per status and priority. Task writes adjust it with atomic
+ADD updates in the same transaction, so the admin overview is one read.
+"""
+import os
+from boto3.dynamodb.types import TypeSerializer
+
+# Get environment variables
+STATS_TABLE = os.environ.get('STATS_TABLE')
+
+COUNTERS_KEY = {'StatID': 'task_counters'}
+STATUSES = ['New', 'In Progress', 'Completed', 'Overdue']
+PRIORITIES = ['Low', 'Medium', 'High']
+
+serializer = TypeSerializer()
+
+def serialize(item):
+    """
+    Convert a Python dict to the DynamoDB attribute value format.
+
+    Args:
+        item (dict): Item or expression values
+
+    Returns:
+        dict: Values in the low-level client format
+    """
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+def get_deltas(old_task=None, new_task=None):
+    """
+    Compute the counter changes for a task write.
+
+    Args:
+        old_task (dict): Task before the write, None for a create
+        new_task (dict): Task after the write, None for a delete
+
+    Returns:
+        dict: Counter attribute names mapped to non-zero deltas
+    """
+    deltas = {}
+
+    for task, sign in ((old_task, -1), (new_task, 1)):
+        if task is None:
+            continue
+
+        for name in ('TotalTasks',
+                     f"Status_{task.get('Status', 'New')}",
+                     f"Priority_{task.get('Priority', 'Medium')}"):
+            deltas[name] = deltas.get(name, 0) + sign
+
+    return {name: delta for name, delta in deltas.items() if delta}
+
+def update_operation(deltas):
+    """
+    Build a TransactWriteItems operation applying counter deltas.
+
+    Args:
+        deltas (dict): Counter attribute names mapped to deltas
+
+    Returns:
+        dict: Update operation for transact_write_items
+    """
+    add_expressions = []
+    expression_names = {}
+    expression_values = {}
+
+    for index, (name, delta) in enumerate(sorted(deltas.items())):
+        add_expressions.append(f"#c{index} :c{index}")
+        expression_names[f"#c{index}"] = name
+        expression_values[f":c{index}"] = {'N': str(delta)}
+
+    # Every write bumps the version, so the reconciler can detect writes during its scan
+    add_expressions.append("#version :version")
+    expression_names['#version'] = 'Version'
+    expression_values[':version'] = {'N': '1'}
+
+    return {
+        'Update': {
+            'TableName': STATS_TABLE,
+            'Key': serialize(COUNTERS_KEY),
+            'UpdateExpression': "ADD " + ", ".join(add_expressions),
+            'ExpressionAttributeNames': expression_names,
+            'ExpressionAttributeValues': expression_values
+        }
+    }
+
+def count_tasks(tasks):
+    """
+    Count tasks into a counters item.
+
+    Args:
+        tasks (iterable): Task items
+
+    Returns:
+        dict: Counters item, including its key
+    """
+    item = dict(COUNTERS_KEY)
+    item['TotalTasks'] = 0
+    for status in STATUSES:
+        item[f"Status_{status}"] = 0
+    for priority in PRIORITIES:
+        item[f"Priority_{priority}"] = 0
+
+    for task in tasks:
+        for name, delta in get_deltas(new_task=task).items():
+            item[name] = item.get(name, 0) + delta
+
+    return item
+
+def to_overview(item):
+    """
+    Format a counters item as the admin task overview.
+
+    Args:
+        item (dict): Counters item
+
+    Returns:
+        dict: Total, per-status and per-priority task counts
+    """
+    return {
+        'total_tasks': int(item.get('TotalTasks', 0)),
+        'status_counts': {
+            status: int(item.get(f"Status_{status}", 0)) for status in STATUSES
+        },
+        'priority_counts': {
+            priority: int(item.get(f"Priority_{priority}", 0)) for priority in PRIORITIES
+        }
+    }
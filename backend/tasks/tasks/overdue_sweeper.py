@@ -0,0 +1,302 @@
+"""
+Overdue task sweeper for the Task Management System.
+
+This function is triggered by EventBridge to mark open tasks whose deadline
+has passed as Overdue. Candidates are read from OpenDeadlineIndex, one
+deadline day at a time, with a range query on Deadline. They are flipped in
+conditional transactions that also move the task counters, and each
+assignee receives a single notification listing their newly overdue tasks.
+
+Progress is checkpointed in the Stats table, so a large backlog is worked
+off over several runs.
+"""
+import os
+import json
+import boto3
+from datetime import datetime, timedelta
+from botocore.exceptions import ClientError
+from boto3.dynamodb.types import TypeDeserializer
+import sys
+
+# Add parent directory to path to import common modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import task_counters
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+stats_table = dynamodb.Table(os.environ.get('STATS_TABLE'))
+client = dynamodb.meta.client
+tasks_table_name = os.environ.get('TASKS_TABLE')
+sns = boto3.client('sns')
+notification_topic = os.environ.get('NOTIFICATION_TOPIC')
+
+CHECKPOINT_KEY = {'StatID': 'overdue_sweep_checkpoint'}
+
+# Days swept by the first run
+BACKFILL_DAYS = int(os.environ.get('OVERDUE_BACKFILL_DAYS', 90))
+
+# Days before the checkpoint swept again, for deadlines moved into the past
+LOOKBACK_DAYS = 7
+
+# Tasks flipped per run, and per transaction
+MAX_TASKS_PER_RUN = 5000
+UPDATE_BATCH_SIZE = 25
+
+# Messages per SNS publish_batch call, and tasks listed in each message
+PUBLISH_BATCH_SIZE = 10
+MAX_LISTED_TASKS = 50
+
+SWEPT_STATUSES = ['New', 'In Progress']
+
+deserializer = TypeDeserializer()
+
+def get_checkpoint(today):
+    """
+    Get the day the last run stopped at.
+
+    Args:
+        today (date): Current date
+
+    Returns:
+        tuple: First day not fully swept, and the query key to resume it
+            from (None to sweep the whole day)
+    """
+    result = stats_table.get_item(Key=CHECKPOINT_KEY)
+
+    if 'Item' not in result:
+        return today - timedelta(days=BACKFILL_DAYS), None
+
+    item = result['Item']
+    last_key = json.loads(item['LastKey']) if item.get('LastKey') else None
+    return datetime.fromisoformat(item['Day']).date(), last_key
+
+def save_checkpoint(day, last_key=None):
+    """Record the day, and query key within it, the next run resumes from."""
+    item = {**CHECKPOINT_KEY, 'Day': day.isoformat()}
+    if last_key:
+        item['LastKey'] = json.dumps(last_key)
+
+    stats_table.put_item(Item=item)
+
+def query_candidates(day, now, start_key=None):
+    """
+    Yield pages of tasks that are due on a day, past their deadline and not
+    yet marked overdue.
+
+    Args:
+        day (date): Deadline day
+        now (str): Current timestamp
+        start_key (dict): Query key to resume from
+
+    Yields:
+        tuple: Tasks on the page, and the key of the page's last item (None
+            on the last page)
+    """
+    params = {
+        'TableName': tasks_table_name,
+        'IndexName': 'OpenDeadlineIndex',
+        'KeyConditionExpression': 'DeadlineBucket = :day AND Deadline < :now',
+        'FilterExpression': '#status IN (:new, :in_progress)',
+        'ProjectionExpression': 'TaskID, Title, AssignedTo, Deadline, Priority, #status',
+        'ExpressionAttributeNames': {'#status': 'Status'},
+        'ExpressionAttributeValues': task_counters.serialize({
+            ':day': day.isoformat(),
+            ':now': now,
+            ':new': SWEPT_STATUSES[0],
+            ':in_progress': SWEPT_STATUSES[1]
+        }),
+        'Limit': UPDATE_BATCH_SIZE
+    }
+    if start_key:
+        params['ExclusiveStartKey'] = start_key
+
+    while True:
+        result = client.query(**params)
+        tasks = [
+            {key: deserializer.deserialize(value) for key, value in item.items()}
+            for item in result.get('Items', [])
+        ]
+        yield tasks, result.get('LastEvaluatedKey')
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        params['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def mark_overdue(tasks):
+    """
+    Flip tasks to Overdue in one transaction with their counter updates.
+
+    Each update is conditional on the task's status and deadline being
+    unchanged since it was read. Tasks failing the condition are dropped
+    and the transaction is retried with the rest.
+
+    Args:
+        tasks (list): Tasks read by query_candidates
+
+    Returns:
+        list: Tasks marked overdue
+    """
+    pending = list(tasks)
+
+    while pending:
+        deltas = {}
+        for task in pending:
+            for name, delta in task_counters.get_deltas(task, {**task, 'Status': 'Overdue'}).items():
+                deltas[name] = deltas.get(name, 0) + delta
+
+        transact_items = [{
+            'Update': {
+                'TableName': tasks_table_name,
+                'Key': task_counters.serialize({'TaskID': task['TaskID']}),
+                'UpdateExpression': "set #status = :overdue",
+                'ConditionExpression': "#status = :status AND Deadline = :deadline",
+                'ExpressionAttributeNames': {'#status': 'Status'},
+                'ExpressionAttributeValues': task_counters.serialize({
+                    ':overdue': 'Overdue',
+                    ':status': task['Status'],
+                    ':deadline': task['Deadline']
+                })
+            }
+        } for task in pending]
+        transact_items.append(task_counters.update_operation(deltas))
+
+        try:
+            client.transact_write_items(TransactItems=transact_items)
+            return pending
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons', [])
+            failed = {
+                index for index, reason in enumerate(reasons[:len(pending)])
+                if reason.get('Code') == 'ConditionalCheckFailed'
+            }
+            if not failed:
+                raise
+            pending = [task for index, task in enumerate(pending) if index not in failed]
+
+    return []
+
+def overdue_message(tasks):
+    """
+    Build the notification telling an assignee which tasks became overdue.
+
+    Args:
+        tasks (list): The assignee's newly overdue tasks
+
+    Returns:
+        dict: SNS message
+    """
+    if len(tasks) == 1:
+        return {
+            'type': 'tasks_overdue',
+            'task_id': tasks[0]['TaskID'],
+            'task_ids': [tasks[0]['TaskID']],
+            'count': 1,
+            'message': f"Task '{tasks[0]['Title']}' is overdue"
+        }
+
+    listed = tasks[:MAX_LISTED_TASKS]
+    message = f"{len(tasks)} of your tasks are overdue: " + ", ".join(f"'{task['Title']}'" for task in listed)
+    if len(tasks) > len(listed):
+        message += f" and {len(tasks) - len(listed)} more"
+
+    return {
+        'type': 'tasks_overdue',
+        'task_ids': [task['TaskID'] for task in listed],
+        'count': len(tasks),
+        'message': message
+    }
+
+def notify_assignees(tasks):
+    """
+    Send each assignee one notification about their newly overdue tasks.
+
+    Returns:
+        int: Number of notifications sent
+    """
+    by_assignee = {}
+    for task in tasks:
+        if task.get('AssignedTo'):
+            by_assignee.setdefault(task['AssignedTo'], []).append(task)
+
+    entries = [{
+        'Id': str(index),
+        'Message': json.dumps(overdue_message(assigned)),
+        'MessageAttributes': {
+            'user_id': {
+                'DataType': 'String',
+                'StringValue': assignee
+            }
+        }
+    } for index, (assignee, assigned) in enumerate(by_assignee.items())]
+
+    sent = 0
+    for start in range(0, len(entries), PUBLISH_BATCH_SIZE):
+        try:
+            result = sns.publish_batch(
+                TopicArn=notification_topic,
+                PublishBatchRequestEntries=entries[start:start + PUBLISH_BATCH_SIZE]
+            )
+            sent += len(result.get('Successful', []))
+            for failure in result.get('Failed', []):
+                print(f"Failed to send overdue notification {failure['Id']}: {failure.get('Message', '')}")
+        except Exception as e:
+            print(f"Failed to send overdue notifications: {str(e)}")
+
+    return sent
+
+def lambda_handler(event, context):
+    """
+    Mark open tasks past their deadline as Overdue.
+
+    This function is triggered by EventBridge on a schedule.
+    """
+    try:
+        now = datetime.now()
+        today = now.date()
+
+        checkpoint_day, resume_key = get_checkpoint(today)
+        day = min(checkpoint_day, today - timedelta(days=LOOKBACK_DAYS))
+
+        overdue = []
+        finished = True
+
+        while day <= today and finished:
+            start_key = resume_key if day == checkpoint_day else None
+
+            for tasks, last_key in query_candidates(day, now.isoformat(), start_key):
+                if tasks:
+                    overdue.extend(mark_overdue(tasks))
+
+                # Stop at the budget, resuming after this page next run
+                if len(overdue) >= MAX_TASKS_PER_RUN and (last_key or day < today):
+                    if last_key:
+                        save_checkpoint(day, last_key)
+                    else:
+                        save_checkpoint(day + timedelta(days=1))
+                    finished = False
+                    break
+
+            day += timedelta(days=1)
+
+        # Deadlines keep passing today, so today is never fully swept
+        if finished:
+            save_checkpoint(today)
+
+        sent = notify_assignees(overdue)
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': f"Marked {len(overdue)} tasks overdue and sent {sent} notifications",
+                'finished': finished
+            })
+        }
+
+    except Exception as e:
+        print(f"Overdue sweep error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': f"Error sweeping overdue tasks: {str(e)}"
+            })
+        }
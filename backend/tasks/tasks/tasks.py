@@ -5,19 +5,35 @@ import os
 import json
 import boto3
 import uuid
+import time
 from datetime import datetime
+from botocore.exceptions import ClientError
 import sys
 
 # Add parent directory to path to import common modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from common import response, auth
+from common import response, auth, task_counters, completion_sketch
+from . import workload
 
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
+users_table = dynamodb.Table(os.environ.get('USERS_TABLE'))
 tasks_table = dynamodb.Table(os.environ.get('TASKS_TABLE'))
 sns = boto3.client('sns')
 notification_topic = os.environ.get('NOTIFICATION_TOPIC')
 
+# Tasks per bulk request, and per transaction when writing them
+MAX_BULK_TASKS = 1000
+BULK_WRITE_SIZE = 25
+
+# Messages per SNS publish_batch call
+PUBLISH_BATCH_SIZE = 10
+
+# Attempts and base backoff delay (seconds) for transactions that conflict
+# with another write to the counters item
+TRANSACT_ATTEMPTS = 4
+TRANSACT_RETRY_DELAY = 0.05
+
 def lambda_handler(event, context):
     """
     Main handler for task management API endpoints.
@@ -32,9 +48,11 @@ def lambda_handler(event, context):
         return get_tasks(event)
     elif http_method == 'POST' and path == '/tasks':
         return create_task(event)
+    elif http_method == 'POST' and path == '/tasks/bulk':
+        return bulk_create_tasks(event)
     elif http_method == 'GET' and '/tasks/' in path and not path.endswith('/status'):
         return get_task(event)
-    elif http_method == 'PUT' and '/tasks/' in path and not path.endswith('/status'):
+    elif http_method == 'PUT' and '/tasks/' in path and not path.endswith(('/status', '/assign')):
         return update_task(event)
     elif http_method == 'DELETE' and '/tasks/' in path:
         return delete_task(event)
@@ -45,6 +63,158 @@ def lambda_handler(event, context):
     else:
         return response.not_found('Endpoint not found')
 
+def write_task(operation, old_task=None, new_task=None, extra_operations=None):
+    """
+    Apply a task write and the matching counter updates in one transaction.
+    
+    Args:
+        operation (dict): TransactWriteItems operation on the task
+        old_task (dict): Task before the write, None for a create
+        new_task (dict): Task after the write, None for a delete
+        extra_operations (list): Further operations to apply with the write
+        
+    Returns:
+        bool: False if a condition on the task failed, True otherwise
+    """
+    transact_items = [operation]
+    
+    deltas = task_counters.get_deltas(old_task, new_task)
+    if deltas:
+        transact_items.append(task_counters.update_operation(deltas))
+    transact_items.extend(extra_operations or [])
+    
+    try:
+        transact_write(transact_items)
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons', [])
+        if reasons and reasons[0].get('Code') == 'ConditionalCheckFailed':
+            return False
+        raise
+    
+    return True
+
+def transact_write(transact_items):
+    """
+    Write a transaction, retrying cancellations caused by conflicting writes.
+    
+    Every task write also updates the single counters item, so concurrent
+    writes cancel each other with TransactionConflict. Those are retried
+    with exponential backoff; any other cancellation is raised.
+    
+    Args:
+        transact_items (list): TransactWriteItems operations
+    """
+    for attempt in range(TRANSACT_ATTEMPTS):
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+            return
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons', [])
+            codes = {reason.get('Code') for reason in reasons}
+            if ('TransactionConflict' not in codes or 'ConditionalCheckFailed' in codes
+                    or attempt == TRANSACT_ATTEMPTS - 1):
+                raise
+        
+        time.sleep(TRANSACT_RETRY_DELAY * 2 ** attempt)
+
+def deadline_bucket(deadline):
+    """
+    Get the OpenDeadlineIndex partition of a deadline.
+    
+    Only open tasks carry a DeadlineBucket, which keeps the index sparse.
+    
+    Args:
+        deadline (str): ISO 8601 deadline
+        
+    Returns:
+        str: Deadline date (YYYY-MM-DD)
+    """
+    return deadline[:10]
+
+def completion_hours(task, completed_at):
+    """
+    Get the time a task took to complete.
+    
+    Args:
+        task (dict): Task being completed
+        completed_at (str): Completion timestamp
+        
+    Returns:
+        float: Hours from creation to completion, None if unknown
+    """
+    try:
+        created_at = datetime.fromisoformat(task['CreatedAt'])
+        hours = (datetime.fromisoformat(completed_at) - created_at).total_seconds() / 3600
+    except (KeyError, TypeError, ValueError):
+        return None
+    
+    return hours if hours >= 0 else None
+
+def validate_new_task(body, auto_assign=False):
+    """
+    Check the fields of a task to create.
+    
+    Args:
+        body (dict): Task fields from the request
+        auto_assign (bool): Whether the assignee is picked automatically
+        
+    Returns:
+        str: Error message, None if the task is valid
+    """
+    required_fields = ['title', 'description', 'priority', 'deadline']
+    if not auto_assign:
+        required_fields.append('assignedTo')
+    
+    for field in required_fields:
+        if field not in body:
+            return f"Missing required field: {field}"
+    
+    if body['priority'] not in ['Low', 'Medium', 'High']:
+        return "Invalid priority. Must be 'Low', 'Medium', or 'High'"
+    
+    return None
+
+def new_task(body, created_by, assigned_to):
+    """
+    Build a new task item.
+    
+    Args:
+        body (dict): Task fields from the request
+        created_by (str): UserID of the admin creating the task
+        assigned_to (str): UserID of the assignee
+        
+    Returns:
+        dict: Task item
+    """
+    created_at = datetime.now().isoformat()
+    
+    return {
+        'TaskID': str(uuid.uuid4()),
+        'Title': body['title'],
+        'Description': body['description'],
+        'Priority': body['priority'],
+        'Status': 'New',
+        'CreatedBy': created_by,
+        'AssignedTo': assigned_to,
+        'CreatedAt': created_at,
+        'CreatedDay': created_at[:10],  # CreatedDayIndex partition for the daily rollup
+        'Deadline': body['deadline'],
+        'DeadlineBucket': deadline_bucket(body['deadline']),
+        'Notes': body.get('notes', '')
+    }
+
+def get_workload_loads(department=None):
+    """
+    Get the priority-weighted open-task load of every eligible team member.
+    
+    Args:
+        department (str): Only include members of this department
+        
+    Returns:
+        dict: UserID mapped to (load, open task count)
+    """
+    return workload.get_loads(dynamodb.meta.client, users_table.name, tasks_table.name, department)
+
 def get_tasks(event):
     """Get tasks based on user role and query parameters."""
     # Validate token
@@ -128,35 +298,34 @@ def create_task(event):
         # Parse request body
         body = json.loads(event['body'])
         
-        # Validate required fields
-        required_fields = ['title', 'description', 'priority', 'assignedTo', 'deadline']
-        for field in required_fields:
-            if field not in body:
-                return response.bad_request(f"Missing required field: {field}")
+        auto_assign = bool(body.get('autoAssign'))
         
-        # Validate priority
-        if body['priority'] not in ['Low', 'Medium', 'High']:
-            return response.bad_request("Invalid priority. Must be 'Low', 'Medium', or 'High'")
+        # Validate fields
+        error = validate_new_task(body, auto_assign)
+        if error:
+            return response.bad_request(error)
+        
+        # Pick the least-loaded team member
+        if auto_assign:
+            balancer = workload.WorkloadBalancer(get_workload_loads(body.get('department')))
+            if not balancer:
+                return response.bad_request("No team members available for auto-assignment")
+            assigned_to = balancer.assign(body['priority'])
+        else:
+            assigned_to = body['assignedTo']
         
         # Create task
-        task_id = str(uuid.uuid4())
-        current_time = datetime.now().isoformat()
-        
-        task = {
-            'TaskID': task_id,
-            'Title': body['title'],
-            'Description': body['description'],
-            'Priority': body['priority'],
-            'Status': 'New',
-            'CreatedBy': user['user_id'],
-            'AssignedTo': body['assignedTo'],
-            'CreatedAt': current_time,
-            'Deadline': body['deadline'],
-            'Notes': body.get('notes', '')
-        }
+        task = new_task(body, user['user_id'], assigned_to)
+        task_id = task['TaskID']
         
         # Save to DynamoDB
-        tasks_table.put_item(Item=task)
+        write_task({
+            'Put': {
+                'TableName': tasks_table.name,
+                'Item': task_counters.serialize(task),
+                'ConditionExpression': 'attribute_not_exists(TaskID)'
+            }
+        }, new_task=task)
         
         # Send notification
         try:
@@ -165,13 +334,13 @@ def create_task(event):
                 Message=json.dumps({
                     'type': 'task_assigned',
                     'task_id': task_id,
-                    'assigned_to': body['assignedTo'],
+                    'assigned_to': assigned_to,
                     'title': body['title']
                 }),
                 MessageAttributes={
                     'user_id': {
                         'DataType': 'String',
-                        'StringValue': body['assignedTo']
+                        'StringValue': assigned_to
                     }
                 }
             )
@@ -184,6 +353,116 @@ def create_task(event):
         print(f"Create task error: {str(e)}")
         return response.server_error(str(e))
 
+def bulk_create_tasks(event):
+    """
+    Create a batch of tasks.
+    
+    With autoAssign, tasks without an assignedTo are balanced across the
+    team: tasks with an explicit assignee are added to the loads first, then
+    the rest are assigned highest priority first, each to the least-loaded
+    member.
+    """
+    # Validate token
+    user = auth.validate_token(event)
+    if not user:
+        return response.unauthorized()
+    
+    # Check if user is admin
+    if user['role'] != 'admin':
+        return response.forbidden("Only admins can create tasks")
+    
+    try:
+        # Parse request body
+        body = json.loads(event['body'])
+        
+        items = body.get('tasks')
+        if not isinstance(items, list) or not items:
+            return response.bad_request("Missing tasks")
+        if len(items) > MAX_BULK_TASKS:
+            return response.bad_request(f"At most {MAX_BULK_TASKS} tasks can be created at once")
+        
+        auto_assign = bool(body.get('autoAssign'))
+        
+        # Validate fields
+        for index, item in enumerate(items):
+            error = validate_new_task(item, auto_assign and 'assignedTo' not in item)
+            if error:
+                return response.bad_request(f"Task {index}: {error}")
+        
+        assignees = [item.get('assignedTo') for item in items]
+        
+        # Balance the unassigned tasks across the team
+        unassigned = [index for index, assignee in enumerate(assignees) if assignee is None]
+        if unassigned:
+            loads = get_workload_loads(body.get('department'))
+            if not loads:
+                return response.bad_request("No team members available for auto-assignment")
+            
+            for item in items:
+                if item.get('assignedTo') in loads:
+                    load, count = loads[item['assignedTo']]
+                    loads[item['assignedTo']] = (load + workload.task_weight(item['priority']), count + 1)
+            
+            balancer = workload.WorkloadBalancer(loads)
+            unassigned.sort(key=lambda index: -workload.task_weight(items[index]['priority']))
+            for index in unassigned:
+                assignees[index] = balancer.assign(items[index]['priority'])
+        
+        tasks = [new_task(item, user['user_id'], assignee) for item, assignee in zip(items, assignees)]
+        
+        # Save to DynamoDB, one counter update per transaction
+        for start in range(0, len(tasks), BULK_WRITE_SIZE):
+            chunk = tasks[start:start + BULK_WRITE_SIZE]
+            
+            deltas = {}
+            for task in chunk:
+                for name, delta in task_counters.get_deltas(new_task=task).items():
+                    deltas[name] = deltas.get(name, 0) + delta
+            
+            transact_items = [{
+                'Put': {
+                    'TableName': tasks_table.name,
+                    'Item': task_counters.serialize(task),
+                    'ConditionExpression': 'attribute_not_exists(TaskID)'
+                }
+            } for task in chunk]
+            transact_items.append(task_counters.update_operation(deltas))
+            
+            transact_write(transact_items)
+        
+        # Send notifications
+        for start in range(0, len(tasks), PUBLISH_BATCH_SIZE):
+            try:
+                sns.publish_batch(
+                    TopicArn=notification_topic,
+                    PublishBatchRequestEntries=[{
+                        'Id': str(index),
+                        'Message': json.dumps({
+                            'type': 'task_assigned',
+                            'task_id': task['TaskID'],
+                            'assigned_to': task['AssignedTo'],
+                            'title': task['Title']
+                        }),
+                        'MessageAttributes': {
+                            'user_id': {
+                                'DataType': 'String',
+                                'StringValue': task['AssignedTo']
+                            }
+                        }
+                    } for index, task in enumerate(tasks[start:start + PUBLISH_BATCH_SIZE])]
+                )
+            except Exception as e:
+                print(f"Failed to send notifications: {str(e)}")
+        
+        return response.created({
+            'tasks': tasks,
+            'count': len(tasks)
+        })
+        
+    except Exception as e:
+        print(f"Bulk create tasks error: {str(e)}")
+        return response.server_error(str(e))
+
 def get_task(event):
     """Get a specific task by ID."""
     # Validate token
@@ -237,6 +516,8 @@ def update_task(event):
         if 'Item' not in result:
             return response.not_found("Task not found")
         
+        task = result['Item']
+        
         # Update allowed fields
         update_expressions = []
         expression_values = {}
@@ -259,6 +540,11 @@ def update_task(event):
             update_expressions.append("Deadline = :deadline")
             expression_values[':deadline'] = body['deadline']
             
+            # Move open tasks to the new deadline's index partition
+            if task.get('Status') != 'Completed':
+                update_expressions.append("DeadlineBucket = :deadline_bucket")
+                expression_values[':deadline_bucket'] = deadline_bucket(body['deadline'])
+            
         if 'notes' in body:
             update_expressions.append("Notes = :notes")
             expression_values[':notes'] = body['notes']
@@ -270,11 +556,28 @@ def update_task(event):
         update_expression = "set " + ", ".join(update_expressions)
         
         # Update task in DynamoDB
-        tasks_table.update_item(
-            Key={'TaskID': task_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values
-        )
+        if body.get('priority', task.get('Priority')) != task.get('Priority'):
+            # Priority changes move the task between counters
+            expression_values[':old_priority'] = task['Priority']
+            
+            updated = write_task({
+                'Update': {
+                    'TableName': tasks_table.name,
+                    'Key': task_counters.serialize({'TaskID': task_id}),
+                    'UpdateExpression': update_expression,
+                    'ConditionExpression': 'Priority = :old_priority',
+                    'ExpressionAttributeValues': task_counters.serialize(expression_values)
+                }
+            }, old_task=task, new_task={**task, 'Priority': body['priority']})
+            
+            if not updated:
+                return response.conflict("Task was modified concurrently, please retry")
+        else:
+            tasks_table.update_item(
+                Key={'TaskID': task_id},
+                UpdateExpression=update_expression,
+                ExpressionAttributeValues=expression_values
+            )
         
         # Get updated task
         updated_result = tasks_table.get_item(Key={'TaskID': task_id})
@@ -328,8 +631,24 @@ def delete_task(event):
         if 'Item' not in result:
             return response.not_found("Task not found")
         
+        task = result['Item']
+        
         # Delete task
-        tasks_table.delete_item(Key={'TaskID': task_id})
+        deleted = write_task({
+            'Delete': {
+                'TableName': tasks_table.name,
+                'Key': task_counters.serialize({'TaskID': task_id}),
+                'ConditionExpression': '#status = :status AND Priority = :priority',
+                'ExpressionAttributeNames': {'#status': 'Status'},
+                'ExpressionAttributeValues': task_counters.serialize({
+                    ':status': task['Status'],
+                    ':priority': task['Priority']
+                })
+            }
+        }, old_task=task)
+        
+        if not deleted:
+            return response.conflict("Task was modified concurrently, please retry")
         
         return response.success({"message": "Task deleted successfully"})
         
@@ -371,20 +690,51 @@ def update_task_status(event):
             return response.forbidden("You don't have access to this task")
         
         # Update status
-        update_expression = "set Status = :status"
+        update_expression = "set #status = :status"
         expression_values = {':status': body['status']}
         
-        # If status is Completed, set CompletedAt
+        # If status is Completed, set CompletedAt, file the task under its
+        # CompletedDayIndex partition and leave the open deadline index
         if body['status'] == 'Completed':
-            update_expression += ", CompletedAt = :completed_at"
+            update_expression += ", CompletedAt = :completed_at, CompletedDay = :completed_day remove DeadlineBucket"
             expression_values[':completed_at'] = datetime.now().isoformat()
+            expression_values[':completed_day'] = expression_values[':completed_at'][:10]
+        elif task.get('Deadline'):
+            update_expression += ", DeadlineBucket = :deadline_bucket"
+            expression_values[':deadline_bucket'] = deadline_bucket(task['Deadline'])
         
         # Update task in DynamoDB
-        tasks_table.update_item(
-            Key={'TaskID': task_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values
-        )
+        if body['status'] != task.get('Status'):
+            # Status changes move the task between counters
+            expression_values[':old_status'] = task['Status']
+            
+            # Record the completion time in the assignee's and team's sketches
+            sketch_operations = []
+            if body['status'] == 'Completed' and task.get('AssignedTo'):
+                hours = completion_hours(task, expression_values[':completed_at'])
+                if hours is not None:
+                    sketch_operations = completion_sketch.update_operations(task['AssignedTo'], hours)
+            
+            updated = write_task({
+                'Update': {
+                    'TableName': tasks_table.name,
+                    'Key': task_counters.serialize({'TaskID': task_id}),
+                    'UpdateExpression': update_expression,
+                    'ConditionExpression': '#status = :old_status',
+                    'ExpressionAttributeNames': {'#status': 'Status'},
+                    'ExpressionAttributeValues': task_counters.serialize(expression_values)
+                }
+            }, old_task=task, new_task={**task, 'Status': body['status']}, extra_operations=sketch_operations)
+            
+            if not updated:
+                return response.conflict("Task was modified concurrently, please retry")
+        else:
+            tasks_table.update_item(
+                Key={'TaskID': task_id},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames={'#status': 'Status'},
+                ExpressionAttributeValues=expression_values
+            )
         
         # Get updated task
         updated_result = tasks_table.get_item(Key={'TaskID': task_id})
@@ -435,7 +785,9 @@ def assign_task(event):
         # Parse request body
         body = json.loads(event['body'])
         
-        if 'assignedTo' not in body:
+        auto_assign = bool(body.get('autoAssign'))
+        
+        if 'assignedTo' not in body and not auto_assign:
             return response.bad_request("Missing assignedTo field")
         
         # Get task from DynamoDB
@@ -444,6 +796,21 @@ def assign_task(event):
         if 'Item' not in result:
             return response.not_found("Task not found")
         
+        task = result['Item']
+        
+        if auto_assign:
+            loads = get_workload_loads(body.get('department'))
+            
+            # The task no longer counts towards its current assignee's load
+            if task.get('Status') in workload.OPEN_STATUSES and task.get('AssignedTo') in loads:
+                load, count = loads[task['AssignedTo']]
+                loads[task['AssignedTo']] = (load - workload.task_weight(task.get('Priority')), count - 1)
+            
+            balancer = workload.WorkloadBalancer(loads)
+            if not balancer:
+                return response.bad_request("No team members available for auto-assignment")
+            body['assignedTo'] = balancer.assign(task.get('Priority'))
+        
         # Update assignee
         tasks_table.update_item(
             Key={'TaskID': task_id},
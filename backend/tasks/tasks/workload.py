@@ -0,0 +1,131 @@
+"""
+Workload-aware task assignment for the Task Management System.
+
+A team member's load is the priority-weighted number of their open tasks.
+Loads are read from AssignedToIndex, one query per member and open status,
+and kept in a min-heap, so each task is assigned to the least-loaded member
+in O(log n) and bulk batches are balanced without scanning the Tasks table.
+"""
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+PRIORITY_WEIGHTS = {'Low': 1, 'Medium': 2, 'High': 3}
+OPEN_STATUSES = ['New', 'In Progress', 'Overdue']
+
+# Parallel AssignedToIndex queries while loading the heap
+QUERY_WORKERS = 8
+
+def task_weight(priority):
+    """Get the load a task adds to its assignee."""
+    return PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS['Medium'])
+
+class WorkloadBalancer:
+    """Min-heap of team members ordered by load, then open task count."""
+
+    def __init__(self, loads):
+        """
+        Args:
+            loads (dict): UserID mapped to (load, open task count)
+        """
+        self.heap = [(load, count, user_id) for user_id, (load, count) in loads.items()]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def assign(self, priority):
+        """
+        Assign a task to the least-loaded team member.
+
+        Args:
+            priority (str): Task priority
+
+        Returns:
+            str: UserID of the assignee
+        """
+        load, count, user_id = self.heap[0]
+        heapq.heapreplace(self.heap, (load + task_weight(priority), count + 1, user_id))
+        return user_id
+
+def paginate_query(client, **kwargs):
+    """Yield every item of a low-level query, following pagination."""
+    while True:
+        result = client.query(**kwargs)
+        yield from result.get('Items', [])
+
+        if 'LastEvaluatedKey' not in result:
+            break
+        kwargs['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+def get_team_members(client, users_table_name, department=None):
+    """
+    Get the team members eligible for assignment.
+
+    Args:
+        client: DynamoDB client
+        users_table_name (str): Users table name
+        department (str): Only return members of this department
+
+    Returns:
+        list: UserIDs
+    """
+    params = {
+        'TableName': users_table_name,
+        'IndexName': 'RoleIndex',
+        'KeyConditionExpression': '#role = :role',
+        'ProjectionExpression': 'UserID',
+        'ExpressionAttributeNames': {'#role': 'Role'},
+        'ExpressionAttributeValues': {':role': {'S': 'team_member'}}
+    }
+    if department:
+        params['FilterExpression'] = 'Department = :department'
+        params['ExpressionAttributeValues'][':department'] = {'S': department}
+
+    return [item['UserID']['S'] for item in paginate_query(client, **params)]
+
+def get_load(client, tasks_table_name, user_id):
+    """
+    Read a team member's open tasks from AssignedToIndex.
+
+    Completed tasks are never read, as each open status is its own key range.
+
+    Returns:
+        tuple: Priority-weighted load and open task count
+    """
+    load = count = 0
+
+    for status in OPEN_STATUSES:
+        for item in paginate_query(
+            client,
+            TableName=tasks_table_name,
+            IndexName='AssignedToIndex',
+            KeyConditionExpression='AssignedTo = :user_id AND #status = :status',
+            ProjectionExpression='Priority',
+            ExpressionAttributeNames={'#status': 'Status'},
+            ExpressionAttributeValues={':user_id': {'S': user_id}, ':status': {'S': status}}
+        ):
+            load += task_weight(item.get('Priority', {}).get('S'))
+            count += 1
+
+    return load, count
+
+def get_loads(client, users_table_name, tasks_table_name, department=None):
+    """
+    Get the current load of every eligible team member.
+
+    Args:
+        client: DynamoDB client
+        users_table_name (str): Users table name
+        tasks_table_name (str): Tasks table name
+        department (str): Only include members of this department
+
+    Returns:
+        dict: UserID mapped to (load, open task count)
+    """
+    members = get_team_members(client, users_table_name, department)
+    if not members:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(QUERY_WORKERS, len(members))) as executor:
+        loads = executor.map(lambda user_id: get_load(client, tasks_table_name, user_id), members)
+        return dict(zip(members, loads))
@@ -9,19 +9,29 @@ class AdminService {
      */
     async getUsers() {
         try {
-            const response = await fetch(`${CONFIG.API_URL}/admin/users`, {
-                headers: {
-                    'Authorization': `Bearer ${authService.getToken()}`
-                }
-            });
+            const users = [];
+            let cursor = null;
             
-            if (!response.ok) {
-                const error = await response.json();
-                throw new Error(error.message || 'Failed to fetch users');
-            }
+            // Follow the pagination cursor until the last page
+            do {
+                const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+                const response = await fetch(`${CONFIG.API_URL}/admin/users${query}`, {
+                    headers: {
+                        'Authorization': `Bearer ${authService.getToken()}`
+                    }
+                });
+                
+                if (!response.ok) {
+                    const error = await response.json();
+                    throw new Error(error.message || 'Failed to fetch users');
+                }
+                
+                const data = await response.json();
+                users.push(...data.data.users);
+                cursor = data.data.next_cursor;
+            } while (cursor);
             
-            const data = await response.json();
-            return data.data.users;
+            return users;
         } catch (error) {
             console.error('Error fetching users:', error);
             throw error;
@@ -103,6 +113,34 @@ class AdminService {
             throw error;
         }
     }
+    
+    /**
+     * Get several admin dashboard sections in one request
+     * @param {Array} sections - Sections to include (users, overview, deadlines, performance)
+     * @param {number} days - Number of days to look ahead for deadlines
+     * @returns {Promise} - Promise resolving to the requested sections
+     */
+    async getDashboard(sections = ['users', 'overview', 'deadlines', 'performance'], days = 7) {
+        try {
+            const query = `sections=${sections.join(',')}&days=${days}`;
+            const response = await fetch(`${CONFIG.API_URL}/admin/dashboard?${query}`, {
+                headers: {
+                    'Authorization': `Bearer ${authService.getToken()}`
+                }
+            });
+            
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.message || 'Failed to fetch dashboard');
+            }
+            
+            const data = await response.json();
+            return data.data;
+        } catch (error) {
+            console.error('Error fetching dashboard:', error);
+            throw error;
+        }
+    }
 }
 
 // Create and export admin service instance
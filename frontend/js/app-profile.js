@@ -19,12 +19,15 @@ const profileElements = {
     
     // Notification preferences form
     notificationPreferencesForm: document.getElementById('notification-preferences-form'),
-    emailNotifications: document.getElementById('email-notifications'),
+    digestMode: document.getElementById('digest-mode'),
     taskAssignments: document.getElementById('task-assignments'),
     deadlineReminders: document.getElementById('deadline-reminders'),
     statusUpdates: document.getElementById('status-updates')
 };
 
+// Notification preferences as last loaded
+let currentPreferences = {};
+
 /**
  * Initialize profile
  */
@@ -105,10 +108,15 @@ function formatRole(role) {
  * @param {Object} preferences - Notification preferences
  */
 function displayNotificationPreferences(preferences) {
-    profileElements.emailNotifications.checked = preferences.emailNotifications;
-    profileElements.taskAssignments.checked = preferences.taskAssignments;
-    profileElements.deadlineReminders.checked = preferences.deadlineReminders;
-    profileElements.statusUpdates.checked = preferences.statusUpdates;
+    const muted = preferences.muted_types || [];
+    
+    profileElements.digestMode.checked = preferences.digest;
+    profileElements.taskAssignments.checked = !muted.includes('task_assigned');
+    profileElements.deadlineReminders.checked = !muted.includes('deadline_reminder');
+    profileElements.statusUpdates.checked = !muted.includes('task_status_updated');
+    
+    // Kept as loaded, as the form has no fields for them
+    currentPreferences = preferences;
 }
 
 /**
@@ -175,11 +183,22 @@ async function handleUpdatePreferencesSubmit(e) {
     e.preventDefault();
     
     // Get form data
+    // Unchecked categories are muted
+    const muted_types = [];
+    if (!profileElements.taskAssignments.checked) {
+        muted_types.push('task_assigned', 'task_reassigned');
+    }
+    if (!profileElements.deadlineReminders.checked) {
+        muted_types.push('deadline_reminder', 'tasks_overdue');
+    }
+    if (!profileElements.statusUpdates.checked) {
+        muted_types.push('task_status_updated');
+    }
+    
     const preferences = {
-        emailNotifications: profileElements.emailNotifications.checked,
-        taskAssignments: profileElements.taskAssignments.checked,
-        deadlineReminders: profileElements.deadlineReminders.checked,
-        statusUpdates: profileElements.statusUpdates.checked
+        muted_types,
+        quiet_hours: currentPreferences.quiet_hours || null,
+        digest: profileElements.digestMode.checked
     };
     
     try {
@@ -6,6 +6,7 @@
 // Global variables
 let currentView = null;
 let refreshTimers = {};
+let notificationStream = null;
 
 // DOM Elements
 const elements = {
@@ -167,7 +168,21 @@ function startNotificationPolling() {
     // Check for unread notifications immediately
     updateNotificationBadge();
     
-    // Set up polling interval
+    // Prefer live updates, falling back to polling if the stream is refused
+    notificationStream = notificationsService.subscribe(setNotificationBadge, () => {
+        notificationStream = null;
+        startNotificationTimer();
+    });
+    
+    if (!notificationStream) {
+        startNotificationTimer();
+    }
+}
+
+/**
+ * Poll the unread count on an interval
+ */
+function startNotificationTimer() {
     refreshTimers.notifications = setInterval(() => {
         updateNotificationBadge();
     }, CONFIG.REFRESH.NOTIFICATIONS);
@@ -179,18 +194,25 @@ function startNotificationPolling() {
 async function updateNotificationBadge() {
     try {
         const count = await notificationsService.getUnreadCount();
-        
-        if (count > 0) {
-            elements.notificationBadge.textContent = count;
-            elements.notificationBadge.classList.remove('hidden');
-        } else {
-            elements.notificationBadge.classList.add('hidden');
-        }
+        setNotificationBadge(count);
     } catch (error) {
         console.error('Error updating notification badge:', error);
     }
 }
 
+/**
+ * Show an unread count on the notification badge
+ * @param {number} count - Unread notifications
+ */
+function setNotificationBadge(count) {
+    if (count > 0) {
+        elements.notificationBadge.textContent = count;
+        elements.notificationBadge.classList.remove('hidden');
+    } else {
+        elements.notificationBadge.classList.add('hidden');
+    }
+}
+
 /**
  * Load dashboard data
  */
@@ -256,12 +278,10 @@ async function refreshDashboard() {
  */
 async function loadAdminDashboard() {
     try {
-        // Get upcoming deadlines
-        const deadlinesData = await adminService.getUpcomingDeadlines();
-        const deadlines = deadlinesData.tasks;
-        
-        // Get team performance
-        const performance = await adminService.getTeamPerformance();
+        // Get upcoming deadlines and team performance in one request
+        const dashboard = await adminService.getDashboard(['deadlines', 'performance']);
+        const deadlines = dashboard.deadlines.tasks;
+        const performance = dashboard.performance;
         
         // Update deadlines table
         const deadlinesBody = document.getElementById('deadlines-body');
@@ -465,6 +485,11 @@ function stopAllRefreshTimers() {
         clearInterval(refreshTimers[key]);
     });
     refreshTimers = {};
+    
+    if (notificationStream) {
+        notificationStream.close();
+        notificationStream = null;
+    }
 }
 
 /**
@@ -100,7 +100,7 @@ class AuthService {
                 throw new Error('Invalid response from server');
             }
             
-            this.setSession(data.token, data.user);
+            this.setSession(data.token, data.user, data.refresh_token);
             
             if (typeof hideLoading === 'function') hideLoading();
             return data.user;
@@ -158,10 +158,12 @@ class AuthService {
             if (typeof CONFIG !== 'undefined' && CONFIG && CONFIG.AUTH) {
                 localStorage.removeItem(CONFIG.AUTH.TOKEN_KEY);
                 localStorage.removeItem(CONFIG.AUTH.USER_KEY);
+                localStorage.removeItem(CONFIG.AUTH.REFRESH_TOKEN_KEY);
             } else {
                 // Fallback if CONFIG is not available
                 localStorage.removeItem('tms_token');
                 localStorage.removeItem('tms_user');
+                localStorage.removeItem('tms_refresh_token');
             }
         } catch (e) {
             console.warn('Error clearing localStorage during logout:', e);
@@ -297,8 +299,9 @@ class AuthService {
      * Set user session data
      * @param {string} token - JWT token
      * @param {Object} user - User object
+     * @param {string} refreshToken - Refresh token used to renew the JWT
      */
-    setSession(token, user) {
+    setSession(token, user, refreshToken) {
         this.token = token;
         this.user = user;
         
@@ -306,6 +309,9 @@ class AuthService {
             if (typeof CONFIG !== 'undefined' && CONFIG && CONFIG.AUTH) {
                 localStorage.setItem(CONFIG.AUTH.TOKEN_KEY, token);
                 localStorage.setItem(CONFIG.AUTH.USER_KEY, JSON.stringify(user));
+                if (refreshToken) {
+                    localStorage.setItem(CONFIG.AUTH.REFRESH_TOKEN_KEY, refreshToken);
+                }
             } else {
                 // Fallback if CONFIG is not available
                 localStorage.setItem('tms_token', token);
@@ -349,15 +355,20 @@ class AuthService {
                     const response = await fetch(`${CONFIG.API_URL}/auth/refresh`, {
                         method: 'POST',
                         headers: {
+                            'Content-Type': 'application/json',
                             'Authorization': `Bearer ${this.token}`
-                        }
+                        },
+                        body: JSON.stringify({
+                            refresh_token: localStorage.getItem(CONFIG.AUTH.REFRESH_TOKEN_KEY)
+                        })
                     });
                     
                     if (response.ok) {
                         const data = await response.json();
-                        this.token = data.token;
+                        const result = data.data || data;
+                        this.token = result.token;
                         try {
-                            localStorage.setItem(CONFIG.AUTH.TOKEN_KEY, data.token);
+                            localStorage.setItem(CONFIG.AUTH.TOKEN_KEY, result.token);
                         } catch (storageError) {
                             console.warn('Failed to store token in localStorage:', storageError);
                         }
@@ -30,28 +30,38 @@ function startNotificationPolling() {
     // Check for unread notifications immediately
     updateNotificationBadge();
     
-    // Set up polling interval
-    setInterval(() => {
-        updateNotificationBadge();
-    }, CONFIG.REFRESH.NOTIFICATIONS);
+    // Prefer live updates, falling back to polling if the stream is refused
+    const pollNotifications = () => {
+        setInterval(() => {
+            updateNotificationBadge();
+        }, CONFIG.REFRESH.NOTIFICATIONS);
+    };
+    
+    if (!notificationsService.subscribe(setNotificationBadge, pollNotifications)) {
+        pollNotifications();
+    }
 }
 
 // Update notification badge with unread count
 async function updateNotificationBadge() {
     try {
         const count = await notificationsService.getUnreadCount();
-        
-        if (count > 0) {
-            document.getElementById('notification-badge').textContent = count;
-            document.getElementById('notification-badge').classList.remove('hidden');
-        } else {
-            document.getElementById('notification-badge').classList.add('hidden');
-        }
+        setNotificationBadge(count);
     } catch (error) {
         console.error('Error updating notification badge:', error);
     }
 }
 
+// Show an unread count on the notification badge
+function setNotificationBadge(count) {
+    if (count > 0) {
+        document.getElementById('notification-badge').textContent = count;
+        document.getElementById('notification-badge').classList.remove('hidden');
+    } else {
+        document.getElementById('notification-badge').classList.add('hidden');
+    }
+}
+
 // Format date for display
 function formatDate(dateString, options = CONFIG.DATE_FORMAT.DISPLAY) {
     if (!dateString) return 'N/A';
@@ -9,6 +9,7 @@ window.CONFIG = {
     AUTH: {
         TOKEN_KEY: 'tms_token',
         USER_KEY: 'tms_user',
+        REFRESH_TOKEN_KEY: 'tms_refresh_token',
         REFRESH_INTERVAL: 1800000, // 30 minutes in milliseconds
         REFRESH_RETRY_INTERVAL: 5000 // 5 seconds between retries
     },
@@ -56,6 +57,10 @@ window.CONFIG = {
         }
     },
     
+    // Server-Sent Events base URL for live notifications, e.g. 'http://localhost:5000'
+    // when using the local server; null keeps polling (API Gateway cannot stream)
+    NOTIFICATION_STREAM_URL: null,
+    
     // Refresh intervals
     REFRESH: {
         DASHBOARD: 300000, // 5 minutes
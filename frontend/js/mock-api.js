@@ -144,10 +144,9 @@ const MOCK_DATA = {
     
     // Notification preferences
     notificationPreferences: {
-        emailNotifications: true,
-        taskAssignments: true,
-        deadlineReminders: true,
-        statusUpdates: true
+        muted_types: [],
+        quiet_hours: null,
+        digest: false
     },
     
     // Task statistics
@@ -245,6 +244,8 @@ if (MOCK_API_ENABLED) {
         // Notification endpoints
         if (endpoint === '/notifications') {
             return handleGetNotifications();
+        } else if (endpoint === '/notifications/unread-count') {
+            return handleGetUnreadCount();
         } else if (endpoint.match(/^\/notifications\/[a-z0-9]+\/read$/)) {
             const notificationId = endpoint.split('/')[3];
             return handleMarkNotificationAsRead(notificationId);
@@ -525,6 +526,11 @@ if (MOCK_API_ENABLED) {
         return createMockResponse(200, { notifications: MOCK_DATA.notifications });
     }
     
+    function handleGetUnreadCount() {
+        const count = MOCK_DATA.notifications.filter(notification => !notification.ReadStatus).length;
+        return createMockResponse(200, { data: { unread_count: count } });
+    }
+    
     function handleMarkNotificationAsRead(notificationId) {
         // Find notification
         const notification = MOCK_DATA.notifications.find(n => n.NotificationID === notificationId);
@@ -556,7 +562,7 @@ if (MOCK_API_ENABLED) {
         const body = JSON.parse(options.body);
         
         // Update preferences
-        Object.assign(MOCK_DATA.notificationPreferences, body);
+        Object.assign(MOCK_DATA.notificationPreferences, body.settings);
         
         return createMockResponse(200, MOCK_DATA.notificationPreferences);
     }
@@ -14,6 +14,7 @@ class NotificationsService {
             const queryParams = new URLSearchParams();
             if (filters.read !== undefined) queryParams.append('read', filters.read);
             if (filters.limit) queryParams.append('limit', filters.limit);
+            if (filters.cursor) queryParams.append('cursor', filters.cursor);
             
             const queryString = queryParams.toString() ? `?${queryParams.toString()}` : '';
             
@@ -149,13 +150,53 @@ class NotificationsService {
      */
     async getUnreadCount() {
         try {
-            const notifications = await this.getNotifications({ read: false });
-            return notifications.length;
+            const response = await fetch(`${CONFIG.API_URL}/notifications/unread-count`, {
+                headers: {
+                    'Authorization': `Bearer ${authService.getToken()}`
+                }
+            });
+            
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.message || 'Failed to fetch unread notification count');
+            }
+            
+            const data = await response.json();
+            return data.data.unread_count;
         } catch (error) {
             console.error('Error getting unread notification count:', error);
             return 0;
         }
     }
+    
+    /**
+     * Subscribe to live unread count changes from the notification stream
+     * @param {Function} onUnreadCount - Called with each new unread count
+     * @param {Function} onClosed - Called if the server closes the stream
+     * @returns {EventSource|null} - The open stream, or null if streaming is not configured
+     */
+    subscribe(onUnreadCount, onClosed) {
+        if (!CONFIG.NOTIFICATION_STREAM_URL || typeof EventSource === 'undefined') {
+            return null;
+        }
+        
+        // EventSource cannot send an Authorization header
+        const token = encodeURIComponent(authService.getToken());
+        const source = new EventSource(`${CONFIG.NOTIFICATION_STREAM_URL}/notifications/stream?token=${token}`);
+        
+        source.addEventListener('unread_count', event => {
+            onUnreadCount(JSON.parse(event.data).unread_count);
+        });
+        
+        // The browser reconnects by itself unless the stream was refused
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                onClosed();
+            }
+        };
+        
+        return source;
+    }
 }
 
 // Create and export notifications service instance
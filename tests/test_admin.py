@@ -6,21 +6,32 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+from datetime import datetime, timedelta
 
 # Set environment variables before importing modules
 os.environ['USERS_TABLE'] = 'Users-test'
 os.environ['TASKS_TABLE'] = 'Tasks-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
+os.environ['ROLLUPS_TABLE'] = 'Rollups-test'
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from backend.admin.admin import lambda_handler
+from backend.admin.admin.admin import lambda_handler
+from backend.admin.admin import admin as admin_module
 
 class TestAdminEndpoints(unittest.TestCase):
     """Test cases for admin endpoints."""
     
-    @patch('backend.admin.admin.auth.validate_token')
-    @patch('backend.admin.admin.users_table.scan')
-    def test_get_users(self, mock_scan, mock_validate_token):
+    def setUp(self):
+        # Each test reads its own mocked data, not another test's cached payload
+        for cache in admin_module.analytics_caches.values():
+            cache.clear()
+        admin_module.directory_cache.update({'version': None, 'pages': {}})
+    
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.user_directory.get_version')
+    @patch('backend.admin.admin.admin.users_table.scan')
+    def test_get_users(self, mock_scan, mock_get_version, mock_validate_token):
         """Test getting all users."""
         # Mock token validation
         mock_validate_token.return_value = {
@@ -30,7 +41,8 @@ class TestAdminEndpoints(unittest.TestCase):
             'role': 'admin'
         }
         
-        # Mock DynamoDB response
+        # Mock the directory version and DynamoDB response
+        mock_get_version.return_value = 1
         mock_scan.return_value = {
             'Items': [
                 {
@@ -73,9 +85,10 @@ class TestAdminEndpoints(unittest.TestCase):
         
         # Verify mocks were called
         mock_validate_token.assert_called_once()
+        mock_get_version.assert_called_once()
         mock_scan.assert_called_once()
     
-    @patch('backend.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.auth.validate_token')
     def test_get_users_not_admin(self, mock_validate_token):
         """Test getting users by non-admin user."""
         # Mock token validation
@@ -109,10 +122,11 @@ class TestAdminEndpoints(unittest.TestCase):
         # Verify mock was called
         mock_validate_token.assert_called_once()
     
-    @patch('backend.admin.admin.auth.validate_token')
-    @patch('backend.admin.admin.tasks_table.scan')
-    def test_get_tasks_overview(self, mock_scan, mock_validate_token):
-        """Test getting task statistics."""
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.stats_table')
+    @patch('backend.admin.admin.admin.tasks_table.scan')
+    def test_get_tasks_overview(self, mock_scan, mock_stats_table, mock_validate_token):
+        """Test getting task statistics before any counters exist."""
         # Mock token validation
         mock_validate_token.return_value = {
             'user_id': 'admin-user-id',
@@ -121,6 +135,9 @@ class TestAdminEndpoints(unittest.TestCase):
             'role': 'admin'
         }
         
+        # No counters item yet, so the tasks are counted from a scan
+        mock_stats_table.get_item.return_value = {}
+        
         # Mock DynamoDB response
         mock_scan.return_value = {
             'Items': [
@@ -173,11 +190,12 @@ class TestAdminEndpoints(unittest.TestCase):
         
         # Verify mocks were called
         mock_validate_token.assert_called_once()
+        mock_stats_table.get_item.assert_called_once_with(Key={'StatID': 'task_counters'})
         mock_scan.assert_called_once()
     
-    @patch('backend.admin.admin.auth.validate_token')
-    @patch('backend.admin.admin.tasks_table.scan')
-    def test_get_upcoming_deadlines(self, mock_scan, mock_validate_token):
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.client.query')
+    def test_get_upcoming_deadlines(self, mock_query, mock_validate_token):
         """Test getting upcoming deadlines."""
         # Mock token validation
         mock_validate_token.return_value = {
@@ -187,20 +205,14 @@ class TestAdminEndpoints(unittest.TestCase):
             'role': 'admin'
         }
         
-        # Mock DynamoDB response
-        mock_scan.return_value = {
+        # Mock DynamoDB response, one open task per day
+        mock_query.side_effect = lambda **kwargs: {
             'Items': [
                 {
-                    'TaskID': 'task-1',
-                    'Title': 'Task 1',
-                    'Status': 'New',
-                    'Deadline': '2023-12-31T23:59:59'
-                },
-                {
-                    'TaskID': 'task-2',
-                    'Title': 'Task 2',
-                    'Status': 'In Progress',
-                    'Deadline': '2023-12-25T23:59:59'
+                    'TaskID': {'S': 'task-' + kwargs['ExpressionAttributeValues'][':day']['S']},
+                    'Title': {'S': 'Task'},
+                    'Status': {'S': 'New'},
+                    'Deadline': {'S': kwargs['ExpressionAttributeValues'][':day']['S'] + 'T12:00:00'}
                 }
             ]
         }
@@ -226,12 +238,582 @@ class TestAdminEndpoints(unittest.TestCase):
         # Assertions
         self.assertEqual(response['statusCode'], 200)
         self.assertTrue(body['success'])
-        self.assertEqual(len(body['data']['tasks']), 2)
-        self.assertEqual(body['data']['count'], 2)
+        self.assertEqual(body['data']['count'], 8)
         
-        # Verify mocks were called
+        # Verify the results are merged in deadline order
+        deadlines = [task['Deadline'] for task in body['data']['tasks']]
+        self.assertEqual(deadlines, sorted(deadlines))
+        
+        # Verify one index query per day
         mock_validate_token.assert_called_once()
-        mock_scan.assert_called_once()
+        self.assertEqual(mock_query.call_count, 8)
+        self.assertEqual(mock_query.call_args[1]['IndexName'], 'OpenDeadlineIndex')
+    
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.client.query')
+    def test_get_upcoming_deadlines_validates_days(self, mock_query, mock_validate_token):
+        """Test the deadline look-ahead must be positive and within the maximum."""
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        mock_query.return_value = {'Items': []}
+        
+        def request(days):
+            return lambda_handler({
+                'httpMethod': 'GET',
+                'path': '/admin/tasks/deadlines',
+                'headers': {'Authorization': 'Bearer test-token'},
+                'queryStringParameters': {'days': days}
+            }, {})
+        
+        # The maximum look-ahead queries every day in the window
+        response = request(str(admin_module.MAX_DEADLINE_DAYS))
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(mock_query.call_count, admin_module.MAX_DEADLINE_DAYS + 1)
+        
+        # Out of range and non-numeric values are rejected before any query
+        mock_query.reset_mock()
+        for days in ['0', '-3', 'soon', str(admin_module.MAX_DEADLINE_DAYS + 1), '100000']:
+            self.assertEqual(request(days)['statusCode'], 400)
+        mock_query.assert_not_called()
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.stats_table')
+    @patch('backend.admin.admin.admin.tasks_table')
+    def test_get_tasks_overview_from_counters(self, mock_tasks_table, mock_stats_table, mock_validate_token):
+        """Test that the overview is read from the maintained counters."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB response
+        mock_stats_table.get_item.return_value = {
+            'Item': {
+                'StatID': 'task_counters',
+                'TotalTasks': 5,
+                'Status_New': 2,
+                'Status_In Progress': 1,
+                'Status_Completed': 2,
+                'Priority_High': 5
+            }
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/tasks/overview',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['total_tasks'], 5)
+        self.assertEqual(body['data']['status_counts']['In Progress'], 1)
+        self.assertEqual(body['data']['status_counts']['Overdue'], 0)
+        self.assertEqual(body['data']['priority_counts']['High'], 5)
+        
+        # Verify the Tasks table was not scanned
+        mock_stats_table.get_item.assert_called_once()
+        mock_tasks_table.scan.assert_not_called()
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.dynamodb')
+    @patch('backend.admin.admin.admin.users_table')
+    @patch('backend.admin.admin.admin.tasks_table')
+    def test_get_performance_metrics_percentiles(self, mock_tasks_table, mock_users_table, mock_dynamodb, mock_validate_token):
+        """Test that completion time percentiles are read from the sketches."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB responses
+        mock_tasks_table.scan.return_value = {'Items': []}
+        mock_users_table.scan.return_value = {
+            'Items': [
+                {'UserID': 'user-1', 'Name': 'User One', 'Role': 'team_member'},
+                {'UserID': 'user-2', 'Name': 'User Two', 'Role': 'team_member'}
+            ]
+        }
+        mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {
+                'Stats-test': [
+                    {'StatID': 'team_completion_sketch', 'SampleCount': 2, 'B100': 2},
+                    {'StatID': 'completion_sketch#user-1', 'SampleCount': 2, 'B100': 2}
+                ]
+            }
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/performance',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        user_metrics = {item['user_id']: item for item in body['data']['team_metrics']}
+        self.assertAlmostEqual(user_metrics['user-1']['completion_time_percentiles']['p50'], 0.12, delta=0.01)
+        self.assertIsNone(user_metrics['user-2']['completion_time_percentiles']['p90'])
+        self.assertEqual(body['data']['team_completion_time_percentiles'],
+                         user_metrics['user-1']['completion_time_percentiles'])
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.stats_table')
+    @patch('backend.admin.admin.admin.users_table')
+    def test_get_users_page_from_role_index(self, mock_users_table, mock_stats_table, mock_validate_token):
+        """Test that a role filtered page is queried from RoleIndex and cached."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB responses
+        mock_stats_table.get_item.return_value = {'Item': {'StatID': 'user_directory_version', 'Version': 1}}
+        mock_users_table.query.return_value = {
+            'Items': [{'UserID': 'user-1', 'Name': 'User One'}],
+            'LastEvaluatedKey': {'UserID': 'user-1', 'Role': 'team_member'}
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/users',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'role': 'team_member',
+                'fields': 'UserID,Name',
+                'limit': '1'
+            }
+        }
+        
+        # Call the handler twice
+        response = lambda_handler(event, {})
+        cached_response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['count'], 1)
+        self.assertIsNotNone(body['data']['next_cursor'])
+        self.assertEqual(cached_response['body'], response['body'])
+        
+        # Verify a single projected index query
+        mock_users_table.scan.assert_not_called()
+        mock_users_table.query.assert_called_once()
+        query_args = mock_users_table.query.call_args[1]
+        self.assertEqual(query_args['IndexName'], 'RoleIndex')
+        self.assertEqual(query_args['Limit'], 1)
+        self.assertEqual(query_args['ProjectionExpression'], '#f0, #f1')
+        
+        # A profile write bumps the version and invalidates the cached page
+        mock_stats_table.get_item.return_value = {'Item': {'StatID': 'user_directory_version', 'Version': 2}}
+        event['queryStringParameters']['cursor'] = body['data']['next_cursor']
+        lambda_handler(event, {})
+        
+        self.assertEqual(mock_users_table.query.call_args[1]['ExclusiveStartKey'],
+                         {'UserID': 'user-1', 'Role': 'team_member'})
+    
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.stats_table')
+    @patch('backend.admin.admin.admin.users_table')
+    def test_get_users_filtered_page_is_filled(self, mock_users_table, mock_stats_table, mock_validate_token):
+        """Test that a role and department page keeps reading until it is full."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # The department filter keeps one or two users of each index page
+        mock_stats_table.get_item.return_value = {'Item': {'StatID': 'user_directory_version', 'Version': 1}}
+        mock_users_table.query.side_effect = [
+            {
+                'Items': [{'UserID': 'user-1', 'Role': 'team_member', 'Name': 'User One'}],
+                'ScannedCount': 10,
+                'LastEvaluatedKey': {'UserID': 'user-9', 'Role': 'team_member'}
+            },
+            {
+                'Items': [
+                    {'UserID': 'user-12', 'Role': 'team_member', 'Name': 'User Twelve'},
+                    {'UserID': 'user-15', 'Role': 'team_member', 'Name': 'User Fifteen'}
+                ],
+                'ScannedCount': 10,
+                'LastEvaluatedKey': {'UserID': 'user-19', 'Role': 'team_member'}
+            }
+        ]
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/users',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'role': 'team_member',
+                'department': 'Field Ops',
+                'fields': 'Name',
+                'limit': '2'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['users'], [{'Name': 'User One'}, {'Name': 'User Twelve'}])
+        
+        # Verify the second read continued the first and the cursor follows the last user kept
+        self.assertEqual(mock_users_table.query.call_count, 2)
+        query_args = mock_users_table.query.call_args[1]
+        self.assertEqual(query_args['FilterExpression'], 'Department = :department')
+        self.assertEqual(query_args['ExclusiveStartKey'], {'UserID': 'user-9', 'Role': 'team_member'})
+        self.assertEqual(query_args['ProjectionExpression'], '#f0, #f1, #f2')
+        self.assertEqual(admin_module.decode_cursor(body['data']['next_cursor']),
+                         {'UserID': 'user-12', 'Role': 'team_member'})
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    def test_get_users_invalid_fields(self, mock_validate_token):
+        """Test that unknown projection fields are rejected."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/users',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'fields': 'UserID,Password'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 400)
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.rollups_table')
+    @patch('backend.admin.admin.admin.tasks_table')
+    def test_get_trends(self, mock_tasks_table, mock_rollups_table, mock_validate_token):
+        """Test that trends are read from the rollup rows only."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB response, with no row for the middle day
+        mock_rollups_table.query.return_value = {
+            'Items': [
+                {'Scope': 'department#Engineering', 'Day': '2024-01-01', 'Created': 2, 'Completed': 1, 'Overdue': 0},
+                {'Scope': 'department#Engineering', 'Day': '2024-01-03', 'Created': 1, 'Completed': 2, 'Overdue': 1}
+            ]
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/trends',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'from': '2024-01-01',
+                'to': '2024-01-03',
+                'department': 'Engineering'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['scope'], 'department#Engineering')
+        self.assertEqual(len(body['data']['days']), 3)
+        self.assertEqual(body['data']['days'][1], {'date': '2024-01-02', 'created': 0, 'completed': 0, 'overdue': 0})
+        self.assertEqual(body['data']['totals'], {'created': 3, 'completed': 3, 'overdue': 1})
+        
+        # Verify the Tasks table was not read
+        mock_rollups_table.query.assert_called_once()
+        mock_tasks_table.scan.assert_not_called()
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    def test_get_trends_invalid_range(self, mock_validate_token):
+        """Test that a reversed date range is rejected."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/trends',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'from': '2024-02-01',
+                'to': '2024-01-01'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 400)
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.get_stats_items')
+    @patch('backend.admin.admin.admin.client')
+    def test_get_dashboard_single_snapshot(self, mock_client, mock_get_stats_items, mock_validate_token):
+        """Test that the dashboard sections share one scan of each table."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB responses
+        deadline = (datetime.now() + timedelta(days=1)).isoformat()
+        scans = {
+            'Users-test': [
+                {'UserID': {'S': 'user-1'}, 'Name': {'S': 'User One'}, 'Role': {'S': 'team_member'}}
+            ],
+            'Tasks-test': [
+                {'TaskID': {'S': 'task-1'}, 'AssignedTo': {'S': 'user-1'}, 'Status': {'S': 'New'},
+                 'Priority': {'S': 'High'}, 'Deadline': {'S': deadline}},
+                {'TaskID': {'S': 'task-2'}, 'AssignedTo': {'S': 'user-1'}, 'Status': {'S': 'Completed'},
+                 'Priority': {'S': 'Low'}, 'Deadline': {'S': deadline}}
+            ]
+        }
+        mock_client.scan.side_effect = lambda **kwargs: {'Items': scans[kwargs['TableName']]}
+        mock_get_stats_items.return_value = []
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/dashboard',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': None
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['users']['count'], 1)
+        self.assertEqual(body['data']['overview']['total_tasks'], 2)
+        self.assertEqual(body['data']['deadlines']['count'], 1)
+        self.assertEqual(body['data']['performance']['team_metrics'][0]['total_tasks'], 2)
+        
+        # Verify each table was scanned once
+        mock_validate_token.assert_called_once()
+        self.assertEqual(mock_client.scan.call_count, 2)
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.client')
+    def test_get_dashboard_selected_sections(self, mock_client, mock_validate_token):
+        """Test that only the tables needed by the requested sections are read."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB response
+        mock_client.scan.return_value = {'Items': []}
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/dashboard',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'sections': 'overview'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(list(body['data']), ['overview'])
+        mock_client.scan.assert_called_once()
+        self.assertEqual(mock_client.scan.call_args[1]['TableName'], 'Tasks-test')
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.export')
+    @patch('backend.admin.admin.admin.lambda_client')
+    @patch('backend.admin.admin.admin.export_function', 'ExportFunction-test')
+    def test_create_export(self, mock_lambda_client, mock_export, mock_validate_token):
+        """Test starting an export job."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        mock_export.REPORTS = {'tasks': None, 'performance': None}
+        mock_export.FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+        mock_export.create_job.return_value = {'JobID': 'job-1', 'Status': 'Pending'}
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/admin/exports',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({'report': 'performance', 'format': 'parquet'})
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 201)
+        self.assertEqual(body['data']['job_id'], 'job-1')
+        self.assertEqual(body['data']['status'], 'Pending')
+        
+        # Verify the export function was invoked asynchronously
+        mock_export.create_job.assert_called_once_with('performance', 'parquet', 'admin-user-id')
+        invoke = mock_lambda_client.invoke.call_args[1]
+        self.assertEqual(invoke['InvocationType'], 'Event')
+        self.assertEqual(json.loads(invoke['Payload']), {'job_id': 'job-1'})
+
+    @patch('backend.admin.admin.admin.auth.validate_token')
+    @patch('backend.admin.admin.admin.stats_table')
+    def test_get_export_completed(self, mock_stats_table, mock_validate_token):
+        """Test getting a completed export job."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB response
+        mock_stats_table.get_item.return_value = {
+            'Item': {
+                'JobID': 'job-1',
+                'Report': 'tasks',
+                'Format': 'csv',
+                'Status': 'Completed',
+                'CreatedAt': '2024-01-01T00:00:00',
+                'CompletedAt': '2024-01-01T00:01:00',
+                'Location': 'exports/tasks-job-1.csv',
+                'RowCount': 42
+            }
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/admin/exports/job-1',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'pathParameters': {
+                'jobId': 'job-1'
+            }
+        }
+        
+        # Call the handler
+        with patch.dict(os.environ, {'EXPORT_DIR': '/tmp/exports'}):
+            response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['row_count'], 42)
+        self.assertEqual(body['data']['download_url'], '/tmp/exports/exports/tasks-job-1.csv')
+        mock_stats_table.get_item.assert_called_once_with(Key={'StatID': 'export_job#job-1'})
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -6,9 +6,12 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+from jose import jwt
+from botocore.exceptions import ClientError
 
 # Set environment variables before importing modules
 os.environ['USERS_TABLE'] = 'Users-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
 os.environ['USER_POOL_ID'] = 'us-east-1_testpool'
 os.environ['USER_POOL_CLIENT_ID'] = 'test-client-id'
 
@@ -19,16 +22,19 @@ from backend.auth.auth.auth import lambda_handler
 class TestAuthEndpoints(unittest.TestCase):
     """Test cases for authentication endpoints."""
     
-    @patch('backend.auth.auth.auth.admin_create_user')
-    @patch('backend.auth.auth.users_table.put_item')
-    def test_register_success(self, mock_put_item, mock_admin_create_user):
+    @patch('backend.auth.auth.auth.auth.admin_set_user_password')
+    @patch('backend.auth.auth.auth.auth.admin_create_user')
+    @patch('backend.auth.auth.auth.stats_table')
+    @patch('backend.auth.auth.auth.users_table.put_item')
+    def test_register_success(self, mock_put_item, mock_stats_table, mock_admin_create_user, mock_set_password):
         """Test successful user registration."""
-        # Mock Cognito response
+        # Mock Cognito responses
         mock_admin_create_user.return_value = {
             'user_id': 'test-user-id',
             'email': 'test@example.com',
             'role': 'team_member'
         }
+        mock_set_password.return_value = {}
         
         # Create test event
         event = {
@@ -58,7 +64,7 @@ class TestAuthEndpoints(unittest.TestCase):
         mock_admin_create_user.assert_called_once()
         mock_put_item.assert_called_once()
     
-    @patch('backend.auth.auth.auth.admin_create_user')
+    @patch('backend.auth.auth.auth.auth.admin_create_user')
     def test_register_missing_field(self, mock_admin_create_user):
         """Test registration with missing required field."""
         # Create test event with missing email
@@ -86,9 +92,9 @@ class TestAuthEndpoints(unittest.TestCase):
         # Verify mock was not called
         mock_admin_create_user.assert_not_called()
     
-    @patch('backend.auth.auth.auth.admin_initiate_auth')
-    @patch('backend.auth.auth.users_table.query')
-    @patch('backend.auth.auth.users_table.update_item')
+    @patch('backend.auth.auth.auth.auth.admin_initiate_auth')
+    @patch('backend.auth.auth.auth.users_table.query')
+    @patch('backend.auth.auth.auth.users_table.update_item')
     def test_login_success(self, mock_update_item, mock_query, mock_admin_initiate_auth):
         """Test successful user login."""
         # Mock Cognito response
@@ -108,6 +114,7 @@ class TestAuthEndpoints(unittest.TestCase):
                 'Name': 'Test User'
             }]
         }
+        mock_update_item.return_value = {'Attributes': mock_query.return_value['Items'][0]}
         
         # Create test event
         event = {
@@ -136,8 +143,8 @@ class TestAuthEndpoints(unittest.TestCase):
         mock_query.assert_called_once()
         mock_update_item.assert_called_once()
     
-    @patch('backend.auth.auth.auth.validate_token')
-    @patch('backend.auth.auth.users_table.get_item')
+    @patch('backend.auth.auth.auth.auth.validate_token')
+    @patch('backend.auth.auth.auth.users_table.get_item')
     def test_get_profile_success(self, mock_get_item, mock_validate_token):
         """Test successful profile retrieval."""
         # Mock token validation
@@ -187,5 +194,433 @@ class TestAuthEndpoints(unittest.TestCase):
         mock_validate_token.assert_called_once()
         mock_get_item.assert_called_once()
 
+    @patch('backend.auth.auth.auth.auth.admin_initiate_auth')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_login_from_token_claims(self, mock_users_table, mock_admin_initiate_auth):
+        """Test that login builds the profile from the ID token claims."""
+        # Mock Cognito response with an ID token carrying the profile claims
+        id_token = jwt.encode({
+            'sub': 'test-user-id',
+            'preferred_username': 'testuser',
+            'email': 'test@example.com',
+            'name': 'Test User',
+            'custom:role': 'admin'
+        }, 'test-secret', algorithm='HS256')
+        mock_admin_initiate_auth.return_value = {
+            'token': id_token,
+            'refresh_token': 'test-refresh-token',
+            'expires_in': 3600
+        }
+        mock_users_table.update_item.return_value = {
+            'Attributes': {'UserID': 'test-user-id', 'Name': 'Test User', 'Role': 'admin'}
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/auth/login',
+            'body': json.dumps({
+                'username': 'test@example.com',
+                'password': 'Password123!'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['user'], {
+            'user_id': 'test-user-id',
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'role': 'admin',
+            'name': 'Test User'
+        })
+        
+        # Verify the profile was not read from DynamoDB
+        mock_users_table.query.assert_not_called()
+        mock_users_table.scan.assert_not_called()
+        mock_users_table.update_item.assert_called_once()
+    
+    @patch('backend.auth.auth.auth.auth.admin_initiate_auth')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_login_prefers_profile_over_stale_claims(self, mock_users_table, mock_admin_initiate_auth):
+        """Test that login uses the stored name and role when the claims were not synced."""
+        # Mock Cognito response with claims from before a profile update
+        id_token = jwt.encode({
+            'sub': 'test-user-id',
+            'preferred_username': 'testuser',
+            'email': 'test@example.com',
+            'name': 'Old Name',
+            'custom:role': 'admin'
+        }, 'test-secret', algorithm='HS256')
+        mock_admin_initiate_auth.return_value = {
+            'token': id_token,
+            'refresh_token': 'test-refresh-token',
+            'expires_in': 3600
+        }
+        mock_users_table.update_item.return_value = {
+            'Attributes': {'UserID': 'test-user-id', 'Name': 'New Name', 'Role': 'team_member'}
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/auth/login',
+            'body': json.dumps({
+                'username': 'test@example.com',
+                'password': 'Password123!'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['user']['name'], 'New Name')
+        self.assertEqual(body['data']['user']['role'], 'team_member')
+        self.assertEqual(mock_users_table.update_item.call_args[1]['ReturnValues'], 'ALL_NEW')
+
+    @patch('backend.auth.auth.auth.auth.validate_token')
+    @patch('backend.auth.auth.auth.auth.admin_update_user_attributes')
+    @patch('backend.auth.auth.auth.stats_table')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_update_profile_single_write(self, mock_users_table, mock_stats_table, mock_update_attributes, mock_validate_token):
+        """Test that a profile update is a single conditional update."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'test-user-id',
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'role': 'admin'
+        }
+        mock_update_attributes.return_value = {}
+        
+        # Mock DynamoDB response
+        mock_users_table.update_item.return_value = {
+            'Attributes': {
+                'UserID': 'test-user-id',
+                'Username': 'testuser',
+                'Email': 'test@example.com',
+                'Role': 'team_member',
+                'Name': 'New Name',
+                'CreatedAt': '2023-01-01T00:00:00',
+                'LastLogin': '2023-01-02T00:00:00'
+            }
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/auth/profile',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'name': 'New Name',
+                'role': 'team_member'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['name'], 'New Name')
+        self.assertEqual(body['data']['role'], 'team_member')
+        
+        # Verify a single conditional write and no reads
+        mock_users_table.get_item.assert_not_called()
+        mock_users_table.update_item.assert_called_once()
+        update_args = mock_users_table.update_item.call_args[1]
+        self.assertEqual(update_args['ReturnValues'], 'ALL_NEW')
+        self.assertIn('#role = :admin_role', update_args['ConditionExpression'])
+        mock_update_attributes.assert_called_once_with('testuser', {
+            'name': 'New Name',
+            'custom:role': 'team_member'
+        })
+        
+        # Verify cached admin directory pages are invalidated
+        mock_stats_table.update_item.assert_called_once()
+    
+    @patch('backend.auth.auth.auth.time.sleep')
+    @patch('backend.auth.auth.auth.auth.validate_token')
+    @patch('backend.auth.auth.auth.auth.admin_update_user_attributes')
+    @patch('backend.auth.auth.auth.stats_table')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_update_profile_claim_sync_failure(self, mock_users_table, mock_stats_table, mock_update_attributes,
+                                               mock_validate_token, mock_sleep):
+        """Test that a claim sync is retried and reported when it keeps failing."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'test-user-id',
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'role': 'team_member'
+        }
+        mock_update_attributes.return_value = {'error': 'Rate exceeded'}
+        mock_users_table.update_item.return_value = {
+            'Attributes': {
+                'UserID': 'test-user-id',
+                'Username': 'testuser',
+                'Email': 'test@example.com',
+                'Role': 'team_member',
+                'Name': 'New Name',
+                'CreatedAt': '2023-01-01T00:00:00',
+                'LastLogin': '2023-01-02T00:00:00'
+            }
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/auth/profile',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({'name': 'New Name'})
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 500)
+        self.assertIn('token claims could not be synced', json.loads(response['body'])['message'])
+        self.assertEqual(mock_update_attributes.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+    
+    @patch('backend.auth.auth.auth.auth.validate_token')
+    @patch('backend.auth.auth.auth.stats_table')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_update_profile_clear_department(self, mock_users_table, mock_stats_table, mock_validate_token):
+        """Test that clearing the department removes the attribute."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'test-user-id',
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock DynamoDB response
+        mock_users_table.update_item.return_value = {
+            'Attributes': {
+                'UserID': 'test-user-id',
+                'Username': 'testuser',
+                'Email': 'test@example.com',
+                'Role': 'team_member',
+                'Name': 'Test User',
+                'CreatedAt': '2023-01-01T00:00:00',
+                'LastLogin': '2023-01-02T00:00:00'
+            }
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/auth/profile',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'department': ''
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['department'], '')
+        
+        # Verify the empty string is not written to the DepartmentIndex key
+        update_args = mock_users_table.update_item.call_args[1]
+        self.assertEqual(update_args['UpdateExpression'], 'remove Department')
+        self.assertNotIn('ExpressionAttributeValues', update_args)
+    
+    @patch('backend.auth.auth.auth.auth.validate_token')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_update_profile_not_found(self, mock_users_table, mock_validate_token):
+        """Test updating the profile of a user that does not exist."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'missing-user-id',
+            'username': 'missing',
+            'email': 'missing@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock a failed existence condition
+        mock_users_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}},
+            'UpdateItem'
+        )
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/auth/profile',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({'department': 'Engineering'})
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 404)
+        mock_users_table.update_item.assert_called_once()
+
+    @patch('backend.auth.auth.auth.auth.admin_refresh_auth')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_refresh_success(self, mock_users_table, mock_admin_refresh_auth):
+        """Test exchanging a refresh token for a new ID token."""
+        # Mock Cognito response
+        mock_admin_refresh_auth.return_value = {
+            'token': 'new-token',
+            'expires_in': 3600
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/auth/refresh',
+            'body': json.dumps({'refresh_token': 'test-refresh-token'})
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['token'], 'new-token')
+        self.assertEqual(body['data']['expires_in'], 3600)
+        
+        # Verify a single upstream call and no Users table access
+        mock_admin_refresh_auth.assert_called_once_with('test-refresh-token')
+        self.assertEqual(mock_users_table.method_calls, [])
+    
+    @patch('backend.auth.auth.auth.auth.admin_refresh_auth')
+    def test_refresh_invalid_token(self, mock_admin_refresh_auth):
+        """Test refreshing with an expired refresh token."""
+        # Mock Cognito response
+        mock_admin_refresh_auth.return_value = {'error': 'Invalid or expired refresh token'}
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/auth/refresh',
+            'body': json.dumps({'refresh_token': 'expired-refresh-token'})
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 401)
+
+    @patch('backend.auth.auth.auth.auth.admin_delete_user')
+    @patch('backend.auth.auth.auth.auth.admin_set_user_password')
+    @patch('backend.auth.auth.auth.auth.admin_create_user')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_register_rolls_back_on_profile_failure(self, mock_users_table, mock_admin_create_user,
+                                                     mock_set_password, mock_delete_user):
+        """Test that a failed profile write removes the Cognito user."""
+        # Mock Cognito responses
+        mock_admin_create_user.return_value = {
+            'user_id': 'test-user-id',
+            'email': 'test@example.com',
+            'role': 'team_member'
+        }
+        mock_set_password.return_value = {}
+        mock_delete_user.return_value = {}
+        
+        # Mock a failed DynamoDB write
+        mock_users_table.put_item.side_effect = Exception('Throttled')
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/auth/register',
+            'body': json.dumps({
+                'username': 'testuser',
+                'email': 'test@example.com',
+                'password': 'Password123!',
+                'name': 'Test User'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 500)
+        mock_set_password.assert_called_once_with('testuser', 'Password123!')
+        mock_delete_user.assert_called_once_with('testuser')
+        mock_users_table.delete_item.assert_not_called()
+    
+    @patch('backend.auth.auth.auth.auth.admin_delete_user')
+    @patch('backend.auth.auth.auth.auth.admin_set_user_password')
+    @patch('backend.auth.auth.auth.auth.admin_create_user')
+    @patch('backend.auth.auth.auth.users_table')
+    def test_register_rolls_back_on_password_failure(self, mock_users_table, mock_admin_create_user,
+                                                      mock_set_password, mock_delete_user):
+        """Test that a failed password update removes both records."""
+        # Mock Cognito responses
+        mock_admin_create_user.return_value = {
+            'user_id': 'test-user-id',
+            'email': 'test@example.com',
+            'role': 'team_member'
+        }
+        mock_set_password.return_value = {'error': 'Password does not conform to policy'}
+        mock_delete_user.return_value = {}
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/auth/register',
+            'body': json.dumps({
+                'username': 'testuser',
+                'email': 'test@example.com',
+                'password': 'weak',
+                'name': 'Test User'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 400)
+        self.assertIn('Password does not conform', body['message'])
+        mock_users_table.put_item.assert_called_once()
+        mock_users_table.delete_item.assert_called_once_with(Key={'UserID': 'test-user-id'})
+        mock_delete_user.assert_called_once_with('testuser')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -13,7 +13,7 @@ os.environ['USER_POOL_CLIENT_ID'] = 'test-client-id'
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from backend.common import response, auth
+from backend.common import response, auth, task_counters, completion_sketch
 
 class TestResponseUtils(unittest.TestCase):
     """Test cases for response utilities."""
@@ -111,5 +111,77 @@ class TestAuthUtils(unittest.TestCase):
         self.assertEqual(result['email'], 'test@example.com')
         self.assertEqual(result['role'], 'admin')
 
+class TestTaskCounters(unittest.TestCase):
+    """Test cases for task counter utilities."""
+    
+    def test_get_deltas_status_change(self):
+        """Test counter deltas for a status change."""
+        deltas = task_counters.get_deltas(
+            {'Status': 'New', 'Priority': 'High'},
+            {'Status': 'Completed', 'Priority': 'High'}
+        )
+        
+        self.assertEqual(deltas, {'Status_New': -1, 'Status_Completed': 1})
+    
+    def test_get_deltas_create_and_delete(self):
+        """Test counter deltas for a create and a delete."""
+        task = {'Status': 'New', 'Priority': 'Low'}
+        
+        self.assertEqual(task_counters.get_deltas(new_task=task),
+                         {'TotalTasks': 1, 'Status_New': 1, 'Priority_Low': 1})
+        self.assertEqual(task_counters.get_deltas(old_task=task),
+                         {'TotalTasks': -1, 'Status_New': -1, 'Priority_Low': -1})
+    
+    def test_update_operation(self):
+        """Test building an atomic ADD update."""
+        operation = task_counters.update_operation({'Status_New': -1, 'Status_In Progress': 1})
+        
+        update = operation['Update']
+        self.assertEqual(update['Key'], {'StatID': {'S': 'task_counters'}})
+        self.assertEqual(update['UpdateExpression'], 'ADD #c0 :c0, #c1 :c1, #version :version')
+        self.assertEqual(update['ExpressionAttributeNames'],
+                         {'#c0': 'Status_In Progress', '#c1': 'Status_New', '#version': 'Version'})
+        self.assertEqual(update['ExpressionAttributeValues'],
+                         {':c0': {'N': '1'}, ':c1': {'N': '-1'}, ':version': {'N': '1'}})
+    
+    def test_count_tasks_overview(self):
+        """Test counting tasks into the overview format."""
+        counters = task_counters.count_tasks([
+            {'Status': 'New', 'Priority': 'High'},
+            {'Status': 'Completed', 'Priority': 'High'},
+            {'Status': 'Completed', 'Priority': 'Low'}
+        ])
+        overview = task_counters.to_overview(counters)
+        
+        self.assertEqual(overview['total_tasks'], 3)
+        self.assertEqual(overview['status_counts']['Completed'], 2)
+        self.assertEqual(overview['status_counts']['Overdue'], 0)
+        self.assertEqual(overview['priority_counts']['High'], 2)
+
+class TestCompletionSketch(unittest.TestCase):
+    """Test cases for completion time sketches."""
+    
+    def test_percentiles_within_accuracy(self):
+        """Test that percentiles are within the relative accuracy."""
+        buckets = {}
+        for hours in range(1, 1001):
+            index = completion_sketch.bucket_index(hours)
+            buckets[index] = buckets.get(index, 0) + 1
+        
+        result = completion_sketch.percentiles(buckets)
+        
+        for name, expected in (('p50', 500), ('p90', 900), ('p99', 990)):
+            self.assertAlmostEqual(result[name], expected, delta=expected * 0.02)
+    
+    def test_team_key_distinct_from_user_keys(self):
+        """Test that a user named 'team' does not share the team sketch."""
+        self.assertNotEqual(completion_sketch.user_key('team'), completion_sketch.TEAM_KEY)
+    
+    def test_percentiles_empty(self):
+        """Test that an empty sketch has no percentiles."""
+        result = completion_sketch.percentiles({})
+        
+        self.assertEqual(result, {'p50': None, 'p90': None, 'p99': None})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
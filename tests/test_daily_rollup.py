@@ -0,0 +1,93 @@
+"""
+Tests for the daily task rollup function.
+"""
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import date
+import sys
+import os
+
+# Set environment variables before importing modules
+os.environ['USERS_TABLE'] = 'Users-test'
+os.environ['TASKS_TABLE'] = 'Tasks-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
+os.environ['ROLLUPS_TABLE'] = 'Rollups-test'
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.admin.admin import daily_rollup
+
+class TestDailyRollup(unittest.TestCase):
+    """Test cases for the daily task rollup."""
+
+    def test_build_rollups(self):
+        """Test that tasks are counted per team, user and department."""
+        tasks_by_day = {
+            'Created': {'2024-01-01': [{'AssignedTo': 'user-1'}], '2024-01-02': [{'AssignedTo': 'user-2'}]},
+            'Completed': {'2024-01-01': [], '2024-01-02': [{'AssignedTo': 'user-1'}]},
+            'Overdue': {'2024-01-01': [], '2024-01-02': [{'AssignedTo': 'user-1'}]}
+        }
+
+        rows = daily_rollup.build_rollups(
+            ['2024-01-01', '2024-01-02'], tasks_by_day, {'user-1': 'Engineering'}
+        )
+        rollups = {(row['Scope'], row['Day']): row for row in rows}
+
+        # Assertions
+        self.assertEqual(rollups[('team', '2024-01-01')]['Created'], 1)
+        self.assertEqual(rollups[('team', '2024-01-02')]['Created'], 1)
+        self.assertEqual(rollups[('team', '2024-01-02')]['Completed'], 1)
+        self.assertEqual(rollups[('team', '2024-01-02')]['Overdue'], 1)
+        self.assertEqual(rollups[('user#user-1', '2024-01-02')]['Completed'], 1)
+        self.assertEqual(rollups[('department#Engineering', '2024-01-02')]['Overdue'], 1)
+        self.assertNotIn(('user#user-2', '2024-01-01'), rollups)
+
+    @patch('backend.admin.admin.daily_rollup.datetime')
+    @patch('backend.admin.admin.daily_rollup.rollups_table')
+    @patch('backend.admin.admin.daily_rollup.stats_table')
+    @patch('backend.admin.admin.daily_rollup.tasks_table')
+    @patch('backend.admin.admin.daily_rollup.users_table')
+    def test_rollup_resumes_from_checkpoint(self, mock_users_table, mock_tasks_table,
+                                            mock_stats_table, mock_rollups_table, mock_datetime):
+        """Test that only the days after the checkpoint are rolled up."""
+        mock_datetime.now.return_value.date.return_value = date(2024, 1, 4)
+
+        # Mock DynamoDB responses
+        mock_stats_table.get_item.return_value = {
+            'Item': {'StatID': 'rollup_checkpoint', 'LastDay': '2024-01-01'}
+        }
+        mock_users_table.scan.return_value = {'Items': []}
+        mock_tasks_table.query.side_effect = lambda **kwargs: {
+            'Items': [{'AssignedTo': 'user-1'}]
+            if kwargs['IndexName'] == 'CreatedDayIndex' and kwargs['KeyConditionExpression'].get_expression()['values'][1] == '2024-01-03'
+            else []
+        }
+        batch = mock_rollups_table.batch_writer.return_value.__enter__.return_value
+
+        # Call the handler
+        response = daily_rollup.lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(json.loads(response['body'])['days'], ['2024-01-02', '2024-01-03'])
+
+        written = [call[1]['Item'] for call in batch.put_item.call_args_list]
+        self.assertEqual(len(written), 3)
+        self.assertIn({'Scope': 'user#user-1', 'Day': '2024-01-03', 'Created': 1, 'Completed': 0, 'Overdue': 0}, written)
+
+        # Verify each day was read from the day indexes, not a table scan
+        mock_tasks_table.scan.assert_not_called()
+        self.assertEqual(mock_tasks_table.query.call_count, 6)
+        self.assertEqual(
+            {call[1]['IndexName'] for call in mock_tasks_table.query.call_args_list},
+            {'CreatedDayIndex', 'CompletedDayIndex', 'OpenDeadlineIndex'}
+        )
+
+        # Verify the checkpoint advanced after the rows were written
+        mock_stats_table.put_item.assert_called_once_with(
+            Item={'StatID': 'rollup_checkpoint', 'LastDay': '2024-01-03'}
+        )
+
+if __name__ == '__main__':
+    unittest.main()
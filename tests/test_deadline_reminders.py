@@ -19,8 +19,8 @@ from backend.notifications.notifications.deadline_reminders import lambda_handle
 class TestDeadlineReminders(unittest.TestCase):
     """Test cases for deadline reminder function."""
     
-    @patch('backend.notifications.deadline_reminders.tasks_table.scan')
-    @patch('backend.notifications.deadline_reminders.sns.publish')
+    @patch('backend.notifications.notifications.deadline_reminders.tasks_table.scan')
+    @patch('backend.notifications.notifications.deadline_reminders.sns.publish')
     def test_deadline_reminders(self, mock_publish, mock_scan):
         """Test deadline reminder processing."""
         # Get current date
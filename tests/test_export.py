@@ -0,0 +1,136 @@
+"""
+Tests for the report export jobs.
+"""
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Set environment variables before importing modules
+os.environ['USERS_TABLE'] = 'Users-test'
+os.environ['TASKS_TABLE'] = 'Tasks-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.admin.admin import export
+
+def paged_scan(items_by_table, page_size=2):
+    """Build a scan mock returning each table's items in pages per segment."""
+    def scan(**kwargs):
+        items = [
+            item for index, item in enumerate(items_by_table[kwargs['TableName']])
+            if index % kwargs['TotalSegments'] == kwargs['Segment']
+        ]
+        start = kwargs.get('ExclusiveStartKey', {}).get('offset', 0)
+        result = {'Items': items[start:start + page_size]}
+        if start + page_size < len(items):
+            result['LastEvaluatedKey'] = {'offset': start + page_size}
+        return result
+    return scan
+
+TASKS = [
+    {
+        'TaskID': {'S': f"task-{index}"},
+        'Title': {'S': f"Task {index}"},
+        'AssignedTo': {'S': 'user-1'},
+        'Status': {'S': 'Completed' if index % 2 else 'New'},
+        'CreatedAt': {'S': '2024-01-01T00:00:00'},
+        'CompletedAt': {'S': '2024-01-01T02:00:00'}
+    }
+    for index in range(7)
+]
+
+USERS = [
+    {'UserID': {'S': 'user-1'}, 'Name': {'S': 'User One'}, 'Role': {'S': 'team_member'}}
+]
+
+class TestExport(unittest.TestCase):
+    """Test cases for report export jobs."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @patch('backend.admin.admin.export.client')
+    def test_parallel_scan_reads_every_page(self, mock_client):
+        """Test that the parallel scan yields every item of every segment."""
+        mock_client.scan.side_effect = paged_scan({'Tasks-test': TASKS})
+
+        items = list(export.parallel_scan('Tasks-test', total_segments=3))
+
+        self.assertEqual(sorted(item['TaskID'] for item in items), [f"task-{index}" for index in range(7)])
+
+    @patch('backend.admin.admin.export.ROW_GROUP_SIZE', 3)
+    @patch('backend.admin.admin.export.stats_table')
+    @patch('backend.admin.admin.export.client')
+    def test_run_job_tasks_csv(self, mock_client, mock_stats_table):
+        """Test exporting tasks to CSV on local storage."""
+        mock_client.scan.side_effect = paged_scan({'Tasks-test': TASKS})
+        mock_stats_table.get_item.return_value = {
+            'Item': {'JobID': 'job-1', 'Report': 'tasks', 'Format': 'csv', 'Status': 'Pending'}
+        }
+
+        with patch.dict(os.environ, {'EXPORT_DIR': self.directory}):
+            export.run_job('job-1')
+
+            with open(export.get_storage().url('exports/tasks-job-1.csv'), newline='') as output:
+                rows = list(csv.DictReader(output))
+
+        # Assertions
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0]['Notes'], '')
+
+        # Verify the job was completed
+        completed = mock_stats_table.update_item.call_args[1]
+        self.assertIn(':a0', completed['ExpressionAttributeValues'])
+        self.assertEqual(completed['ExpressionAttributeValues'][':a0'], 'Completed')
+        self.assertEqual(completed['ExpressionAttributeValues'][':a2'], 7)
+
+    @patch('backend.admin.admin.export.ROW_GROUP_SIZE', 3)
+    @patch('backend.admin.admin.export.stats_table')
+    @patch('backend.admin.admin.export.client')
+    def test_run_job_performance_parquet(self, mock_client, mock_stats_table):
+        """Test exporting performance metrics to Parquet in row groups."""
+        import pyarrow.parquet as pq
+
+        mock_client.scan.side_effect = paged_scan({'Tasks-test': TASKS, 'Users-test': USERS})
+        mock_stats_table.get_item.return_value = {
+            'Item': {'JobID': 'job-2', 'Report': 'performance', 'Format': 'parquet', 'Status': 'Pending'}
+        }
+
+        with patch.dict(os.environ, {'EXPORT_DIR': self.directory}):
+            export.run_job('job-2')
+            table = pq.read_table(export.get_storage().url('exports/performance-job-2.parquet'))
+
+        # Assertions
+        rows = table.to_pylist()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['total_tasks'], 7)
+        self.assertEqual(rows[0]['completed_tasks'], 3)
+        self.assertEqual(rows[0]['average_completion_time'], 2.0)
+
+    @patch('backend.admin.admin.export.stats_table')
+    @patch('backend.admin.admin.export.client')
+    def test_run_job_records_failure(self, mock_client, mock_stats_table):
+        """Test that a failing scan marks the job as failed."""
+        mock_client.scan.side_effect = Exception("Scan failed")
+        mock_stats_table.get_item.return_value = {
+            'Item': {'JobID': 'job-3', 'Report': 'tasks', 'Format': 'csv', 'Status': 'Pending'}
+        }
+
+        with patch.dict(os.environ, {'EXPORT_DIR': self.directory}):
+            export.run_job('job-3')
+
+        failed = mock_stats_table.update_item.call_args[1]
+        self.assertEqual(failed['ExpressionAttributeValues'][':a0'], 'Failed')
+        self.assertEqual(failed['ExpressionAttributeValues'][':a1'], 'Scan failed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Tests for the performance metrics engine.
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.admin.admin.metrics import compute_user_metrics, completion_hours
+
+USERS = [
+    {'UserID': 'admin-1', 'Name': 'Admin', 'Email': 'admin@example.com', 'Role': 'admin'},
+    {'UserID': 'user-1', 'Name': 'User One', 'Email': 'user1@example.com', 'Role': 'team_member'},
+    {'UserID': 'user-2', 'Name': 'User Two', 'Email': 'user2@example.com', 'Role': 'team_member'}
+]
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the performance metrics engine."""
+
+    def test_completion_hours_invalid(self):
+        """Test that missing and invalid timestamps give no completion time."""
+        self.assertEqual(completion_hours({'CreatedAt': '1970-01-01T00:00:00', 'CompletedAt': '1970-01-01T01:30:00'}), 1.5)
+        self.assertIsNone(completion_hours({'CreatedAt': '1970-01-01T00:00:00'}))
+        self.assertIsNone(completion_hours({'CreatedAt': '1970-01-01T00:00:00', 'CompletedAt': 'not-a-date'}))
+
+    def test_compute_user_metrics(self):
+        """Test counts, completion rates and average completion times."""
+        tasks = [
+            {'AssignedTo': 'user-1', 'Status': 'Completed', 'CreatedAt': '2024-01-01T00:00:00', 'CompletedAt': '2024-01-01T02:00:00'},
+            {'AssignedTo': 'user-1', 'Status': 'Completed', 'CreatedAt': '2024-01-01T00:00:00', 'CompletedAt': '2024-01-01T04:30:00'},
+            {'AssignedTo': 'user-1', 'Status': 'Completed', 'CreatedAt': '2024-01-01T00:00:00', 'CompletedAt': 'invalid'},
+            {'AssignedTo': 'user-1', 'Status': 'Overdue', 'CreatedAt': '2024-01-01T00:00:00'},
+            {'AssignedTo': 'user-2', 'Status': 'New', 'CreatedAt': '2024-01-01T00:00:00'},
+            {'AssignedTo': 'admin-1', 'Status': 'Completed', 'CreatedAt': '2024-01-01T00:00:00', 'CompletedAt': '2024-01-02T00:00:00'},
+            {'Status': 'New'}
+        ]
+
+        metrics = compute_user_metrics(iter(tasks), USERS)
+
+        # Assertions
+        self.assertEqual([item['user_id'] for item in metrics], ['user-1', 'user-2'])
+        self.assertEqual(metrics[0]['total_tasks'], 4)
+        self.assertEqual(metrics[0]['completed_tasks'], 3)
+        self.assertEqual(metrics[0]['overdue_tasks'], 1)
+        self.assertEqual(metrics[0]['completion_rate'], 75.0)
+        self.assertEqual(metrics[0]['average_completion_time'], 3.25)
+        self.assertEqual(metrics[1]['total_tasks'], 1)
+        self.assertEqual(metrics[1]['completion_rate'], 0)
+        self.assertEqual(metrics[1]['average_completion_time'], 0)
+
+    def test_compute_user_metrics_no_tasks(self):
+        """Test that team members without tasks get zeroed metrics."""
+        metrics = compute_user_metrics([], USERS)
+
+        self.assertEqual(len(metrics), 2)
+        self.assertEqual(metrics[0]['total_tasks'], 0)
+        self.assertEqual(metrics[0]['completion_rate'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,20 +6,23 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+from botocore.exceptions import ClientError
 
 # Set environment variables before importing modules
 os.environ['NOTIFICATIONS_TABLE'] = 'Notifications-test'
+os.environ['USERS_TABLE'] = 'Users-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
 os.environ['NOTIFICATION_TOPIC'] = 'arn:aws:sns:us-east-1:123456789012:TestTopic'
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from backend.notifications.notifications import lambda_handler, process_sns_notification
+from backend.notifications.notifications.notifications import lambda_handler, process_sns_notification
 
 class TestNotificationEndpoints(unittest.TestCase):
     """Test cases for notification endpoints."""
     
-    @patch('backend.notifications.notifications.auth.validate_token')
-    @patch('backend.notifications.notifications.notifications_table.query')
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.notifications_table.query')
     def test_get_notifications(self, mock_query, mock_validate_token):
         """Test getting user notifications."""
         # Mock token validation
@@ -77,11 +80,10 @@ class TestNotificationEndpoints(unittest.TestCase):
         mock_validate_token.assert_called_once()
         mock_query.assert_called_once()
     
-    @patch('backend.notifications.notifications.auth.validate_token')
-    @patch('backend.notifications.notifications.notifications_table.get_item')
-    @patch('backend.notifications.notifications.notifications_table.update_item')
-    def test_mark_as_read(self, mock_update_item, mock_get_item, mock_validate_token):
-        """Test marking a notification as read."""
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.notifications_table')
+    def test_get_notifications_fills_filtered_page(self, mock_notifications_table, mock_validate_token):
+        """Test that filtered pages are filled across queries and return a cursor."""
         # Mock token validation
         mock_validate_token.return_value = {
             'user_id': 'user-1',
@@ -90,30 +92,181 @@ class TestNotificationEndpoints(unittest.TestCase):
             'role': 'team_member'
         }
         
-        # Mock DynamoDB get_item response
-        mock_get_item.side_effect = [
+        def notification(index):
+            return {
+                'NotificationID': f"notif-{index}",
+                'UserID': 'user-1',
+                'Message': f"Notification {index}",
+                'CreatedAt': f"2023-01-{index:02d}T00:00:00",
+                'ReadStatus': True
+            }
+        
+        # Mock DynamoDB responses: most evaluated items are filtered out
+        mock_notifications_table.query.side_effect = [
             {
-                'Item': {
-                    'NotificationID': 'notif-1',
-                    'UserID': 'user-1',
-                    'Type': 'task_assigned',
-                    'Message': 'You have been assigned a new task',
-                    'CreatedAt': '2023-01-01T00:00:00',
-                    'ReadStatus': False
-                }
+                'Items': [notification(9)],
+                'ScannedCount': 100,
+                'LastEvaluatedKey': {'NotificationID': 'notif-0', 'UserID': 'user-1', 'CreatedAt': '2023-01-08T00:00:00'}
             },
             {
-                'Item': {
-                    'NotificationID': 'notif-1',
-                    'UserID': 'user-1',
-                    'Type': 'task_assigned',
-                    'Message': 'You have been assigned a new task',
-                    'CreatedAt': '2023-01-01T00:00:00',
-                    'ReadStatus': True
-                }
+                'Items': [notification(7), notification(6), notification(5), notification(4)],
+                'ScannedCount': 10,
+                'LastEvaluatedKey': {'NotificationID': 'notif-4', 'UserID': 'user-1', 'CreatedAt': '2023-01-04T00:00:00'}
             }
         ]
         
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/notifications',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'read': 'true',
+                'limit': '3'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual([item['NotificationID'] for item in body['data']['notifications']],
+                         ['notif-9', 'notif-7', 'notif-6'])
+        self.assertEqual(mock_notifications_table.query.call_count, 2)
+        
+        # Verify the cursor continues after the last notification returned
+        event['queryStringParameters']['cursor'] = body['data']['next_cursor']
+        mock_notifications_table.query.side_effect = [{'Items': [], 'ScannedCount': 0}]
+        
+        response = lambda_handler(event, {})
+        
+        self.assertEqual(response['statusCode'], 200)
+        self.assertIsNone(json.loads(response['body'])['data']['next_cursor'])
+        self.assertEqual(mock_notifications_table.query.call_args[1]['ExclusiveStartKey'],
+                         {'NotificationID': 'notif-6', 'UserID': 'user-1', 'CreatedAt': '2023-01-06T00:00:00'})
+    
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.notifications_table')
+    def test_get_unread_notifications(self, mock_notifications_table, mock_validate_token):
+        """Test that unread notifications are read by key from the sparse index."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock DynamoDB query response
+        mock_notifications_table.query.return_value = {
+            'Items': [{
+                'NotificationID': f"notif-{index}",
+                'UserID': 'user-1',
+                'UnreadUserID': 'user-1',
+                'Message': f"Notification {index}",
+                'CreatedAt': f"2023-01-{index:02d}T00:00:00",
+                'ReadStatus': False
+            } for index in (3, 2)],
+            'ScannedCount': 2,
+            'LastEvaluatedKey': {'NotificationID': 'notif-2', 'UnreadUserID': 'user-1', 'CreatedAt': '2023-01-02T00:00:00'}
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/notifications',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'read': 'false',
+                'limit': '2'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['count'], 2)
+        
+        # Verify a single key-only query read exactly one page
+        mock_notifications_table.query.assert_called_once()
+        query = mock_notifications_table.query.call_args[1]
+        self.assertEqual(query['IndexName'], 'UnreadNotificationsIndex')
+        self.assertNotIn('FilterExpression', query)
+        self.assertEqual(query['Limit'], 2)
+        
+        from backend.notifications.notifications.notifications import decode_cursor
+        self.assertEqual(decode_cursor(body['data']['next_cursor']),
+                         {'NotificationID': 'notif-2', 'UnreadUserID': 'user-1', 'CreatedAt': '2023-01-02T00:00:00'})
+    
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    def test_get_notifications_rejects_other_users_cursor(self, mock_validate_token):
+        """Test that a cursor cannot page through another user's notifications."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        from backend.notifications.notifications.notifications import encode_cursor
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/notifications',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'cursor': encode_cursor({'NotificationID': 'notif-1', 'UserID': 'user-2', 'CreatedAt': '2023-01-01T00:00:00'})
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 400)
+    
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.stats_table')
+    @patch('backend.notifications.notifications.notifications.notifications_table')
+    def test_mark_as_read(self, mock_notifications_table, mock_stats_table, mock_validate_token):
+        """Test marking a notification as read."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock DynamoDB update_item response
+        mock_notifications_table.update_item.return_value = {
+            'Attributes': {
+                'NotificationID': 'notif-1',
+                'UserID': 'user-1',
+                'Type': 'task_assigned',
+                'Message': 'You have been assigned a new task',
+                'CreatedAt': '2023-01-01T00:00:00',
+                'ReadStatus': False
+            }
+        }
+        
         # Create test event
         event = {
             'httpMethod': 'PUT',
@@ -137,13 +290,144 @@ class TestNotificationEndpoints(unittest.TestCase):
         self.assertTrue(body['success'])
         self.assertTrue(body['data']['ReadStatus'])
         
-        # Verify mocks were called
+        # Verify the notification was updated in a single call
         mock_validate_token.assert_called_once()
-        self.assertEqual(mock_get_item.call_count, 2)
-        mock_update_item.assert_called_once()
+        mock_notifications_table.get_item.assert_not_called()
+        update = mock_notifications_table.update_item.call_args[1]
+        self.assertEqual(update['UpdateExpression'], 'set ReadStatus = :read_status remove UnreadUserID')
+        self.assertEqual(update['ConditionExpression'], 'UserID = :uid')
+        self.assertEqual(update['ExpressionAttributeValues'][':uid'], 'user-1')
+        self.assertEqual(update['ReturnValues'], 'ALL_OLD')
+        
+        # Verify the unread count dropped
+        counter = mock_stats_table.update_item.call_args[1]
+        self.assertEqual(counter['Key'], {'StatID': 'unread_count#user-1'})
+        self.assertEqual(counter['ExpressionAttributeValues'][':delta'], -1)
     
-    @patch('backend.notifications.notifications.notifications_table.put_item')
-    def test_process_sns_notification(self, mock_put_item):
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.stats_table')
+    def test_get_unread_count(self, mock_stats_table, mock_validate_token):
+        """Test reading the unread count with a single key lookup."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        mock_stats_table.get_item.return_value = {
+            'Item': {'StatID': 'unread_count#user-1', 'UnreadCount': 3}
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'GET',
+            'path': '/notifications/unread-count',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['unread_count'], 3)
+        mock_stats_table.get_item.assert_called_once_with(Key={'StatID': 'unread_count#user-1'})
+    
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.notifications_table')
+    def test_mark_as_read_condition_failures(self, mock_notifications_table, mock_validate_token):
+        """Test that failed ownership conditions map to 403 and 404."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/notifications/notif-1/read',
+            'pathParameters': {
+                'notificationId': 'notif-1'
+            },
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            }
+        }
+        
+        # Another user's notification
+        mock_notifications_table.update_item.side_effect = ClientError({
+            'Error': {'Code': 'ConditionalCheckFailedException'},
+            'Item': {'NotificationID': {'S': 'notif-1'}, 'UserID': {'S': 'user-2'}}
+        }, 'UpdateItem')
+        self.assertEqual(lambda_handler(event, {})['statusCode'], 403)
+        
+        # A missing notification
+        mock_notifications_table.update_item.side_effect = ClientError({
+            'Error': {'Code': 'ConditionalCheckFailedException'}
+        }, 'UpdateItem')
+        self.assertEqual(lambda_handler(event, {})['statusCode'], 404)
+    
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.users_table')
+    def test_update_settings(self, mock_users_table, mock_validate_token):
+        """Test that notification settings are validated and stored on the user."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/notifications/settings',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'settings': {
+                    'muted_types': ['task_status_updated'],
+                    'quiet_hours': {'start': '22:00', 'end': '07:00'}
+                }
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        update = mock_users_table.update_item.call_args[1]
+        self.assertEqual(update['Key'], {'UserID': 'user-1'})
+        self.assertEqual(update['ExpressionAttributeValues'][':settings'], {
+            'muted_types': ['task_status_updated'],
+            'quiet_hours': {'start': '22:00', 'end': '07:00', 'timezone': 'UTC'},
+            'digest': False
+        })
+        
+        # Verify invalid settings are rejected before storing
+        mock_users_table.update_item.reset_mock()
+        event['body'] = json.dumps({'settings': {'muted_types': ['everything']}})
+        
+        response = lambda_handler(event, {})
+        
+        self.assertEqual(response['statusCode'], 400)
+        mock_users_table.update_item.assert_not_called()
+    
+    @patch('backend.notifications.notifications.notifications.stats_table')
+    @patch('backend.notifications.notifications.notifications.dynamodb')
+    def test_process_sns_notification(self, mock_dynamodb, mock_stats_table):
         """Test processing SNS notifications."""
         # Create test SNS event
         event = {
@@ -165,17 +449,408 @@ class TestNotificationEndpoints(unittest.TestCase):
             ]
         }
         
+        mock_dynamodb.batch_get_item.return_value = {'Responses': {}}
+        mock_put_item = mock_dynamodb.meta.client.put_item
+        
         # Call the handler
         process_sns_notification(event, {})
         
-        # Verify mock was called
+        # Verify the notification was inserted only if absent
         mock_put_item.assert_called_once()
+        self.assertEqual(mock_put_item.call_args[1]['ConditionExpression'], 'attribute_not_exists(NotificationID)')
         
         # Check the notification data
         notification = mock_put_item.call_args[1]['Item']
-        self.assertEqual(notification['UserID'], 'user-1')
-        self.assertEqual(notification['Type'], 'task_assigned')
-        self.assertIn('Task 1', notification['Message'])
+        self.assertEqual(notification['UserID'], {'S': 'user-1'})
+        self.assertEqual(notification['UnreadUserID'], {'S': 'user-1'})
+        self.assertEqual(notification['Type'], {'S': 'task_assigned'})
+        self.assertIn('Task 1', notification['Message']['S'])
+
+    @patch('backend.notifications.notifications.notifications.auth.validate_token')
+    @patch('backend.notifications.notifications.notifications.stats_table')
+    @patch('backend.notifications.notifications.notifications.client')
+    def test_mark_all_as_read(self, mock_client, mock_stats_table, mock_validate_token):
+        """Test marking all unread notifications as read page by page."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock DynamoDB responses: two pages, one notification read meanwhile
+        mock_client.query.side_effect = [
+            {
+                'Items': [{'NotificationID': {'S': 'notification-1'}}, {'NotificationID': {'S': 'notification-2'}}],
+                'LastEvaluatedKey': {'NotificationID': {'S': 'notification-2'}}
+            },
+            {'Items': [{'NotificationID': {'S': 'notification-3'}}]}
+        ]
+        
+        def update_item(**kwargs):
+            if kwargs['Key'] == {'NotificationID': {'S': 'notification-2'}}:
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+            return {}
+        
+        mock_client.update_item.side_effect = update_item
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/notifications/read-all',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'queryStringParameters': {
+                'before': '2023-01-02T00:00:00'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(body['data']['updated'], 2)
+        
+        # Verify the index was queried for the user's unread items up to the timestamp
+        query = mock_client.query.call_args_list[0][1]
+        self.assertEqual(query['IndexName'], 'UnreadNotificationsIndex')
+        self.assertEqual(query['KeyConditionExpression'], 'UnreadUserID = :user_id AND CreatedAt <= :before')
+        self.assertNotIn('FilterExpression', query)
+        self.assertEqual(mock_client.query.call_args_list[1][1]['ExclusiveStartKey'],
+                         {'NotificationID': {'S': 'notification-2'}})
+        self.assertEqual(mock_client.update_item.call_count, 3)
+        self.assertEqual(mock_stats_table.update_item.call_args[1]['ExpressionAttributeValues'][':delta'], -2)
+
+class TestNotificationIngestion(unittest.TestCase):
+    """Test cases for batched notification ingestion."""
+    
+    def sns_records(self, count):
+        """Build SNS records for distinct messages."""
+        return [{
+            'Sns': {
+                'MessageId': f"message-{index}",
+                'Message': json.dumps({'type': 'task_assigned', 'task_id': f"task-{index}", 'title': f"Task {index}"}),
+                'MessageAttributes': {'user_id': {'Value': 'user-1'}}
+            }
+        } for index in range(count)]
+    
+    def client_error(self, code):
+        """Build a DynamoDB error with the given code."""
+        return ClientError({'Error': {'Code': code, 'Message': code}}, 'PutItem')
+    
+    @patch('backend.notifications.notifications.ingestion.time.sleep')
+    def test_ingest_inserts_new_and_retries_throttled(self, mock_sleep):
+        """Test that only absent notifications are inserted and counted, and throttled puts retried."""
+        from backend.notifications.notifications import ingestion
+        
+        mock_dynamodb = MagicMock()
+        throttled = {'task-0'}
+        
+        def put_item(TableName, Item, ConditionExpression):
+            task_id = Item['TaskID']['S']
+            # task-0 is throttled once and task-1 was stored by an earlier delivery
+            if task_id in throttled:
+                throttled.discard(task_id)
+                raise self.client_error('ProvisionedThroughputExceededException')
+            if task_id == 'task-1':
+                raise self.client_error('ConditionalCheckFailedException')
+            return {}
+        
+        mock_dynamodb.meta.client.put_item.side_effect = put_item
+        
+        mock_stats_table = MagicMock()
+        
+        result = ingestion.ingest(mock_dynamodb, 'Notifications-test', self.sns_records(30), mock_stats_table)
+        
+        # Assertions
+        self.assertEqual(mock_dynamodb.meta.client.put_item.call_count, 31)
+        self.assertEqual(len(result['written']), 29)
+        self.assertNotIn('task-1', [item['TaskID'] for item in result['written']])
+        self.assertEqual(result['failed'], [])
+        mock_sleep.assert_called_once_with(ingestion.BASE_DELAY)
+        
+        # Verify the recipient's unread count rose once, for the inserted notifications only
+        mock_stats_table.update_item.assert_called_once_with(
+            Key={'StatID': 'unread_count#user-1'},
+            UpdateExpression="ADD UnreadCount :delta, Version :one",
+            ExpressionAttributeValues={':delta': 29, ':one': 1},
+            ReturnValues='UPDATED_NEW'
+        )
+        
+        # Redelivered messages keep their notification ID
+        again = ingestion.build_notification(self.sns_records(1)[0])
+        self.assertEqual(again['NotificationID'], result['written'][0]['NotificationID'])
+    
+    @patch('backend.notifications.notifications.ingestion.time.sleep')
+    def test_sns_handler_raises_on_failed_records(self, mock_sleep):
+        """Test that invalid and unwritable records fail the invocation so SNS retries."""
+        from backend.notifications.notifications import sns_handler
+        
+        records = self.sns_records(3)
+        records[1]['Sns']['Message'] = 'not json'
+        
+        with patch.object(sns_handler, 'dynamodb') as mock_dynamodb, patch.object(sns_handler, 'stats_table'):
+            mock_dynamodb.batch_get_item.return_value = {'Responses': {}}
+            
+            # The third record is throttled on every attempt
+            def put_item(TableName, Item, ConditionExpression):
+                if Item['TaskID']['S'] == 'task-2':
+                    raise self.client_error('ProvisionedThroughputExceededException')
+                return {}
+            
+            mock_dynamodb.meta.client.put_item.side_effect = put_item
+            
+            with self.assertRaises(Exception) as raised:
+                sns_handler.lambda_handler({'Records': records}, {})
+        
+        # Assertions
+        self.assertIn('Failed to store 2 of 3 notifications: message-1, message-2', str(raised.exception))
+
+class TestNotificationStream(unittest.TestCase):
+    """Test cases for the notification event stream."""
+    
+    def test_ingest_publishes_to_user_streams(self):
+        """Test that stored notifications and unread counts reach the recipient's streams."""
+        from backend.notifications.notifications import ingestion, stream
+        
+        mock_dynamodb = MagicMock()
+        mock_stats_table = MagicMock()
+        mock_stats_table.update_item.return_value = {'Attributes': {'UnreadCount': 4}}
+        
+        events = stream.events('user-1', heartbeat=0.01)
+        self.assertEqual(next(events), ": connected\n\n")
+        other = stream.broker.subscribe('user-2')
+        
+        try:
+            record = {
+                'Sns': {
+                    'MessageId': 'message-1',
+                    'Message': json.dumps({'type': 'task_assigned', 'task_id': 'task-1', 'title': 'Task 1'}),
+                    'MessageAttributes': {'user_id': {'Value': 'user-1'}}
+                }
+            }
+            ingestion.ingest(mock_dynamodb, 'Notifications-test', [record], mock_stats_table)
+            
+            # Assertions
+            notification = next(events)
+            self.assertTrue(notification.startswith("event: notification\ndata: "))
+            self.assertEqual(json.loads(notification.split('data: ')[1])['TaskID'], 'task-1')
+            self.assertEqual(next(events), 'event: unread_count\ndata: {"unread_count": 4}\n\n')
+            self.assertEqual(next(events), ": heartbeat\n\n")
+            self.assertTrue(other.empty())
+        finally:
+            events.close()
+            stream.broker.unsubscribe('user-2', other)
+        
+        # Verify closing the stream unsubscribed it
+        self.assertEqual(stream.broker.subscribers, {})
+    
+    def test_slow_stream_drops_events(self):
+        """Test that a full stream queue drops events instead of blocking."""
+        from backend.notifications.notifications import stream
+        
+        broker = stream.NotificationBroker(max_queued=1)
+        events = broker.subscribe('user-1')
+        
+        broker.publish('user-1', 'unread_count', {'unread_count': 1})
+        broker.publish('user-1', 'unread_count', {'unread_count': 2})
+        
+        # Assertions
+        self.assertEqual(events.get_nowait(), ('unread_count', {'unread_count': 1}))
+        self.assertTrue(events.empty())
+
+class TestNotificationPreferences(unittest.TestCase):
+    """Test cases for notification suppression at ingestion."""
+    
+    def test_ingest_drops_suppressed_notifications(self):
+        """Test that preferences are read once per event, cached and applied."""
+        from backend.notifications.notifications import ingestion, preferences
+        
+        preferences.cache.clear()
+        
+        mock_dynamodb = MagicMock()
+        mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {
+                'Users-test': [{
+                    'UserID': 'user-1',
+                    'NotificationSettings': {'muted_types': ['task_status_updated'], 'quiet_hours': None, 'digest': False}
+                }]
+            }
+        }
+        
+        def record(index, user_id, notification_type):
+            return {
+                'Sns': {
+                    'MessageId': f"message-{index}",
+                    'Message': json.dumps({'type': notification_type, 'task_id': f"task-{index}", 'title': f"Task {index}"}),
+                    'MessageAttributes': {'user_id': {'Value': user_id}}
+                }
+            }
+        
+        records = [
+            record(1, 'user-1', 'task_assigned'),
+            record(2, 'user-1', 'task_status_updated'),
+            record(3, 'user-2', 'task_status_updated')
+        ]
+        
+        result = ingestion.ingest(mock_dynamodb, 'Notifications-test', records, MagicMock(), 'Users-test')
+        
+        # Assertions
+        self.assertEqual([item['TaskID'] for item in result['written']], ['task-1', 'task-3'])
+        self.assertEqual(result['suppressed'], 1)
+        keys = mock_dynamodb.batch_get_item.call_args[1]['RequestItems']['Users-test']['Keys']
+        self.assertEqual(sorted(key['UserID'] for key in keys), ['user-1', 'user-2'])
+        
+        # Verify a second event is served from the cache
+        ingestion.ingest(mock_dynamodb, 'Notifications-test', records, MagicMock(), 'Users-test')
+        mock_dynamodb.batch_get_item.assert_called_once()
+        
+        preferences.cache.clear()
+    
+    def test_quiet_hours(self):
+        """Test quiet hours windows, including ones wrapping past midnight."""
+        from datetime import datetime, timezone
+        from backend.notifications.notifications import preferences
+        
+        overnight = {'start': '22:00', 'end': '07:00', 'timezone': 'UTC'}
+        
+        # Assertions
+        self.assertTrue(preferences.in_quiet_hours(overnight, datetime(2023, 1, 1, 23, 30, tzinfo=timezone.utc)))
+        self.assertTrue(preferences.in_quiet_hours(overnight, datetime(2023, 1, 1, 6, 59, tzinfo=timezone.utc)))
+        self.assertFalse(preferences.in_quiet_hours(overnight, datetime(2023, 1, 1, 12, 0, tzinfo=timezone.utc)))
+        self.assertFalse(preferences.in_quiet_hours(
+            {'start': '22:00', 'end': '07:00', 'timezone': 'Asia/Tokyo'},
+            datetime(2023, 1, 1, 23, 30, tzinfo=timezone.utc)
+        ))
+
+class TestNotificationDigests(unittest.TestCase):
+    """Test cases for coalescing notifications into digests."""
+    
+    def sns_record(self, index, user_id, notification_type):
+        """Build an SNS record for a task event."""
+        return {
+            'Sns': {
+                'MessageId': f"message-{index}",
+                'Message': json.dumps({'type': notification_type, 'task_id': f"task-{index}", 'title': f"Task {index}"}),
+                'MessageAttributes': {'user_id': {'Value': user_id}}
+            }
+        }
+    
+    def test_ingest_coalesces_digest_users(self):
+        """Test that a digest user's burst becomes one digest update."""
+        from backend.notifications.notifications import ingestion, preferences
+        
+        preferences.cache.clear()
+        
+        mock_dynamodb = MagicMock()
+        mock_dynamodb.batch_get_item.return_value = {
+            'Responses': {
+                'Users-test': [{
+                    'UserID': 'user-1',
+                    'NotificationSettings': {'muted_types': [], 'quiet_hours': None, 'digest': True}
+                }]
+            }
+        }
+        mock_table = mock_dynamodb.Table.return_value
+        mock_table.update_item.return_value = {}
+        mock_stats_table = MagicMock()
+        mock_stats_table.update_item.return_value = {'Attributes': {'UnreadCount': 1}}
+        
+        records = [self.sns_record(index, 'user-1', 'task_assigned') for index in range(3)]
+        records.append(self.sns_record(3, 'user-1', 'deadline_reminder'))
+        records.append(self.sns_record(4, 'user-2', 'task_assigned'))
+        
+        result = ingestion.ingest(mock_dynamodb, 'Notifications-test', records, mock_stats_table, 'Users-test')
+        
+        # Assertions
+        self.assertEqual(result['digested'], 3)
+        self.assertEqual(result['failed'], [])
+        
+        # Only the other types and users are written individually
+        puts = mock_dynamodb.meta.client.put_item.call_args_list
+        self.assertEqual(sorted(call[1]['Item']['TaskID']['S'] for call in puts), ['task-3', 'task-4'])
+        
+        # The burst is one update of the window's digest
+        mock_table.update_item.assert_called_once()
+        update = mock_table.update_item.call_args[1]
+        self.assertEqual(update['ExpressionAttributeValues'][':task_ids'], {'task-0', 'task-1', 'task-2'})
+        self.assertIn('add TaskIDs :task_ids', update['UpdateExpression'])
+        
+        digest = [item for item in result['written'] if item.get('Digest')][0]
+        self.assertEqual(digest['Count'], 3)
+        self.assertEqual(digest['TaskIDs'], ['task-0', 'task-1', 'task-2'])
+        self.assertEqual(digest['Message'], 'You have been assigned 3 new tasks')
+        
+        # The new digest raised user-1's unread count with their reminder
+        deltas = {
+            call[1]['Key']['StatID']: call[1]['ExpressionAttributeValues'][':delta']
+            for call in mock_stats_table.update_item.call_args_list
+        }
+        self.assertEqual(deltas, {'unread_count#user-1': 2, 'unread_count#user-2': 1})
+        
+        preferences.cache.clear()
+    
+    def test_merge_into_unread_digest(self):
+        """Test that adding to an unread digest keeps its unread count."""
+        from datetime import datetime
+        from backend.notifications.notifications import digest
+        
+        mock_table = MagicMock()
+        mock_table.update_item.return_value = {
+            'Attributes': {'TaskIDs': {'task-0', 'task-1'}, 'ReadStatus': False}
+        }
+        items = [
+            {'NotificationID': 'notification-1', 'TaskID': 'task-1', 'Message': 'Update'},
+            {'NotificationID': 'notification-2', 'TaskID': 'task-2', 'Message': 'Update'}
+        ]
+        now = datetime(2023, 1, 1, 12, 2)
+        
+        notification, became_unread = digest.merge(mock_table, 'user-1', 'task_status_updated', items, now)
+        
+        # Assertions
+        self.assertFalse(became_unread)
+        self.assertEqual(notification['Count'], 3)
+        self.assertEqual(notification['Message'], '3 of your tasks had status updates')
+        
+        # Events of the same window share the digest
+        later = datetime(2023, 1, 1, 12, 4)
+        self.assertEqual(notification['NotificationID'],
+                         digest.digest_id('user-1', 'task_status_updated', int(later.timestamp()) // 300 * 300))
+    
+    def test_merge_redelivery_keeps_read_digest(self):
+        """Test that merging only notifications merged before leaves the digest as it is."""
+        from datetime import datetime
+        from backend.notifications.notifications import digest
+        
+        mock_table = MagicMock()
+        mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+            'UpdateItem'
+        )
+        items = [{'NotificationID': 'notification-1', 'TaskID': 'task-1', 'Message': 'Update'}]
+        
+        notification, became_unread = digest.merge(mock_table, 'user-1', 'task_status_updated', items,
+                                                    datetime(2023, 1, 1, 12, 2))
+        
+        # Assertions
+        self.assertIsNone(notification)
+        self.assertFalse(became_unread)
+        
+        # The update only applies to a new digest or one missing a notification
+        update = mock_table.update_item.call_args[1]
+        self.assertEqual(update['ConditionExpression'],
+                         'attribute_not_exists(NotificationID) OR NOT contains(SourceIDs, :source0)')
+        self.assertEqual(update['ExpressionAttributeValues'][':source0'], 'notification-1')
+        
+        # Stored digests do not expose their source IDs
+        stored = digest.serialize({'Type': 'task_status_updated', 'TaskIDs': {'task-1'}, 'SourceIDs': {'notification-1'}})
+        self.assertNotIn('SourceIDs', stored)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
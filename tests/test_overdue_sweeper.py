@@ -0,0 +1,151 @@
+"""
+Tests for the overdue task sweeper.
+"""
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+import sys
+import os
+from botocore.exceptions import ClientError
+
+# Set environment variables before importing modules
+os.environ['TASKS_TABLE'] = 'Tasks-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
+os.environ['NOTIFICATION_TOPIC'] = 'arn:aws:sns:us-east-1:123456789012:TestTopic'
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.tasks.tasks import overdue_sweeper
+
+def index_query(tasks_by_day):
+    """Build an OpenDeadlineIndex query mock returning one page per day."""
+    def query(**kwargs):
+        day = kwargs['ExpressionAttributeValues'][':day']['S']
+        return {'Items': [
+            {key: {'S': value} for key, value in task.items()}
+            for task in tasks_by_day.get(day, [])
+        ]}
+    return query
+
+def open_task(task_id, assigned_to, day, status='New'):
+    """Build an open task due on a day."""
+    return {
+        'TaskID': task_id,
+        'Title': f"Task {task_id}",
+        'AssignedTo': assigned_to,
+        'Deadline': f"{day}T09:00:00",
+        'Priority': 'Medium',
+        'Status': status
+    }
+
+class TestOverdueSweeper(unittest.TestCase):
+    """Test cases for the overdue task sweeper."""
+
+    @patch('backend.tasks.tasks.overdue_sweeper.datetime')
+    @patch('backend.tasks.tasks.overdue_sweeper.sns')
+    @patch('backend.tasks.tasks.overdue_sweeper.client')
+    @patch('backend.tasks.tasks.overdue_sweeper.stats_table')
+    def test_sweep_marks_and_notifies(self, mock_stats_table, mock_client, mock_sns, mock_datetime):
+        """Test that past-deadline tasks are flipped and assignees notified once."""
+        mock_datetime.now.return_value = datetime(2024, 1, 10, 12, 0)
+        mock_datetime.fromisoformat = datetime.fromisoformat
+
+        # Mock DynamoDB responses
+        mock_stats_table.get_item.return_value = {
+            'Item': {'StatID': 'overdue_sweep_checkpoint', 'Day': '2024-01-10'}
+        }
+        mock_client.query.side_effect = index_query({
+            '2024-01-05': [open_task('task-1', 'user-1', '2024-01-05')],
+            '2024-01-10': [
+                open_task('task-2', 'user-1', '2024-01-10', 'In Progress'),
+                open_task('task-3', 'user-2', '2024-01-10')
+            ]
+        })
+        mock_sns.publish_batch.return_value = {'Successful': [{}, {}], 'Failed': []}
+
+        # Call the handler
+        response = overdue_sweeper.lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertTrue(json.loads(response['body'])['finished'])
+
+        # Verify the index was range queried from the lookback window, never scanned
+        days = [call[1]['ExpressionAttributeValues'][':day']['S'] for call in mock_client.query.call_args_list]
+        self.assertEqual(days[0], '2024-01-03')
+        self.assertEqual(days[-1], '2024-01-10')
+        self.assertEqual(mock_client.query.call_args[1]['ExpressionAttributeValues'][':now']['S'],
+                         '2024-01-10T12:00:00')
+        mock_client.scan.assert_not_called()
+
+        # Verify the status updates carry their counter updates
+        writes = [call[1]['TransactItems'] for call in mock_client.transact_write_items.call_args_list]
+        self.assertEqual([len(items) for items in writes], [2, 3])
+        counters = writes[1][-1]['Update']
+        self.assertEqual(sorted(counters['ExpressionAttributeNames'].values()),
+                         ['Status_In Progress', 'Status_New', 'Status_Overdue', 'Version'])
+
+        # Verify one notification per assignee
+        entries = mock_sns.publish_batch.call_args[1]['PublishBatchRequestEntries']
+        messages = {entry['MessageAttributes']['user_id']['StringValue']: json.loads(entry['Message']) for entry in entries}
+        self.assertEqual(messages['user-1']['count'], 2)
+        self.assertEqual(messages['user-2']['task_id'], 'task-3')
+
+        mock_stats_table.put_item.assert_called_once_with(
+            Item={'StatID': 'overdue_sweep_checkpoint', 'Day': '2024-01-10'}
+        )
+
+    @patch('backend.tasks.tasks.overdue_sweeper.client')
+    def test_mark_overdue_skips_changed_tasks(self, mock_client):
+        """Test that tasks changed since they were read are dropped and the rest retried."""
+        mock_client.transact_write_items.side_effect = [
+            ClientError({
+                'Error': {'Code': 'TransactionCanceledException'},
+                'CancellationReasons': [{'Code': 'None'}, {'Code': 'ConditionalCheckFailed'}, {'Code': 'None'}]
+            }, 'TransactWriteItems'),
+            {}
+        ]
+        tasks = [open_task('task-1', 'user-1', '2024-01-05'), open_task('task-2', 'user-1', '2024-01-05')]
+
+        marked = overdue_sweeper.mark_overdue(tasks)
+
+        # Assertions
+        self.assertEqual([task['TaskID'] for task in marked], ['task-1'])
+        retry = mock_client.transact_write_items.call_args[1]['TransactItems']
+        self.assertEqual(len(retry), 2)
+        self.assertEqual(retry[0]['Update']['Key'], {'TaskID': {'S': 'task-1'}})
+
+    @patch('backend.tasks.tasks.overdue_sweeper.MAX_TASKS_PER_RUN', 1)
+    @patch('backend.tasks.tasks.overdue_sweeper.datetime')
+    @patch('backend.tasks.tasks.overdue_sweeper.sns')
+    @patch('backend.tasks.tasks.overdue_sweeper.client')
+    @patch('backend.tasks.tasks.overdue_sweeper.stats_table')
+    def test_sweep_checkpoints_backlog(self, mock_stats_table, mock_client, mock_sns, mock_datetime):
+        """Test that a run stopping at its budget resumes from the page it reached."""
+        mock_datetime.now.return_value = datetime(2024, 1, 10, 12, 0)
+        mock_datetime.fromisoformat = datetime.fromisoformat
+
+        # Mock DynamoDB responses
+        resume_key = {'TaskID': {'S': 'task-0'}, 'DeadlineBucket': {'S': '2023-12-01'}}
+        mock_stats_table.get_item.return_value = {
+            'Item': {'StatID': 'overdue_sweep_checkpoint', 'Day': '2023-12-01', 'LastKey': json.dumps(resume_key)}
+        }
+        next_key = {'TaskID': {'S': 'task-1'}, 'DeadlineBucket': {'S': '2023-12-01'}}
+        mock_client.query.return_value = {
+            'Items': [{key: {'S': value} for key, value in open_task('task-1', 'user-1', '2023-12-01').items()}],
+            'LastEvaluatedKey': next_key
+        }
+
+        # Call the handler
+        response = overdue_sweeper.lambda_handler({}, {})
+
+        # Assertions
+        self.assertFalse(json.loads(response['body'])['finished'])
+        self.assertEqual(mock_client.query.call_args[1]['ExclusiveStartKey'], resume_key)
+        mock_stats_table.put_item.assert_called_once_with(
+            Item={'StatID': 'overdue_sweep_checkpoint', 'Day': '2023-12-01', 'LastKey': json.dumps(next_key)}
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Tests for the task counter reconciliation function.
+"""
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
+import sys
+import os
+
+# Set environment variables before importing modules
+os.environ['TASKS_TABLE'] = 'Tasks-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.admin.admin.reconcile_counters import lambda_handler
+
+class TestReconcileCounters(unittest.TestCase):
+    """Test cases for task counter reconciliation."""
+
+    @patch('backend.admin.admin.reconcile_counters.TOTAL_SEGMENTS', 2)
+    @patch('backend.admin.admin.reconcile_counters.stats_table')
+    @patch('backend.admin.admin.reconcile_counters.client')
+    def test_reconcile_repairs_drift(self, mock_client, mock_stats_table):
+        """Test that drifted counters are overwritten with a recount."""
+        # Mock paginated scan responses for each segment
+        def scan(**kwargs):
+            if kwargs['Segment'] == 0 and 'ExclusiveStartKey' not in kwargs:
+                return {
+                    'Items': [{'Status': {'S': 'New'}, 'Priority': {'S': 'High'}}],
+                    'LastEvaluatedKey': {'TaskID': {'S': 'task-1'}}
+                }
+            if kwargs['Segment'] == 0:
+                return {'Items': [{'Status': {'S': 'Completed'}, 'Priority': {'S': 'Low'}}]}
+            return {'Items': [{'Status': {'S': 'New'}, 'Priority': {'S': 'Low'}}]}
+        mock_client.scan.side_effect = scan
+
+        # Mock drifted counters
+        mock_stats_table.get_item.return_value = {
+            'Item': {
+                'StatID': 'task_counters',
+                'TotalTasks': 4,
+                'Status_New': 3,
+                'Status_Completed': 1,
+                'Priority_High': 1,
+                'Priority_Low': 3,
+                'Version': 7
+            }
+        }
+
+        # Call the handler
+        response = lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        body = json.loads(response['body'])
+        self.assertEqual(body['drift'], {'TotalTasks': -1, 'Status_New': -1, 'Priority_Low': -1})
+
+        # Verify the counters were rewritten unless a task write bumped the version
+        put_args = mock_stats_table.put_item.call_args[1]
+        counters = put_args['Item']
+        self.assertEqual(counters['StatID'], 'task_counters')
+        self.assertEqual(counters['TotalTasks'], 3)
+        self.assertEqual(counters['Status_New'], 2)
+        self.assertEqual(counters['Priority_Low'], 2)
+        self.assertEqual(counters['Version'], 8)
+        self.assertEqual(put_args['ConditionExpression'], 'Version = :version')
+        self.assertEqual(put_args['ExpressionAttributeValues'], {':version': 7})
+        self.assertEqual(mock_client.scan.call_count, 3)
+
+    @patch('backend.admin.admin.reconcile_counters.stats_table')
+    @patch('backend.admin.admin.reconcile_counters.client')
+    def test_reconcile_recounts_after_concurrent_write(self, mock_client, mock_stats_table):
+        """Test that the recount is repeated when tasks are written during the scan."""
+        mock_client.scan.return_value = {'Items': [{'Status': {'S': 'New'}, 'Priority': {'S': 'Low'}}]}
+        mock_stats_table.get_item.side_effect = [
+            {'Item': {'StatID': 'task_counters', 'TotalTasks': 0, 'Version': 1}},
+            {'Item': {'StatID': 'task_counters', 'TotalTasks': 0, 'Version': 2}}
+        ]
+        mock_stats_table.put_item.side_effect = [
+            ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'changed'}}, 'PutItem'),
+            {}
+        ]
+
+        # Call the handler
+        response = lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(mock_stats_table.put_item.call_count, 2)
+        self.assertEqual(mock_stats_table.put_item.call_args[1]['ExpressionAttributeValues'], {':version': 2})
+
+    @patch('backend.admin.admin.reconcile_counters.stats_table')
+    @patch('backend.admin.admin.reconcile_counters.client')
+    def test_reconcile_gives_up_on_busy_counters(self, mock_client, mock_stats_table):
+        """Test that the counters are left alone if every recount races a task write."""
+        mock_client.scan.return_value = {'Items': [{'Status': {'S': 'New'}, 'Priority': {'S': 'Low'}}]}
+        mock_stats_table.get_item.return_value = {'Item': {'StatID': 'task_counters', 'TotalTasks': 0}}
+        mock_stats_table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'changed'}}, 'PutItem'
+        )
+
+        # Call the handler
+        response = lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 409)
+        self.assertEqual(mock_stats_table.put_item.call_count, 3)
+        self.assertEqual(mock_stats_table.put_item.call_args[1]['ConditionExpression'],
+                         'attribute_not_exists(Version)')
+
+    @patch('backend.admin.admin.reconcile_counters.stats_table')
+    @patch('backend.admin.admin.reconcile_counters.client')
+    def test_reconcile_no_drift(self, mock_client, mock_stats_table):
+        """Test that accurate counters are left untouched."""
+        mock_client.scan.return_value = {'Items': []}
+        mock_stats_table.get_item.return_value = {
+            'Item': {'StatID': 'task_counters', 'TotalTasks': 0}
+        }
+
+        # Call the handler
+        response = lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        mock_stats_table.put_item.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for the unread count reconciliation function.
+"""
+import json
+import unittest
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+import sys
+import os
+
+# Set environment variables before importing modules
+os.environ['USERS_TABLE'] = 'Users-test'
+os.environ['NOTIFICATIONS_TABLE'] = 'Notifications-test'
+os.environ['STATS_TABLE'] = 'Stats-test'
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.notifications.notifications.reconcile_unread import lambda_handler
+
+class TestReconcileUnread(unittest.TestCase):
+    """Test cases for unread count reconciliation."""
+
+    @patch('backend.notifications.notifications.reconcile_unread.stats_table')
+    @patch('backend.notifications.notifications.reconcile_unread.notifications_table')
+    @patch('backend.notifications.notifications.reconcile_unread.users_table')
+    def test_reconcile_repairs_missed_increment(self, mock_users_table, mock_notifications_table, mock_stats_table):
+        """Test that a count that missed an increment is recounted from the unread index."""
+        mock_users_table.scan.return_value = {'Items': [{'UserID': 'user-1'}, {'UserID': 'user-2'}]}
+
+        # Mock paginated unread counts: user-1 has 3 unread, user-2 has 1
+        def query(**kwargs):
+            user_id = kwargs['KeyConditionExpression'].get_expression()['values'][1]
+            if user_id == 'user-1' and 'ExclusiveStartKey' not in kwargs:
+                return {'Count': 2, 'LastEvaluatedKey': {'NotificationID': 'n-2'}}
+            return {'Count': 1}
+        mock_notifications_table.query.side_effect = query
+
+        def get_item(Key, ConsistentRead):
+            counts = {'unread_count#user-1': 2, 'unread_count#user-2': 1}
+            return {'Item': {**Key, 'UnreadCount': counts[Key['StatID']], 'Version': 5}}
+        mock_stats_table.get_item.side_effect = get_item
+
+        # Call the handler
+        response = lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        body = json.loads(response['body'])
+        self.assertEqual(body['drift'], {'user-1': 1})
+        self.assertEqual(body['skipped'], [])
+
+        # Verify only the drifted count was rewritten, guarded by its version
+        mock_stats_table.put_item.assert_called_once_with(
+            Item={'StatID': 'unread_count#user-1', 'UnreadCount': 3, 'Version': 6},
+            ConditionExpression='Version = :version',
+            ExpressionAttributeValues={':version': 5}
+        )
+
+    @patch('backend.notifications.notifications.reconcile_unread.stats_table')
+    @patch('backend.notifications.notifications.reconcile_unread.notifications_table')
+    @patch('backend.notifications.notifications.reconcile_unread.users_table')
+    def test_reconcile_skips_counts_updated_meanwhile(self, mock_users_table, mock_notifications_table, mock_stats_table):
+        """Test that a count updated during its recount is left for the next run."""
+        mock_users_table.scan.return_value = {'Items': [{'UserID': 'user-1'}]}
+        mock_notifications_table.query.return_value = {'Count': 4}
+        mock_stats_table.get_item.return_value = {}
+        mock_stats_table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'changed'}}, 'PutItem'
+        )
+
+        # Call the handler
+        response = lambda_handler({}, {})
+
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        body = json.loads(response['body'])
+        self.assertEqual(body['drift'], {})
+        self.assertEqual(body['skipped'], ['user-1'])
+        self.assertEqual(mock_stats_table.put_item.call_args[1]['ConditionExpression'],
+                         'attribute_not_exists(Version)')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for the stale-while-revalidate analytics cache.
+"""
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.admin.admin.response_cache import StaleWhileRevalidateCache
+
+class TestStaleWhileRevalidateCache(unittest.TestCase):
+    """Test cases for the stale-while-revalidate cache."""
+
+    @patch('backend.admin.admin.response_cache.time.monotonic')
+    def test_fresh_value_is_served_from_memory(self, mock_monotonic):
+        """Test that a fresh value is not recomputed."""
+        mock_monotonic.return_value = 100
+        cache = StaleWhileRevalidateCache(ttl=5, stale_window=60)
+        compute = MagicMock(return_value={'total_tasks': 1})
+
+        self.assertEqual(cache.get('overview', compute), {'total_tasks': 1})
+        mock_monotonic.return_value = 104
+        self.assertEqual(cache.get('overview', compute), {'total_tasks': 1})
+
+        compute.assert_called_once()
+
+    @patch('backend.admin.admin.response_cache.time.monotonic')
+    def test_stale_value_is_served_while_one_refresh_runs(self, mock_monotonic):
+        """Test that stale reads return at once and share a single background refresh."""
+        mock_monotonic.return_value = 100
+        cache = StaleWhileRevalidateCache(ttl=5, stale_window=60)
+        cache.get('overview', lambda: 'old')
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'new'
+
+        # Stale reads do not wait for the refresh
+        mock_monotonic.return_value = 110
+        self.assertEqual(cache.get('overview', slow_compute), 'old')
+        self.assertTrue(started.wait(5))
+        self.assertEqual(cache.get('overview', slow_compute), 'old')
+
+        release.set()
+        while 'overview' in cache.refreshing:
+            threading.Event().wait(0.01)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get('overview', slow_compute), 'new')
+
+    @patch('backend.admin.admin.response_cache.time.monotonic')
+    def test_expired_value_is_recomputed(self, mock_monotonic):
+        """Test that a value past the stale window is recomputed before returning."""
+        mock_monotonic.return_value = 100
+        cache = StaleWhileRevalidateCache(ttl=5, stale_window=60)
+        cache.get('overview', lambda: 'old')
+
+        mock_monotonic.return_value = 200
+        self.assertEqual(cache.get('overview', lambda: 'new'), 'new')
+
+        # Errors computing a missing value reach the caller
+        with self.assertRaises(ValueError):
+            cache.get('deadlines', MagicMock(side_effect=ValueError("Query failed")))
+        self.assertNotIn('deadlines', cache.refreshing)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,20 +6,23 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+from botocore.exceptions import ClientError
 
 # Set environment variables before importing modules
+os.environ['USERS_TABLE'] = 'Users-test'
 os.environ['TASKS_TABLE'] = 'Tasks-test'
 os.environ['NOTIFICATION_TOPIC'] = 'arn:aws:sns:us-east-1:123456789012:TestTopic'
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.tasks.tasks.tasks import lambda_handler
+from backend.tasks.tasks import workload
 
 class TestTaskEndpoints(unittest.TestCase):
     """Test cases for task management endpoints."""
     
-    @patch('backend.tasks.tasks.auth.validate_token')
-    @patch('backend.tasks.tasks.tasks_table.scan')
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.tasks_table.scan')
     def test_get_tasks_admin(self, mock_scan, mock_validate_token):
         """Test getting tasks as admin."""
         # Mock token validation
@@ -74,8 +77,8 @@ class TestTaskEndpoints(unittest.TestCase):
         mock_validate_token.assert_called_once()
         mock_scan.assert_called_once()
     
-    @patch('backend.tasks.tasks.auth.validate_token')
-    @patch('backend.tasks.tasks.tasks_table.scan')
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.tasks_table.scan')
     def test_get_tasks_team_member(self, mock_scan, mock_validate_token):
         """Test getting tasks as team member."""
         # Mock token validation
@@ -124,10 +127,10 @@ class TestTaskEndpoints(unittest.TestCase):
         mock_validate_token.assert_called_once()
         mock_scan.assert_called_once()
     
-    @patch('backend.tasks.tasks.auth.validate_token')
-    @patch('backend.tasks.tasks.tasks_table.put_item')
-    @patch('backend.tasks.tasks.sns.publish')
-    def test_create_task_success(self, mock_publish, mock_put_item, mock_validate_token):
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.sns.publish')
+    def test_create_task_success(self, mock_publish, mock_dynamodb, mock_validate_token):
         """Test successful task creation."""
         # Mock token validation
         mock_validate_token.return_value = {
@@ -169,10 +172,80 @@ class TestTaskEndpoints(unittest.TestCase):
         
         # Verify mocks were called
         mock_validate_token.assert_called_once()
-        mock_put_item.assert_called_once()
+        mock_dynamodb.meta.client.transact_write_items.assert_called_once()
         mock_publish.assert_called_once()
+        
+        # Verify the counters rose by one task
+        counters = mock_dynamodb.meta.client.transact_write_items.call_args[1]['TransactItems'][1]['Update']
+        deltas = {
+            name: counters['ExpressionAttributeValues'][placeholder.replace('#', ':')]
+            for placeholder, name in counters['ExpressionAttributeNames'].items()
+        }
+        self.assertEqual(deltas, {'TotalTasks': {'N': '1'}, 'Status_New': {'N': '1'}, 'Priority_High': {'N': '1'},
+                                  'Version': {'N': '1'}})
     
-    @patch('backend.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    def test_create_task_streams_local_notification(self, mock_dynamodb, mock_validate_token):
+        """Test that a task created on the local server reaches the assignee's notification stream."""
+        from backend.notifications.notifications import stream
+        from backend.notifications.notifications.local_topic import LocalTopic
+        
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # The local server's in-process topic, over mocked notification tables
+        mock_notifications_dynamodb = MagicMock()
+        mock_stats_table = MagicMock()
+        mock_stats_table.update_item.return_value = {'Attributes': {'UnreadCount': 1}}
+        local_topic = LocalTopic(mock_notifications_dynamodb, 'Notifications-test', mock_stats_table)
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/tasks',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'title': 'New Task',
+                'description': 'Task description',
+                'priority': 'High',
+                'assignedTo': 'user-1',
+                'deadline': '2023-12-31T23:59:59'
+            })
+        }
+        
+        events = stream.events('user-1', heartbeat=0.01)
+        self.assertEqual(next(events), ": connected\n\n")
+        
+        try:
+            # Call the handler
+            with patch('backend.tasks.tasks.tasks.sns', local_topic):
+                response = lambda_handler(event, {})
+            
+            # Assertions
+            self.assertEqual(response['statusCode'], 201)
+            task_id = json.loads(response['body'])['data']['TaskID']
+            
+            notification = next(events)
+            self.assertTrue(notification.startswith("event: notification\ndata: "))
+            data = json.loads(notification.split('data: ')[1])
+            self.assertEqual(data['TaskID'], task_id)
+            self.assertEqual(data['Type'], 'task_assigned')
+            self.assertEqual(next(events), 'event: unread_count\ndata: {"unread_count": 1}\n\n')
+            
+            # Verify the notification was stored through ingestion
+            mock_notifications_dynamodb.meta.client.put_item.assert_called_once()
+        finally:
+            events.close()
+    
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
     def test_create_task_not_admin(self, mock_validate_token):
         """Test task creation by non-admin user."""
         # Mock token validation
@@ -213,11 +286,11 @@ class TestTaskEndpoints(unittest.TestCase):
         # Verify mock was called
         mock_validate_token.assert_called_once()
     
-    @patch('backend.tasks.tasks.auth.validate_token')
-    @patch('backend.tasks.tasks.tasks_table.get_item')
-    @patch('backend.tasks.tasks.tasks_table.update_item')
-    @patch('backend.tasks.tasks.sns.publish')
-    def test_update_task_status(self, mock_publish, mock_update_item, mock_get_item, mock_validate_token):
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.tasks_table')
+    @patch('backend.tasks.tasks.tasks.sns.publish')
+    def test_update_task_status(self, mock_publish, mock_tasks_table, mock_dynamodb, mock_validate_token):
         """Test updating task status."""
         # Mock token validation
         mock_validate_token.return_value = {
@@ -228,7 +301,7 @@ class TestTaskEndpoints(unittest.TestCase):
         }
         
         # Mock DynamoDB get_item response
-        mock_get_item.side_effect = [
+        mock_tasks_table.get_item.side_effect = [
             {
                 'Item': {
                     'TaskID': 'task-1',
@@ -277,9 +350,384 @@ class TestTaskEndpoints(unittest.TestCase):
         
         # Verify mocks were called
         mock_validate_token.assert_called_once()
-        self.assertEqual(mock_get_item.call_count, 2)
-        mock_update_item.assert_called_once()
+        self.assertEqual(mock_tasks_table.get_item.call_count, 2)
+        mock_tasks_table.update_item.assert_not_called()
         mock_publish.assert_called_once()
+        
+        # Verify the status change moved the task between counters
+        transact_items = mock_dynamodb.meta.client.transact_write_items.call_args[1]['TransactItems']
+        self.assertEqual(transact_items[0]['Update']['ConditionExpression'], '#status = :old_status')
+        counters = transact_items[1]['Update']
+        deltas = {
+            name: counters['ExpressionAttributeValues'][placeholder.replace('#', ':')]
+            for placeholder, name in counters['ExpressionAttributeNames'].items()
+        }
+        self.assertEqual(deltas, {'Status_New': {'N': '-1'}, 'Status_In Progress': {'N': '1'}, 'Version': {'N': '1'}})
+
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.sns.publish')
+    def test_create_task_updates_counters(self, mock_publish, mock_dynamodb, mock_validate_token):
+        """Test that task creation updates the counters in the same transaction."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/tasks',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'title': 'New Task',
+                'description': 'Task description',
+                'priority': 'High',
+                'assignedTo': 'user-1',
+                'deadline': '2023-12-31T23:59:59'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 201)
+        
+        # Verify the task and counters were written together
+        transact_items = mock_dynamodb.meta.client.transact_write_items.call_args[1]['TransactItems']
+        self.assertEqual(len(transact_items), 2)
+        self.assertEqual(transact_items[0]['Put']['Item']['Title'], {'S': 'New Task'})
+        counters = transact_items[1]['Update']
+        self.assertEqual(sorted(counters['ExpressionAttributeNames'].values()),
+                         ['Priority_High', 'Status_New', 'TotalTasks', 'Version'])
+    
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.tasks_table')
+    @patch('backend.tasks.tasks.tasks.sns.publish')
+    def test_update_task_status_moves_counters(self, mock_publish, mock_tasks_table, mock_dynamodb, mock_validate_token):
+        """Test that a status change is conditional and moves the task between counters."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock DynamoDB get_item response
+        task = {
+            'TaskID': 'task-1',
+            'Title': 'Task 1',
+            'Status': 'New',
+            'Priority': 'High',
+            'AssignedTo': 'user-1',
+            'CreatedBy': 'admin-user-id'
+        }
+        mock_tasks_table.get_item.side_effect = [
+            {'Item': task},
+            {'Item': dict(task, Status='Completed')}
+        ]
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/tasks/task-1/status',
+            'pathParameters': {
+                'taskId': 'task-1'
+            },
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'status': 'Completed'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        mock_tasks_table.update_item.assert_not_called()
+        
+        transact_items = mock_dynamodb.meta.client.transact_write_items.call_args[1]['TransactItems']
+        self.assertEqual(transact_items[0]['Update']['ConditionExpression'], '#status = :old_status')
+        self.assertEqual(transact_items[0]['Update']['ExpressionAttributeValues'][':old_status'], {'S': 'New'})
+        self.assertEqual(sorted(transact_items[1]['Update']['ExpressionAttributeNames'].values()),
+                         ['Status_Completed', 'Status_New', 'Version'])
+    
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.tasks_table')
+    @patch('backend.tasks.tasks.tasks.sns.publish')
+    def test_update_task_status_records_completion_time(self, mock_publish, mock_tasks_table, mock_dynamodb, mock_validate_token):
+        """Test that completing a task records its completion time in the sketches."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'user-1',
+            'username': 'user1',
+            'email': 'user1@example.com',
+            'role': 'team_member'
+        }
+        
+        # Mock DynamoDB get_item response
+        task = {
+            'TaskID': 'task-1',
+            'Title': 'Task 1',
+            'Status': 'In Progress',
+            'Priority': 'Medium',
+            'AssignedTo': 'user-1',
+            'CreatedBy': 'admin-user-id',
+            'CreatedAt': '2024-01-01T00:00:00'
+        }
+        mock_tasks_table.get_item.side_effect = [
+            {'Item': task},
+            {'Item': dict(task, Status='Completed')}
+        ]
+        
+        # Create test event
+        event = {
+            'httpMethod': 'PUT',
+            'path': '/tasks/task-1/status',
+            'pathParameters': {
+                'taskId': 'task-1'
+            },
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'status': 'Completed'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        
+        transact_items = mock_dynamodb.meta.client.transact_write_items.call_args[1]['TransactItems']
+        self.assertEqual(len(transact_items), 4)
+        self.assertEqual(transact_items[2]['Update']['Key'], {'StatID': {'S': 'completion_sketch#user-1'}})
+        self.assertEqual(transact_items[3]['Update']['Key'], {'StatID': {'S': 'team_completion_sketch'}})
+        self.assertEqual(transact_items[2]['Update']['UpdateExpression'], 'ADD #count :one, #bucket :one')
+        
+        # Verify the task left the open deadline index
+        self.assertTrue(transact_items[0]['Update']['UpdateExpression'].endswith('remove DeadlineBucket'))
+    
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.tasks_table')
+    def test_delete_task_conflict(self, mock_tasks_table, mock_dynamodb, mock_validate_token):
+        """Test that a delete racing with another write returns a conflict."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB responses
+        mock_tasks_table.get_item.return_value = {
+            'Item': {'TaskID': 'task-1', 'Status': 'New', 'Priority': 'Low'}
+        }
+        mock_dynamodb.meta.client.transact_write_items.side_effect = ClientError({
+            'Error': {'Code': 'TransactionCanceledException', 'Message': 'cancelled'},
+            'CancellationReasons': [{'Code': 'ConditionalCheckFailed'}, {'Code': 'None'}]
+        }, 'TransactWriteItems')
+        
+        # Create test event
+        event = {
+            'httpMethod': 'DELETE',
+            'path': '/tasks/task-1',
+            'pathParameters': {
+                'taskId': 'task-1'
+            },
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 409)
+
+    @patch('backend.tasks.tasks.tasks.time.sleep')
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.tasks_table')
+    def test_delete_task_retries_counter_conflict(self, mock_tasks_table, mock_dynamodb, mock_validate_token, mock_sleep):
+        """Test that a delete cancelled by a concurrent counters update is retried."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # Mock DynamoDB responses
+        mock_tasks_table.get_item.return_value = {
+            'Item': {'TaskID': 'task-1', 'Status': 'New', 'Priority': 'Low'}
+        }
+        conflict = ClientError({
+            'Error': {'Code': 'TransactionCanceledException', 'Message': 'cancelled'},
+            'CancellationReasons': [{'Code': 'None'}, {'Code': 'TransactionConflict'}]
+        }, 'TransactWriteItems')
+        mock_dynamodb.meta.client.transact_write_items.side_effect = [conflict, conflict, {}]
+        
+        # Create test event
+        event = {
+            'httpMethod': 'DELETE',
+            'path': '/tasks/task-1',
+            'pathParameters': {
+                'taskId': 'task-1'
+            },
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            }
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(mock_dynamodb.meta.client.transact_write_items.call_count, 3)
+        self.assertEqual([call[0][0] for call in mock_sleep.call_args_list], [0.05, 0.1])
+
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.sns.publish')
+    def test_create_task_auto_assign(self, mock_publish, mock_dynamodb, mock_validate_token):
+        """Test that an auto-assigned task goes to the least-loaded team member."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        # user-1 has one open High task, user-2 one open Low task
+        mock_dynamodb.meta.client.query.side_effect = open_tasks_query({
+            ('user-1', 'New'): ['High'],
+            ('user-2', 'In Progress'): ['Low']
+        })
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/tasks',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({
+                'title': 'New Task',
+                'description': 'Task description',
+                'priority': 'Medium',
+                'autoAssign': True,
+                'deadline': '2023-12-31T23:59:59'
+            })
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 201)
+        self.assertEqual(body['data']['AssignedTo'], 'user-2')
+        
+        # Verify loads were read from the index, never from a scan
+        index_names = {call[1]['IndexName'] for call in mock_dynamodb.meta.client.query.call_args_list}
+        self.assertEqual(index_names, {'RoleIndex', 'AssignedToIndex'})
+        mock_dynamodb.meta.client.scan.assert_not_called()
+    
+    @patch('backend.tasks.tasks.tasks.auth.validate_token')
+    @patch('backend.tasks.tasks.tasks.dynamodb')
+    @patch('backend.tasks.tasks.tasks.sns.publish_batch')
+    def test_bulk_create_tasks_balances_load(self, mock_publish_batch, mock_dynamodb, mock_validate_token):
+        """Test that a bulk batch is spread evenly and written in chunks."""
+        # Mock token validation
+        mock_validate_token.return_value = {
+            'user_id': 'admin-user-id',
+            'username': 'admin',
+            'email': 'admin@example.com',
+            'role': 'admin'
+        }
+        
+        mock_dynamodb.meta.client.query.side_effect = open_tasks_query({})
+        
+        tasks = [{
+            'title': f"Task {index}",
+            'description': 'Task description',
+            'priority': 'Medium',
+            'deadline': '2023-12-31T23:59:59'
+        } for index in range(30)]
+        
+        # Create test event
+        event = {
+            'httpMethod': 'POST',
+            'path': '/tasks/bulk',
+            'headers': {
+                'Authorization': 'Bearer test-token'
+            },
+            'body': json.dumps({'tasks': tasks, 'autoAssign': True})
+        }
+        
+        # Call the handler
+        response = lambda_handler(event, {})
+        
+        # Parse response
+        body = json.loads(response['body'])
+        
+        # Assertions
+        self.assertEqual(response['statusCode'], 201)
+        self.assertEqual(body['data']['count'], 30)
+        assignees = [task['AssignedTo'] for task in body['data']['tasks']]
+        self.assertEqual(assignees.count('user-1'), 15)
+        self.assertEqual(assignees.count('user-2'), 15)
+        
+        # Verify each transaction carries one counter update
+        writes = mock_dynamodb.meta.client.transact_write_items.call_args_list
+        self.assertEqual([len(call[1]['TransactItems']) for call in writes], [26, 6])
+        self.assertEqual(mock_publish_batch.call_count, 3)
+
+class TestWorkloadBalancer(unittest.TestCase):
+    """Test cases for the workload min-heap."""
+    
+    def test_assign_least_loaded(self):
+        """Test that tasks go to the member with the lowest weighted load."""
+        balancer = workload.WorkloadBalancer({'user-1': (3, 1), 'user-2': (2, 2), 'user-3': (2, 1)})
+        
+        # Ties on load are broken by the open task count
+        self.assertEqual(balancer.assign('High'), 'user-3')
+        self.assertEqual(balancer.assign('Low'), 'user-2')
+        self.assertEqual(balancer.assign('Low'), 'user-1')
+        self.assertEqual(balancer.assign('Medium'), 'user-2')
+
+def open_tasks_query(open_tasks, members=('user-1', 'user-2')):
+    """Build a query mock for RoleIndex and AssignedToIndex."""
+    def query(**kwargs):
+        values = kwargs['ExpressionAttributeValues']
+        if kwargs['IndexName'] == 'RoleIndex':
+            return {'Items': [{'UserID': {'S': member}} for member in members]}
+        priorities = open_tasks.get((values[':user_id']['S'], values[':status']['S']), [])
+        return {'Items': [{'Priority': {'S': priority}} for priority in priorities]}
+    return query
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
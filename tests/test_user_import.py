@@ -0,0 +1,174 @@
+"""
+Tests for the bulk user import.
+"""
+import io
+import json
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Set environment variables before importing modules
+os.environ['USERS_TABLE'] = 'Users-test'
+os.environ['USER_POOL_ID'] = 'us-east-1_testpool'
+os.environ['USER_POOL_CLIENT_ID'] = 'test-client-id'
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.admin.admin import user_import
+
+CSV_DATA = """username,email,password,name,role,department
+user1,user1@example.com,Password123!,User One,team_member,Engineering
+user2,user2@example.com,Password123!,User Two,,
+user3,user3@example.com,Password123!,User Three,superuser,
+"""
+
+class TestUserImport(unittest.TestCase):
+    """Test cases for the bulk user import."""
+
+    def test_read_users_csv(self):
+        """Test parsing users from CSV."""
+        users = list(user_import.read_users(io.StringIO(CSV_DATA), 'csv'))
+
+        self.assertEqual(len(users), 3)
+        self.assertEqual(users[0]['username'], 'user1')
+        self.assertEqual(users[0]['department'], 'Engineering')
+        self.assertEqual(users[1]['role'], '')
+
+    def test_read_users_ndjson(self):
+        """Test parsing users from NDJSON."""
+        data = '\n'.join([
+            json.dumps({'username': 'user1', 'email': 'user1@example.com'}),
+            '',
+            json.dumps({'Username': 'user2', 'Email': 'user2@example.com'})
+        ])
+
+        users = list(user_import.read_users(io.StringIO(data), 'ndjson'))
+
+        self.assertEqual(len(users), 2)
+        self.assertEqual(users[1]['username'], 'user2')
+
+    @patch('backend.admin.admin.user_import.auth.admin_create_user')
+    @patch('backend.admin.admin.user_import.users_table')
+    def test_import_users_invalid_ndjson_line(self, mock_users_table, mock_admin_create_user):
+        """Test that a malformed NDJSON line fails its row, not the import."""
+        mock_admin_create_user.return_value = {'user_id': 'user1-id'}
+        data = '\n'.join([
+            '{"username": "user0"',
+            json.dumps({'username': 'user1', 'email': 'user1@example.com', 'password': 'Password123!', 'name': 'User One'})
+        ])
+
+        # Call the import
+        summary = user_import.import_users(user_import.read_users(io.StringIO(data), 'ndjson'), users_per_second=1000)
+
+        # Assertions
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(len(summary['failed']), 1)
+        self.assertEqual(summary['failed'][0]['row'], 0)
+        self.assertIn('Invalid JSON', summary['failed'][0]['error'])
+        self.assertIsNone(summary['next_row'])
+
+    @patch('backend.admin.admin.user_import.auth.admin_get_user')
+    @patch('backend.admin.admin.user_import.auth.admin_create_user')
+    @patch('backend.admin.admin.user_import.client')
+    @patch('backend.admin.admin.user_import.users_table')
+    def test_import_users(self, mock_users_table, mock_client, mock_admin_create_user, mock_admin_get_user):
+        """Test importing users with created, skipped and failed rows."""
+        # Mock Cognito responses
+        def create_user(username, email, password, role, name):
+            if username == 'user2':
+                return {'error': 'User already exists'}
+            return {'user_id': f"{username}-id", 'email': email, 'role': role}
+        mock_admin_create_user.side_effect = create_user
+        mock_admin_get_user.return_value = {'user_id': 'user2-sub'}
+
+        # user2's profile was written by an earlier run
+        mock_client.get_item.return_value = {'Item': {'UserID': {'S': 'user2-sub'}}}
+
+        batch = mock_users_table.batch_writer.return_value.__enter__.return_value
+
+        # Call the import
+        summary = user_import.import_users(
+            user_import.read_users(io.StringIO(CSV_DATA), 'csv'),
+            users_per_second=1000
+        )
+
+        # Assertions
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['skipped'], 1)
+        self.assertEqual(len(summary['failed']), 1)
+        self.assertEqual(summary['failed'][0]['row'], 2)
+        self.assertIn('Invalid role', summary['failed'][0]['error'])
+        self.assertIsNone(summary['next_row'])
+
+        # Verify profiles were written through the batch writer
+        batch.put_item.assert_called_once()
+        item = batch.put_item.call_args[1]['Item']
+        self.assertEqual(item['UserID'], 'user1-id')
+        self.assertEqual(item['Department'], 'Engineering')
+
+    @patch('backend.admin.admin.user_import.auth.admin_get_user')
+    @patch('backend.admin.admin.user_import.auth.admin_create_user')
+    @patch('backend.admin.admin.user_import.client')
+    @patch('backend.admin.admin.user_import.users_table')
+    def test_import_users_writes_missing_profile(self, mock_users_table, mock_client, mock_admin_create_user,
+                                                 mock_admin_get_user):
+        """Test that a user created in Cognito without a profile gets one keyed by its Cognito ID on resume."""
+        mock_admin_create_user.return_value = {'error': 'User already exists'}
+        mock_admin_get_user.return_value = {'user_id': 'user1-sub'}
+        mock_client.get_item.return_value = {}
+
+        batch = mock_users_table.batch_writer.return_value.__enter__.return_value
+
+        # Call the import for the first row only
+        summary = user_import.import_users(
+            user_import.read_users(io.StringIO(CSV_DATA.split('user2')[0]), 'csv'),
+            users_per_second=1000
+        )
+
+        # Assertions
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['skipped'], 0)
+        mock_admin_get_user.assert_called_once_with('user1')
+        self.assertEqual(mock_client.get_item.call_args[1]['Key'], {'UserID': {'S': 'user1-sub'}})
+        item = batch.put_item.call_args[1]['Item']
+        self.assertEqual(item['UserID'], 'user1-sub')
+        self.assertEqual(item['Username'], 'user1')
+        self.assertEqual(item['Email'], 'user1@example.com')
+
+    @patch('backend.admin.admin.user_import.auth.admin_create_user')
+    @patch('backend.admin.admin.user_import.users_table')
+    def test_import_users_resume(self, mock_users_table, mock_admin_create_user):
+        """Test resuming an import from a checkpointed row."""
+        mock_admin_create_user.return_value = {'user_id': 'user-id'}
+
+        # Call the import
+        summary = user_import.import_users(
+            user_import.read_users(io.StringIO(CSV_DATA), 'csv'),
+            start=2,
+            users_per_second=1000
+        )
+
+        # Only the last row is processed
+        self.assertEqual(summary['created'], 0)
+        self.assertEqual(len(summary['failed']), 1)
+        self.assertEqual(summary['failed'][0]['username'], 'user3')
+        mock_admin_create_user.assert_not_called()
+
+    @patch('backend.admin.admin.user_import.auth.admin_create_user')
+    @patch('backend.admin.admin.user_import.users_table')
+    def test_import_users_deadline(self, mock_users_table, mock_admin_create_user):
+        """Test that an expired deadline returns the row to resume from."""
+        # Call the import with a deadline in the past
+        summary = user_import.import_users(
+            user_import.read_users(io.StringIO(CSV_DATA), 'csv'),
+            start=1,
+            deadline=0
+        )
+
+        # Assertions
+        self.assertEqual(summary['next_row'], 1)
+        mock_admin_create_user.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()